@@ -0,0 +1,172 @@
+"""Import-time benchmark: times imports of hana_automl entry modules in fresh interpreters.
+
+For developers only. Run from the repository root::
+
+    python -m benchmarks.imports --output imports.json --baseline imports_baseline.json
+
+Tuning machinery (optuna, bayes_opt, optimizers, algorithm modules) must not be imported by the
+entry modules, they are imported on demand. The run fails (exit code 1) if an entry module
+imports one of them or is more than --threshold percent slower than in the baseline.
+--update-baseline stores the results as the new baseline instead.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+# differences shorter than this are noise
+MIN_SECONDS = 0.05
+ENTRY_MODULES = ["hana_automl.automl", "hana_automl.storage", "hana_automl.serving"]
+# modules and packages only fit needs
+FORBIDDEN = [
+    "optuna",
+    "bayes_opt",
+    "hana_automl.optimizers",
+    "hana_automl.pipeline.pipeline",
+    "hana_automl.algorithms.classification",
+    "hana_automl.algorithms.regression",
+]
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> dict:
+    """Returns cumulative microseconds of top-level imports by module from -X importtime output.
+
+    Nested imports are included in the time of the top-level import that triggered them and are
+    listed with zero time, so keys are all imported modules.
+    """
+    modules = dict()
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match is None:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules[name] = cumulative if len(indent) <= 1 else 0
+    return modules
+
+
+def forbidden(modules) -> list:
+    """Returns FORBIDDEN modules or packages that were imported."""
+    return [
+        f
+        for f in FORBIDDEN
+        if any(name == f or name.startswith(f + ".") for name in modules)
+    ]
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """Imports module in `repeat` fresh interpreters.
+
+    Returns
+    -------
+    dict
+        Median import seconds, number of imported modules and forbidden modules among them.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = list()
+    modules = dict()
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{process.stderr}")
+        modules = parse_importtime(process.stderr)
+        times.append(sum(modules.values()) / 1e6)
+    return {
+        "seconds": statistics.median(times),
+        "modules": len(modules),
+        "forbidden": forbidden(modules),
+    }
+
+
+def run(modules: list, repeat: int) -> dict:
+    results = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "modules": dict(),
+    }
+    for module in modules:
+        result = measure(module, repeat)
+        results["modules"][module] = result
+        print(
+            f"{module:30} {result['seconds']:7.3f} s {result['modules']:5} modules "
+            f"{' '.join(result['forbidden'])}"
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Compares results with baseline.
+
+    Returns
+    -------
+    list
+        (module, baseline seconds, seconds, slower) for every module in both runs, where
+        slower is True if the time grew by more than threshold percent.
+    """
+    report = list()
+    for module, result in results["modules"].items():
+        previous = baseline.get("modules", dict()).get(module)
+        if previous is None:
+            continue
+        before, after = previous["seconds"], result["seconds"]
+        slower = after > before * (1 + threshold / 100) and after - before > MIN_SECONDS
+        report.append((module, before, after, slower))
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--output", default="import_results.json")
+    parser.add_argument("--baseline", default=None, help="Results to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=20.0, help="Allowed slowdown, percent"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--modules", default=",".join(ENTRY_MODULES), help="Comma separated modules"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run(args.modules.split(","), args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results are written to {args.output}")
+    failed = [m for m, result in results["modules"].items() if result["forbidden"]]
+    for module in failed:
+        print(f"{module} imports tuning modules, import them on demand instead")
+    if args.baseline is None:
+        return 1 if failed else 0
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline is written to {args.baseline}")
+        return 1 if failed else 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    report = compare(results, baseline, args.threshold)
+    for module, before, after, slower in report:
+        change = (after - before) / before * 100 if before > 0 else 0.0
+        mark = "SLOWER" if slower else ""
+        print(f"{module:30} {before:7.3f} s {after:7.3f} s {change:+7.1f}% {mark}")
+    return 1 if failed or any(line[3] for line in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
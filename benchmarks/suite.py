@@ -0,0 +1,442 @@
+"""Benchmark suite: fits every benchmark dataset with fixed seeds and steps and records timings.
+
+For developers only. Run from the repository root::
+
+    python -m benchmarks.suite --output results.json --baseline baseline.json --threshold 10
+
+Without --address the offline backend (see :mod:`hana_automl.offline`) is used. The run fails
+(exit code 1) if some dataset or phase is more than --threshold percent slower than in the
+baseline. --update-baseline stores the results as the new baseline instead.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from hana_automl.utils import sqlstats, tracing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 2
+# phases are recorded by tracing spans, relative to this one
+FIT_SPAN = "automl.fit"
+# phases shorter than this are too noisy to compare
+MIN_SECONDS = 0.1
+
+
+@dataclass
+class Dataset:
+    path: str
+    target: str
+    task: str = None
+    id_column: str = None
+    categorical: list = None
+    remove: list = None
+
+    @property
+    def name(self) -> str:
+        return os.path.relpath(self.path, os.path.join(ROOT, "data")).replace(
+            os.sep, "/"
+        )
+
+
+DATASETS = [
+    Dataset("benchmark/cls/australian.csv", "A15", "cls", categorical=["A15"]),
+    Dataset("benchmark/cls/blood.csv", "Class", "cls", categorical=["Class"]),
+    Dataset(
+        "benchmark/cls/credit.csv",
+        "class",
+        "cls",
+        categorical=[
+            "class",
+            "checking_status",
+            "credit_history",
+            "purpose",
+            "savings_status",
+            "employment",
+            "personal_status",
+            "other_parties",
+            "property_magnitude",
+            "other_payment_plans",
+            "housing",
+            "job",
+            "own_telephone",
+            "foreign_worker",
+        ],
+    ),
+    Dataset("benchmark/cls/kc1.csv", "defects", "cls", categorical=["defects"]),
+    Dataset("benchmark/cls/kr-vs-kp.csv", "class", "cls", categorical=["class"]),
+    Dataset("benchmark/cls/phoneme.csv", "Class", "cls", categorical=["Class"]),
+    Dataset("benchmark/cls/sylvine.csv", "class", "cls", categorical=["class"]),
+    Dataset("benchmark/reg/baseball.csv", "RS", "reg"),
+    Dataset("benchmark/reg/boston.csv", "MEDV", "reg"),
+    Dataset("benchmark/reg/elevators.csv", "Goal", "reg"),
+    Dataset("benchmark/reg/pifagor.csv", "hypotenuse", "reg", id_column="ID"),
+    Dataset("benchmark/reg/pol.csv", "foo", "reg"),
+    Dataset("benchmark/reg/quake.csv", "col_4", "reg"),
+    Dataset(
+        "benchmark/reg/socmob.csv",
+        "counts_for_sons_current_occupation",
+        "reg",
+        categorical=[
+            "fathers_occupation",
+            "sons_occupation",
+            "family_structure",
+            "race",
+        ],
+    ),
+    Dataset("benchmark/reg/space_ga.csv", "ln(VOTES/POP)", "reg"),
+    Dataset("benchmark/reg/tecator.csv", "fat", "reg"),
+    Dataset("benchmark/reg/wine_quality.csv", "quality", "reg"),
+    Dataset("bank_train.csv", "y", "cls", id_column="ID", remove=["Unnamed: 0"]),
+    Dataset("boston_data.csv", "medv", "reg", id_column="ID"),
+    Dataset("cleaned_train.csv", "Survived", "cls", id_column="PASSENGERID"),
+    Dataset("heart.csv", "output", "cls"),
+    Dataset("iris.csv", "species", "cls", id_column="ID"),
+    Dataset("reg.csv", "Все 18+_TVR", "reg", id_column="ID"),
+    Dataset(
+        "train.csv",
+        "Survived",
+        "cls",
+        id_column="PassengerId",
+        remove=["Name", "Ticket", "Cabin"],
+    ),
+]
+for dataset in DATASETS:
+    dataset.path = os.path.join(ROOT, "data", dataset.path)
+
+
+def relative(path: str) -> str:
+    """Returns span path relative to AutoML.fit, e.g. 'trial/fit'."""
+    if path == FIT_SPAN:
+        return "other"
+    prefix = FIT_SPAN + "/"
+    return path[len(prefix) :] if path.startswith(prefix) else path
+
+
+def phases(tracer: tracing.Tracer, stats: sqlstats.StatsConnection) -> dict:
+    """Returns time and SQL traffic of every phase of the fit, by span path.
+
+    Time of a phase includes its children, SQL traffic goes to the innermost one.
+    """
+    result = dict()
+    for span in tracer.spans:
+        if span.name == FIT_SPAN:
+            continue
+        path = relative(sqlstats.phase_path(span))
+        phase = result.setdefault(path, {"seconds": 0.0, "calls": 0})
+        phase["seconds"] += span.seconds
+        phase["calls"] += 1
+    for path, sql in stats.phases.items():
+        phase = result.setdefault(relative(path), {"seconds": 0.0, "calls": 0})
+        for key, value in sql.to_dict().items():
+            phase[key] = phase.get(key, 0) + value
+    return dict(sorted(result.items()))
+
+
+def trials(tracer: tracing.Tracer) -> list:
+    """Returns seconds of every trial and total seconds of phases inside it, by phase name."""
+    result = dict()
+    for span in tracer.spans:
+        trial = span
+        while trial is not None and trial.name != "trial":
+            trial = trial.parent
+        if trial is None:
+            continue
+        times = result.setdefault(trial.id, dict())
+        if trial is span:
+            times["seconds"] = span.seconds
+        else:
+            times[span.name] = times.get(span.name, 0.0) + span.seconds
+    return list(result.values())
+
+
+def instrumented() -> list:
+    """Returns (owner, attribute, phase) of pipeline functions that hana_automl doesn't trace.
+
+    Upload, preprocessing, trials, fitting, scoring, validation and ensembles have their own
+    spans, see :mod:`hana_automl.utils.tracing`.
+    """
+    from hana_automl.automl import AutoML
+    from hana_automl.pipeline.data import Data
+    from hana_automl.pipeline.input import Input
+    from hana_automl.preprocess.preprocessor import Preprocessor
+
+    targets = [
+        (Input, "split_data", "split"),
+        (Data, "drop_duplicates", "split"),
+        (Preprocessor, "check_binomial", "profiling"),
+        (Preprocessor, "set_task", "profiling"),
+        (AutoML, "_AutoML__compile_preprocessing", "compile"),
+    ]
+    return [target for target in targets if hasattr(target[0], target[1])]
+
+
+@contextlib.contextmanager
+def patched(seed: int):
+    """Traces untraced pipeline functions and seeds optuna samplers while the block runs."""
+    import optuna
+
+    originals = list()
+
+    def wrap(function, name):
+        def wrapper(*args, **kwargs):
+            if tracing.current().name == name:
+                # nested call of the same phase, e.g. split_data calling drop_duplicates
+                return function(*args, **kwargs)
+            with tracing.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    for owner, attribute, name in instrumented():
+        originals.append((owner, attribute, owner.__dict__.get(attribute)))
+        setattr(owner, attribute, wrap(getattr(owner, attribute), name))
+    create_study = optuna.create_study
+    studies = [0]
+
+    def seeded_study(*args, **kwargs):
+        if kwargs.get("sampler") is None:
+            # every study gets its own seed, in creation order
+            kwargs["sampler"] = optuna.samplers.TPESampler(seed=seed + studies[0])
+            studies[0] += 1
+        return create_study(*args, **kwargs)
+
+    optuna.create_study = seeded_study
+    try:
+        yield
+    finally:
+        optuna.create_study = create_study
+        for owner, attribute, original in reversed(originals):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+
+
+def load(dataset: Dataset, max_rows: int = None, seed: int = 0) -> pd.DataFrame:
+    df = pd.read_csv(dataset.path)
+    if dataset.remove is not None:
+        df = df.drop(columns=dataset.remove)
+    if max_rows is not None and len(df) > max_rows:
+        df = df.sample(n=max_rows, random_state=seed).sort_index()
+    if dataset.id_column is not None:
+        # AutoML expects ID column in upper case
+        df = df.rename(columns={dataset.id_column: dataset.id_column.upper()})
+    else:
+        df = pd.concat(
+            [pd.DataFrame({"ID": range(len(df))}, index=df.index), df], axis=1
+        )
+    return df
+
+
+def run_dataset(connect, dataset: Dataset, args) -> dict:
+    """Fits one dataset in a fresh connection and returns its results."""
+    from hana_automl.automl import AutoML
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    df = load(dataset, args.max_rows, args.seed)
+    cc = connect()
+    start = time.perf_counter()
+    with tracing.Tracer() as tracer, patched(args.seed):
+        automl = AutoML(cc)
+        # AutoML.fit counts SQL traffic of the fit in automl.sql_stats
+        automl.fit(
+            df=df,
+            target=dataset.target,
+            id_column=dataset.id_column or "ID",
+            categorical_features=dataset.categorical,
+            task=dataset.task,
+            steps=args.steps,
+            ensemble=args.ensemble,
+            optimizer="OptunaSearch",
+            output_leaderboard=False,
+            verbose=0,
+        )
+    seconds = time.perf_counter() - start
+    result = {
+        "rows": len(df),
+        "seconds": seconds,
+        "phases": phases(tracer, automl.sql_stats),
+        "trials": trials(tracer),
+        "sql": automl.sql_stats.total.to_dict(),
+        "peak_memory": automl.peak_memory,
+        "metrics": {
+            "metric": automl.leaderboard_metric,
+            "algorithm": automl.leaderboard[0].algorithm.title,
+            "train_score": automl.leaderboard[0].train_score,
+            "valid_score": automl.leaderboard[0].valid_score,
+        },
+    }
+    if automl.ensemble:
+        result["metrics"]["ensemble_score"] = automl.ensemble_score
+    if hasattr(cc, "close"):
+        cc.close()
+    return result
+
+
+def run(connect, datasets: list, args) -> dict:
+    results = {
+        "version": RESULTS_VERSION,
+        "settings": {
+            "seed": args.seed,
+            "steps": args.steps,
+            "ensemble": args.ensemble,
+            "max_rows": args.max_rows,
+            "repeat": args.repeat,
+            "backend": "hana" if args.address else "offline",
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "datasets": dict(),
+    }
+    for dataset in datasets:
+        print(f"{dataset.name}...", end=" ", flush=True)
+        try:
+            # the fastest of repeated runs, the others are noise
+            runs = [run_dataset(connect, dataset, args) for _ in range(args.repeat)]
+            result = min(runs, key=lambda r: r["seconds"])
+            print(f"{result['seconds']:.2f} s")
+        except Exception as error:
+            result = {"error": f"{type(error).__name__}: {error}"}
+            print(result["error"])
+        results["datasets"][dataset.name] = result
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Compares results with baseline.
+
+    Returns
+    -------
+    list
+        (dataset, phase, baseline seconds, seconds, slower) for every compared time, where
+        slower is True if the time grew by more than threshold percent. Phase is None for the
+        whole fit. Datasets that failed in either run are not compared.
+    """
+    report = list()
+    for name, result in results["datasets"].items():
+        previous = baseline.get("datasets", dict()).get(name)
+        if previous is None or "error" in previous or "error" in result:
+            continue
+        times = [(None, previous["seconds"], result["seconds"])]
+        for path, phase in result["phases"].items():
+            if path in previous["phases"] and "/" not in path:
+                times.append(
+                    (path, previous["phases"][path]["seconds"], phase["seconds"])
+                )
+        for phase, before, after in times:
+            slower = (
+                after > before * (1 + threshold / 100) and after - before > MIN_SECONDS
+            )
+            report.append((name, phase, before, after, slower))
+    return report
+
+
+def print_report(report: list, results: dict, baseline: dict, threshold: float):
+    for name, phase, before, after, slower in report:
+        change = (after - before) / before * 100 if before > 0 else 0.0
+        mark = "SLOWER" if slower else ""
+        print(
+            f"{name:40} {phase or 'total':12} {before:9.2f} s {after:9.2f} s "
+            f"{change:+7.1f}% {mark}"
+        )
+    for name, result in results["datasets"].items():
+        previous = baseline.get("datasets", dict()).get(name, dict())
+        if "metrics" in result and "metrics" in previous:
+            if result["metrics"] != previous["metrics"]:
+                print(
+                    f"{name}: metrics changed {previous['metrics']} -> {result['metrics']}"
+                )
+    failed = sum(1 for line in report if line[4])
+    print(
+        f"{failed} of {len(report)} times are more than {threshold}% slower than baseline"
+    )
+
+
+def connector(args):
+    if args.address is None:
+        from hana_automl import offline
+
+        offline.install()
+        if args.database is not None and os.path.exists(args.database):
+            os.remove(args.database)
+        return lambda: offline.ConnectionContext(args.database or ":memory:")
+    from hana_ml.dataframe import ConnectionContext
+
+    return lambda: ConnectionContext(args.address, args.port, args.user, args.password)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None, help="Results to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed slowdown, percent"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--ensemble", default=False, help="Ensemble type, as in AutoML.fit"
+    )
+    parser.add_argument(
+        "--max-rows", type=int, default=None, help="Sample big datasets"
+    )
+    parser.add_argument(
+        "--only", default=None, help="Comma separated substrings of dataset names"
+    )
+    parser.add_argument(
+        "--address", default=None, help="HANA address, offline if empty"
+    )
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--user", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--database", default=None, help="SQLite file of offline run")
+    args = parser.parse_args(argv)
+    if args.ensemble in ["True", "False"]:
+        args.ensemble = args.ensemble == "True"
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    datasets = DATASETS
+    if args.only is not None:
+        names = args.only.split(",")
+        datasets = [d for d in DATASETS if any(n in d.name for n in names)]
+    results = run(connector(args), datasets, args)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2, default=str)
+    print(f"Results are written to {args.output}")
+    if args.baseline is None:
+        return 0
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, default=str)
+        print(f"Baseline is written to {args.baseline}")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("settings") != results["settings"]:
+        print("Warning: baseline was recorded with other settings")
+    report = compare(results, baseline, args.threshold)
+    print_report(report, results, baseline, args.threshold)
+    return 1 if any(line[4] for line in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
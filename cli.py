@@ -1,10 +1,27 @@
 import click
+from hana_ml.dataframe import ConnectionContext
+
 from hana_automl.automl import AutoML
 from hana_automl.pipeline.input import Input
+from hana_automl.serving import PredictionService
 import numpy as np
 
 
-@click.command()
+class DefaultGroup(click.Group):
+    """Runs `start` when no command is given, so `python cli.py -i ...` keeps working."""
+
+    def parse_args(self, ctx, args):
+        if len(args) == 0 or (args[0] not in self.commands and args[0] != "--help"):
+            args = ["start"] + args
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
+def cli():
+    pass
+
+
+@cli.command()
 @click.option("-i", help="Path or URL of file to be processed.")
 @click.option("--target", help="Column or variable to be predicted")
 @click.option("--table", default=None, help="Name of existing table created in HANA")
@@ -37,6 +54,54 @@ def start(
     )
 
 
+@cli.command()
+@click.option("--address", required=True, help="HANA database address")
+@click.option("--port", required=True, type=int, help="HANA database port")
+@click.option("--user", required=True, help="Database user")
+@click.option("--password", required=True, help="Database password")
+@click.option("--schema", required=True, help="Schema with saved models")
+@click.option("--cache_dir", default=None, help="Local copy of loaded models")
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--http_port", default=8080, help="Port to listen on")
+@click.option("--cache_size", default=4, help="Number of models kept loaded")
+@click.option(
+    "--pool_size", default=None, type=int, help="Maximum database connections"
+)
+@click.option(
+    "--window_ms", default=5.0, help="How long requests are collected into a batch"
+)
+@click.option("--max_batch", default=256, help="Maximum rows in one batch")
+def serve(
+    address,
+    port,
+    user,
+    password,
+    schema,
+    cache_dir,
+    host,
+    http_port,
+    cache_size,
+    pool_size,
+    window_ms,
+    max_batch,
+):
+    """Serves predictions of saved models over HTTP.
+
+    POST /predict/<model>/<version> with {"row": {...}} body, GET /metrics for statistics.
+    """
+    service = PredictionService(
+        lambda: ConnectionContext(address, port, user, password),
+        schema=schema,
+        cache_dir=cache_dir,
+        cache_size=cache_size,
+        pool_size=pool_size,
+        window_ms=window_ms,
+        max_batch=max_batch,
+    )
+    print(f"Serving on http://{host}:{http_port}")
+    service.serve(host, http_port)
+
+
 def wizard_mode():
     file_path = input(
         "Welcome to the wizard mode! It will guide you through the whole AutoML process. Let's start with an input "
@@ -120,4 +185,4 @@ def wizard_mode():
 
 
 if __name__ == "__main__":
-    start()
+    cli()
@@ -1,15 +1,36 @@
-from time import sleep
+import functools
+import time
 
 import hana_ml
-import optuna
-from bayes_opt import BayesianOptimization
 from hana_ml.algorithms.pal.regression import ExponentialRegression
 
 from hana_automl.metric.mae import mae_score
 from hana_automl.metric.mse import mse_score
 from hana_automl.metric.rmse import rmse_score
-from hana_automl.optimizers.bayes import BayesianOptimizer
-from hana_automl.optimizers.optuna_optimizer import OptunaOptimizer
+from hana_automl.utils.tracing import traced
+
+
+def score_attributes(algorithm, data=None, df=None, metric=None) -> dict:
+    """Span attributes of :meth:`BaseAlgorithm.score`."""
+    return {"algorithm": algorithm.title, "metric": metric}
+
+
+def timed(attribute: str):
+    """Decorator of algorithm methods that adds seconds of every call to `attribute`."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                setattr(self, attribute, getattr(self, attribute, 0.0) + seconds)
+
+        return wrapper
+
+    return decorator
 
 
 class BaseAlgorithm:
@@ -20,11 +41,15 @@ class BaseAlgorithm:
         self.model = model
         self.categorical_features: list = None
         self.params_range: dict = {}
-        self.bayes_opt: BayesianOptimizer = None
-        self.optuna_opt: OptunaOptimizer = None
+        # tuners are imported on first tuning, see bayes_tune and optuna_tune
+        self.bayes_opt = None  # bayes_opt.BayesianOptimization
+        self.optuna_opt = None  # optuna.Study
         self.temp_data = None
         self.tuning_metric: str = None
         self.tuned_params: dict = None
+        # seconds spent in fit and score since optimizer reset them, see TrialHistory
+        self.fit_seconds = 0.0
+        self.score_seconds = 0.0
         if custom_params is not None:
             # self.params_range[custom_params.keys()] = custom_params.values()
             pass
@@ -38,6 +63,8 @@ class BaseAlgorithm:
     def optunatune(self, trial):
         pass
 
+    @traced("score", attributes=score_attributes)
+    @timed("score_seconds")
     def score(self, data, df: hana_ml.DataFrame, metric: str):
         if metric == "accuracy" or metric == "r2_score" or metric is None:
             return self.model.score(df, key=data.id_colm, label=data.target)
@@ -60,6 +87,8 @@ class BaseAlgorithm:
         f,
     ):
         if self.bayes_opt is None:
+            from bayes_opt import BayesianOptimization
+
             self.bayes_opt = BayesianOptimization(
                 f=f, pbounds=self.params_range, verbose=False, random_state=17
             )
@@ -67,6 +96,8 @@ class BaseAlgorithm:
         return self.bayes_opt.max["target"], self.bayes_opt.max["params"]
 
     def optuna_tune(self, data, tuning_metric):
+        import optuna
+
         self.tuning_metric = tuning_metric
         if self.optuna_opt is None:
             v = optuna.logging.get_verbosity()
@@ -98,6 +129,8 @@ class BaseAlgorithm:
         )
         return acc
 
+    @traced("fit", attributes=lambda self, *args, **kwargs: {"algorithm": self.title})
+    @timed("fit_seconds")
     def fit(self, data, features, categorical_features):
         if isinstance(
             self.model, ExponentialRegression
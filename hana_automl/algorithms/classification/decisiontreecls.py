@@ -21,7 +21,8 @@ class DecisionTreeCls(BaseAlgorithm):
         params["max_depth"] = round(params["max_depth"])
         # self.model = UnifiedClassification(func='DecisionTree', **params)
         self.tuned_params = params
-        self.model = DecisionTreeClassifier(**params)
+        # PMML model can be exported for local scoring
+        self.model = DecisionTreeClassifier(model_format="pmml", **params)
 
     def optunatune(self, trial):
         params = dict()
@@ -36,5 +37,5 @@ class DecisionTreeCls(BaseAlgorithm):
             "min_records_of_parent", 2, 20, log=True
         )
         # model = UnifiedClassification(func='DecisionTree', **params)
-        model = DecisionTreeClassifier(**params)
+        model = DecisionTreeClassifier(model_format="pmml", **params)
         self.model = model
@@ -3,7 +3,8 @@ from hana_ml.algorithms.pal.metrics import accuracy_score
 from hana_ml.algorithms.pal.neighbors import KNNClassifier
 from hana_ml.ml_base import ListOfStrings
 
-from hana_automl.algorithms.base_algo import BaseAlgorithm
+from hana_automl.algorithms.base_algo import BaseAlgorithm, score_attributes, timed
+from hana_automl.utils.tracing import traced
 
 
 class KNeighborsCls(BaseAlgorithm):
@@ -51,6 +52,8 @@ class KNeighborsCls(BaseAlgorithm):
         )
         self.model = model
 
+    @traced("score", attributes=score_attributes)
+    @timed("score_seconds")
     def score(self, data, df, metric):
         return self.inner_score(df, key=data.id_colm, label=data.target, metric=metric)
 
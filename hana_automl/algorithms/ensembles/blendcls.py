@@ -2,8 +2,13 @@ import hana_ml
 from hana_ml.algorithms.pal.metrics import accuracy_score
 from hana_ml.dataframe import create_dataframe_from_pandas
 
-from hana_automl.algorithms.ensembles.blending import Blending
+from hana_automl.algorithms.ensembles.blending import (
+    Blending,
+    ensemble_attributes,
+    prediction_column,
+)
 from hana_automl.pipeline.data import Data
+from hana_automl.utils.tracing import traced
 
 
 class BlendingCls(Blending):
@@ -24,6 +29,7 @@ class BlendingCls(Blending):
         )
         self.title: str = "BlendingClassifier"
 
+    @traced("ensemble.score", attributes=ensemble_attributes)
     def score(self, data: Data, metric: str):
         return self.inner_score(
             data, key=data.id_colm, metric=metric, label=data.target
@@ -39,6 +45,7 @@ class BlendingCls(Blending):
         if metric == "accuracy":
             return accuracy_score(joined, label_true="ACTUAL", label_pred="PREDICTION")
 
+    @traced("ensemble.predict", attributes=ensemble_attributes)
     def predict(
         self, data: Data = None, df: hana_ml.DataFrame = None, id_colm: str = None
     ):
@@ -47,13 +54,7 @@ class BlendingCls(Blending):
         if id_colm is None:
             id_colm = data.id_colm
         for i in range(len(predictions)):
-            if (
-                str(self.model_list[i].algorithm.model).split(" ")[0]
-                == "<hana_ml.algorithms.pal.neural_network.MLPClassifier"
-            ):
-                id_val = 2
-            else:
-                id_val = 1
+            id_val = prediction_column(self.model_list[i].algorithm.model)
             k = (
                 predictions[i]
                 .select(id_colm, predictions[i].columns[id_val])
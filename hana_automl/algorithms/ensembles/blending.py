@@ -1,8 +1,19 @@
 import hana_ml
+from hana_ml.algorithms.pal.neural_network import MLPClassifier, MLPRegressor
 
 from hana_automl.pipeline.data import Data
+from hana_automl.pipeline.modelres import resolve_model
 from hana_automl.preprocess.preprocessor import Preprocessor
 from hana_automl.utils.error import BlendingError
+from hana_automl.utils.tracing import traced
+
+
+def ensemble_attributes(ensemble, *args, **kwargs) -> dict:
+    """Span attributes of ensemble methods."""
+    return {
+        "ensemble": type(ensemble).__name__,
+        "members": [member.algorithm.title for member in ensemble.model_list],
+    }
 
 
 class Blending:
@@ -32,46 +43,92 @@ class Blending:
     def score(self, data: Data, metric: str):
         pass
 
+    @traced("ensemble.members", attributes=ensemble_attributes)
     def predict(self, data: Data, df: hana_ml.DataFrame):
         predictions = list()
         if data is None and df is None:
             raise BlendingError("Provide valid data for accuracy estimation")
+        if df is not None:
+            source, id_colm, target = df, self.id_col, data.target
+        else:
+            if data.target is None:
+                source = data.valid
+            else:
+                source = data.valid.drop([data.target])
+            id_colm, target = data.id_colm, None
         pr = Preprocessor()
+        # members tuned to the same preprocessing share one imputed/normalized frame
+        preprocessed = dict()
         for model in self.model_list:
-            if df is not None:
-                df2 = pr.autoimput(
-                    df=df,
-                    id=self.id_col,
-                    target=data.target,
-                    strategy_by_col=model.preprocessor.strategy_by_col,
-                    imputer_num_strategy=model.preprocessor.tuned_num_strategy,
-                    normalizer_strategy=model.preprocessor.tuned_normalizer_strategy,
-                    normalizer_z_score_method=model.preprocessor.tuned_z_score_method,
-                    normalize_int=model.preprocessor.tuned_normalize_int,
-                    categorical_list=model.preprocessor.categorical_cols,
-                    normalization_excp=model.preprocessor.normalization_exceptions,
+            key = preprocessing_fingerprint(model.preprocessor)
+            if key not in preprocessed:
+                preprocessed[key] = pr.apply_settings(
+                    source, id_colm, model.preprocessor, target=target
                 )
-            else:
-                if data.target is None:
-                    dt = data.valid
-                else:
-                    dt = data.valid.drop([data.target])
-                df2 = pr.autoimput(
-                    df=dt,
-                    id=data.id_colm,
-                    target=None,
-                    strategy_by_col=model.preprocessor.strategy_by_col,
-                    imputer_num_strategy=model.preprocessor.tuned_num_strategy,
-                    normalizer_strategy=model.preprocessor.tuned_normalizer_strategy,
-                    normalizer_z_score_method=model.preprocessor.tuned_z_score_method,
-                    normalize_int=model.preprocessor.tuned_normalize_int,
-                    categorical_list=model.preprocessor.categorical_cols,
-                    normalization_excp=model.preprocessor.normalization_exceptions,
-                )
-
-            pred = model.algorithm.model.predict(df2, self.id_col)
+            pred = model.algorithm.model.predict(preprocessed[key], self.id_col)
             if type(pred) == tuple:
                 predictions.append(pred[0])
             else:
                 predictions.append(pred)
         return predictions
+
+    def wide_predictions(
+        self, data: Data = None, df: hana_ml.DataFrame = None, id_colm: str = None
+    ) -> hana_ml.DataFrame:
+        """Joins predictions of all ensemble members in one query.
+
+        Returns
+        -------
+        hana_ml.DataFrame
+            Table with columns ID, PREDICTION0, ..., PREDICTIONn (one for each member).
+        """
+        if id_colm is None:
+            id_colm = data.id_colm
+        predictions = Blending.predict(self, data=data, df=df)
+        columns = list()
+        wide = None
+        for i in range(len(predictions)):
+            k = (
+                predictions[i]
+                .select(
+                    id_colm,
+                    predictions[i].columns[
+                        prediction_column(self.model_list[i].algorithm.model)
+                    ],
+                )
+                .rename_columns(["ID_" + str(i), "PREDICTION" + str(i)])
+            )
+            columns.append("PREDICTION" + str(i))
+            if wide is None:
+                wide = k
+            else:
+                wide = wide.join(k, "ID_0=ID_" + str(i)).select(*(["ID_0"] + columns))
+        return wide.rename_columns(["ID"] + columns)
+
+
+def preprocessing_fingerprint(settings) -> tuple:
+    """Returns key that is equal for preprocessor settings producing the same data."""
+    return (
+        repr(settings.strategy_by_col),
+        settings.tuned_num_strategy,
+        settings.tuned_normalizer_strategy,
+        settings.tuned_z_score_method,
+        bool(settings.tuned_normalize_int),
+        (
+            None
+            if settings.categorical_cols is None
+            else repr(sorted(set(settings.categorical_cols)))
+        ),
+        repr(settings.normalization_exceptions),
+        repr(getattr(settings, "compiled_plan", None)),
+    )
+
+
+def prediction_column(model) -> int:
+    """Returns index of column with predicted values in PAL predict output.
+
+    Lazy models of a loaded leaderboard are resolved, so the check sees the PAL model.
+    """
+    if isinstance(resolve_model(model), (MLPClassifier, MLPRegressor)):
+        return 2
+    return 1
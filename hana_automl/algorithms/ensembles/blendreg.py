@@ -1,11 +1,16 @@
 import hana_ml
 from hana_ml.algorithms.pal.metrics import r2_score
 
-from hana_automl.algorithms.ensembles.blending import Blending
+from hana_automl.algorithms.ensembles.blending import (
+    Blending,
+    ensemble_attributes,
+    prediction_column,
+)
 from hana_automl.metric.mae import mae_score
 from hana_automl.metric.mse import mse_score
 from hana_automl.metric.rmse import rmse_score
 from hana_automl.pipeline.data import Data
+from hana_automl.utils.tracing import traced
 
 
 class BlendingReg(Blending):
@@ -26,6 +31,7 @@ class BlendingReg(Blending):
         )
         self.title = "BlendingRegressor"
 
+    @traced("ensemble.predict", attributes=ensemble_attributes)
     def predict(
         self, data: Data = None, df: hana_ml.DataFrame = None, id_colm: str = None
     ):
@@ -34,13 +40,7 @@ class BlendingReg(Blending):
         predictions = super(BlendingReg, self).predict(data=data, df=df)
         pd_res = list()
         for i in range(len(predictions)):
-            if (
-                str(self.model_list[i].algorithm.model).split(" ")[0]
-                == "<hana_ml.algorithms.pal.neural_network.MLPRegressor"
-            ):
-                id_val = 2
-            else:
-                id_val = 1
+            id_val = prediction_column(self.model_list[i].algorithm.model)
             k = (
                 predictions[i]
                 .select(id_colm, predictions[i].columns[id_val])
@@ -62,6 +62,7 @@ class BlendingReg(Blending):
         )
         return joined
 
+    @traced("ensemble.score", attributes=ensemble_attributes)
     def score(self, data: Data, metric: str):
         return self.inner_score(
             data, key=data.id_colm, metric=metric, label=data.target
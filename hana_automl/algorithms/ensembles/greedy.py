@@ -0,0 +1,238 @@
+import hana_ml
+import numpy as np
+import pandas as pd
+
+from hana_automl.algorithms.ensembles.blending import Blending, ensemble_attributes
+from hana_automl.pipeline.data import Data
+from hana_automl.utils.error import BlendingError
+from hana_automl.utils.tracing import traced
+
+
+class GreedyEnsemble(Blending):
+    """Base class for greedy ensemble selection (Caruana et al., 2004).
+
+    Members' validation predictions are pulled to the client once, then members are iteratively
+    added to the ensemble (with replacement) while it improves the validation metric.
+    The selection itself does not call HANA at all.
+
+    Greedy ensembles live in memory only: selection weights aren't persisted, so
+    :meth:`Storage.save_model` raises StorageError for them, and they can't be exported as bundles
+    or served either.
+
+    Attributes
+    ----------
+    iterations : int
+        Number of selection steps (size of the ensemble, counting repeated members).
+    weights : list
+        How many times each member of model_list was selected.
+    valid_score : float
+        Ensemble score on the validation data, computed during selection.
+    """
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        iterations: int = 50,
+    ):
+        if model_list is None and leaderboard is not None:
+            model_list = list(leaderboard)
+        super(GreedyEnsemble, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+        )
+        self.iterations = iterations
+        self.weights = None
+        self.valid_score = None
+
+    @traced("ensemble.fit", attributes=ensemble_attributes)
+    def fit(self, data: Data, metric: str):
+        """Selects ensemble members using predictions on the validation part of data.
+
+        Parameters
+        ----------
+        data : Data
+            Data that was used for leaderboard creation.
+        metric : str
+            Metric to optimize.
+        """
+        wide = self.wide_predictions(data=data)
+        columns = wide.columns[1:]
+        actual = data.valid.select(data.id_colm, data.target).rename_columns(
+            ["ID_A", "ACTUAL"]
+        )
+        joined = wide.join(actual, "ID=ID_A").select(*(columns + ["ACTUAL"])).collect()
+        weights, self.valid_score = self.select(
+            joined[columns].to_numpy(), joined["ACTUAL"].to_numpy(), metric
+        )
+        self.model_list = [
+            member for member, w in zip(self.model_list, weights) if w > 0
+        ]
+        self.weights = [int(w) for w in weights if w > 0]
+
+    def select(self, predictions: np.ndarray, actual: np.ndarray, metric: str):
+        """Runs greedy selection on predictions matrix. Override it in child classes."""
+        pass
+
+    @traced("ensemble.score", attributes=ensemble_attributes)
+    def score(self, data: Data, metric: str):
+        prediction = self.predict(data=data)
+        prediction = prediction.select("ID", "PREDICTION").rename_columns(
+            ["ID_P", "PREDICTION"]
+        )
+        actual = data.valid.select(data.id_colm, data.target).rename_columns(
+            ["ID_A", "ACTUAL"]
+        )
+        joined = (
+            actual.join(prediction, "ID_P=ID_A")
+            .select("ACTUAL", "PREDICTION")
+            .collect()
+        )
+        predictions = joined[["PREDICTION"]].to_numpy()
+        actual = joined["ACTUAL"].to_numpy()
+        if metric == "accuracy":
+            predictions, actual = predictions.astype(str), actual.astype(str)
+        return float(score_matrix(predictions, actual, metric)[0])
+
+    @traced("ensemble.predict", attributes=ensemble_attributes)
+    def predict(
+        self, data: Data = None, df: hana_ml.DataFrame = None, id_colm: str = None
+    ):
+        if self.weights is None:
+            raise BlendingError("Fit ensemble before prediction")
+        wide = self.wide_predictions(data=data, df=df, id_colm=id_colm)
+        return self.combine(wide)
+
+    def combine(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        """Combines members' predictions in SQL. Override it in child classes."""
+        pass
+
+
+def score_matrix(predictions: np.ndarray, actual: np.ndarray, metric: str):
+    """Computes metric for every column of predictions matrix at once."""
+    if metric == "accuracy":
+        return np.mean(predictions == actual[:, None], axis=0)
+    err = predictions.astype(float) - actual.astype(float)[:, None]
+    if metric == "mse":
+        return np.mean(err**2, axis=0)
+    if metric == "rmse":
+        return np.sqrt(np.mean(err**2, axis=0))
+    if metric == "mae":
+        return np.mean(np.abs(err), axis=0)
+    if metric == "r2_score":
+        actual = actual.astype(float)
+        sst = np.sum((actual - actual.mean()) ** 2)
+        return 1 - np.sum(err**2, axis=0) / sst
+    raise BlendingError(f"Metric {metric} is not supported!")
+
+
+def greedy_selection(
+    predictions: np.ndarray, actual: np.ndarray, metric: str, iterations: int
+):
+    """Greedy ensemble selection with replacement for regression.
+
+    Parameters
+    ----------
+    predictions : np.ndarray
+        Matrix of shape (rows, members) with members' predictions.
+    actual : np.ndarray
+        True values.
+    metric : str
+        'r2_score', 'mse', 'rmse' or 'mae'.
+    iterations : int
+        Number of selection steps.
+
+    Returns
+    -------
+    weights, score
+        Times each member was selected in the best ensemble and its score.
+    """
+    predictions = predictions.astype(float)
+    actual = actual.astype(float)
+    maximize = metric == "r2_score"
+    squares = np.sum(predictions**2, axis=0)
+    weights = np.zeros(predictions.shape[1], dtype=int)
+    best_weights, best_score = None, None
+    total = np.zeros(predictions.shape[0])
+    for step in range(1, iterations + 1):
+        if metric == "mae":
+            scores = score_matrix((total[:, None] + predictions) / step, actual, metric)
+        else:
+            # sum of squared errors of (total + p) / step for every column p, without building the matrix
+            residual = total / step - actual
+            sse = (
+                residual @ residual
+                + 2 / step * (residual @ predictions)
+                + squares / step**2
+            )
+            scores = sse_to_score(sse, actual, metric)
+        member = np.argmax(scores) if maximize else np.argmin(scores)
+        weights[member] += 1
+        total += predictions[:, member]
+        if (
+            best_score is None
+            or (maximize and scores[member] > best_score)
+            or (not maximize and scores[member] < best_score)
+        ):
+            best_weights, best_score = weights.copy(), scores[member]
+    return best_weights, float(best_score)
+
+
+def sse_to_score(sse: np.ndarray, actual: np.ndarray, metric: str):
+    if metric == "mse":
+        return sse / len(actual)
+    if metric == "rmse":
+        return np.sqrt(sse / len(actual))
+    if metric == "r2_score":
+        return 1 - sse / np.sum((actual - actual.mean()) ** 2)
+    raise BlendingError(f"Metric {metric} is not supported!")
+
+
+def greedy_vote_selection(predictions: np.ndarray, actual: np.ndarray, iterations: int):
+    """Greedy ensemble selection with replacement for classification (weighted voting, accuracy).
+
+    Ties are resolved in favour of the class that is first in sorted order.
+
+    Returns
+    -------
+    weights, score, classes
+        Times each member was selected in the best ensemble, its accuracy and sorted class labels.
+    """
+    labels = pd.Series(np.concatenate([predictions.ravel(), actual])).astype(str)
+    codes, classes = pd.factorize(labels, sort=True)
+    n_rows, n_members = predictions.shape
+    member_codes = codes[: n_rows * n_members].reshape(n_rows, n_members)
+    actual_codes = codes[n_rows * n_members :]
+    rows = np.arange(n_rows)
+    votes = np.zeros((n_rows, len(classes)), dtype=np.int32)
+    # votes that class predicted by each member currently has
+    member_votes = np.zeros((n_rows, n_members), dtype=np.int32)
+    member_correct = member_codes == actual_codes[:, None]
+    weights = np.zeros(n_members, dtype=int)
+    best_weights, best_score = None, None
+    for _ in range(iterations):
+        # adding a member gives one vote to its class, other classes keep their votes
+        leader = np.argmax(votes, axis=1)
+        leader_votes = votes[rows, leader][:, None]
+        wins = (member_votes + 1 > leader_votes) | (
+            (member_votes + 1 == leader_votes) & (member_codes < leader[:, None])
+        )
+        leader_correct = leader == actual_codes
+        correct = np.count_nonzero(wins & member_correct, axis=0) + np.count_nonzero(
+            ~wins & leader_correct[:, None], axis=0
+        )
+        member = np.argmax(correct)
+        weights[member] += 1
+        selected = member_codes[:, member]
+        votes[rows, selected] += 1
+        member_votes += member_codes == selected[:, None]
+        score = correct[member] / n_rows
+        if best_score is None or score > best_score:
+            best_weights, best_score = weights.copy(), score
+    return best_weights, float(best_score), list(classes)
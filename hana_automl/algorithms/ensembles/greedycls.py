@@ -0,0 +1,73 @@
+import hana_ml
+import numpy as np
+
+from hana_automl.algorithms.ensembles.greedy import (
+    GreedyEnsemble,
+    greedy_vote_selection,
+)
+
+
+class GreedyEnsembleCls(GreedyEnsemble):
+    """Greedy ensemble selection for classification. Prediction is a weighted vote of members."""
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        iterations: int = 50,
+    ):
+        super(GreedyEnsembleCls, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+            iterations,
+        )
+        self.title = "GreedyEnsembleClassifier"
+        self.classes = None
+
+    def select(self, predictions: np.ndarray, actual: np.ndarray, metric: str):
+        weights, score, self.classes = greedy_vote_selection(
+            predictions, actual, self.iterations
+        )
+        return weights, score
+
+    def combine(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        literals = ["'" + str(c).replace("'", "''") + "'" for c in self.classes]
+        if len(literals) == 1:
+            return wide.select("ID", (literals[0], "PREDICTION"))
+        votes = wide.select(
+            "ID",
+            *[
+                (
+                    " + ".join(
+                        [
+                            f"{w} * (CASE WHEN TO_NVARCHAR(PREDICTION{i}) = {literal} THEN 1 ELSE 0 END)"
+                            for i, w in enumerate(self.weights)
+                        ]
+                    ),
+                    f"VOTES{k}",
+                )
+                for k, literal in enumerate(literals)
+            ],
+        )
+        # ties are resolved in favour of the first class, same as in greedy_vote_selection
+        cases = " ".join(
+            [
+                "WHEN "
+                + " AND ".join(
+                    [
+                        f"VOTES{k} >= VOTES{other}"
+                        for other in range(len(literals))
+                        if other != k
+                    ]
+                )
+                + f" THEN {literal}"
+                for k, literal in enumerate(literals)
+            ]
+        )
+        return votes.select("ID", (f"CASE {cases} END", "PREDICTION"))
@@ -0,0 +1,36 @@
+import hana_ml
+import numpy as np
+
+from hana_automl.algorithms.ensembles.greedy import GreedyEnsemble, greedy_selection
+
+
+class GreedyEnsembleReg(GreedyEnsemble):
+    """Greedy ensemble selection for regression. Prediction is a weighted average of members."""
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.dataframe.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        iterations: int = 50,
+    ):
+        super(GreedyEnsembleReg, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+            iterations,
+        )
+        self.title = "GreedyEnsembleRegressor"
+
+    def select(self, predictions: np.ndarray, actual: np.ndarray, metric: str):
+        return greedy_selection(predictions, actual, metric, self.iterations)
+
+    def combine(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        weighted = " + ".join(
+            [f"{w} * TO_DOUBLE(PREDICTION{i})" for i, w in enumerate(self.weights)]
+        )
+        return wide.select("ID", (f"({weighted}) / {sum(self.weights)}", "PREDICTION"))
@@ -0,0 +1,66 @@
+import hana_ml
+from hana_ml.algorithms.pal.linear_model import LogisticRegression
+from hana_ml.algorithms.pal.metrics import accuracy_score
+
+from hana_automl.algorithms.ensembles.blending import ensemble_attributes
+from hana_automl.algorithms.ensembles.stacking import Stacking
+from hana_automl.pipeline.data import Data
+from hana_automl.utils.tracing import traced
+
+
+class StackingCls(Stacking):
+    """Stacking classifier. Logistic regression is used as a meta-model,
+    members' predicted classes are passed to it as categorical features."""
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        n_models: int = 3,
+    ):
+        super(StackingCls, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+            n_models,
+        )
+        self.title = "StackingClassifier"
+
+    def create_meta_model(self, data: Data):
+        vals = data.test.select(data.target).distinct().collect()[data.target]
+        if len(vals) > 2:
+            return LogisticRegression(multi_class=True)
+        if type(vals[0]) is str and type(vals[1]) is str:
+            return LogisticRegression(
+                multi_class=False, class_map0=vals[0], class_map1=vals[1]
+            )
+        return LogisticRegression(multi_class=False)
+
+    def meta_features(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        return wide.select(
+            *(["ID"] + [(f"TO_NVARCHAR({col})", col) for col in self.features])
+        )
+
+    def categorical_features(self):
+        return self.features
+
+    @traced("ensemble.score", attributes=ensemble_attributes)
+    def score(self, data: Data, metric: str):
+        return self.inner_score(
+            data, key=data.id_colm, metric=metric, label=data.target
+        )
+
+    def inner_score(self, data: Data, key: str, metric: str, label: str = None):
+        prediction = self.predict(data=data)
+        prediction = prediction.select("ID", "PREDICTION").rename_columns(
+            ["ID_P", "PREDICTION"]
+        )
+        actual = data.valid.select(key, label).rename_columns(["ID_A", "ACTUAL"])
+        joined = actual.join(prediction, "ID_P=ID_A").select("ACTUAL", "PREDICTION")
+        if metric == "accuracy":
+            return accuracy_score(joined, label_true="ACTUAL", label_pred="PREDICTION")
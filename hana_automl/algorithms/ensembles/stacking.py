@@ -0,0 +1,112 @@
+import hana_ml
+
+from hana_automl.algorithms.ensembles.blending import Blending, ensemble_attributes
+from hana_automl.pipeline.data import Data
+from hana_automl.utils.error import BlendingError
+from hana_automl.utils.tracing import traced
+
+
+class Stacking(Blending):
+    """Base class for stacking ensembles.
+
+    Base models from the leaderboard predict on the test part of the data (which they were not trained on),
+    and a PAL meta-model is fitted on these out-of-fold predictions.
+
+    Stacking ensembles live in memory only: :meth:`Storage.save_model` raises StorageError for
+    them, so they can't be exported as bundles or served either.
+
+    Attributes
+    ----------
+    meta_model
+        HANA PAL model that combines predictions of ensemble members.
+    features : list
+        Names of meta-model features (one column per ensemble member).
+    """
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        n_models: int = 3,
+    ):
+        if model_list is None and leaderboard is not None:
+            model_list = leaderboard[:n_models]
+        super(Stacking, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+        )
+        self.meta_model = None
+        self.features = ["PREDICTION" + str(i) for i in range(len(self.model_list))]
+
+    def create_meta_model(self, data: Data):
+        """Returns unfitted PAL meta-model. Override it in child classes."""
+        pass
+
+    def meta_features(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        """Converts wide table of members' predictions to meta-model input."""
+        return wide
+
+    @traced("ensemble.fit", attributes=ensemble_attributes)
+    def fit(self, data: Data):
+        """Fits meta-model on members' predictions for the test part of data.
+
+        Parameters
+        ----------
+        data : Data
+            Data that was used for leaderboard creation.
+        """
+        if len(self.model_list) < 2:
+            raise BlendingError("Stacking needs at least 2 models from leaderboard")
+        wide = self.save_predictions(
+            Data(valid=data.test, target=data.target, id_col=data.id_colm),
+            "_stacking",
+        )
+        actual = data.test.select(data.id_colm, data.target).rename_columns(
+            ["ID_A", "ACTUAL"]
+        )
+        train = (
+            self.meta_features(wide)
+            .join(actual, "ID=ID_A")
+            .select(*(["ID"] + self.features + ["ACTUAL"]))
+        )
+        self.meta_model = self.create_meta_model(data)
+        self.meta_model.fit(
+            data=train,
+            key="ID",
+            features=self.features,
+            label="ACTUAL",
+            categorical_variable=self.categorical_features(),
+        )
+
+    def categorical_features(self):
+        return None
+
+    @traced("ensemble.predict", attributes=ensemble_attributes)
+    def predict(
+        self, data: Data = None, df: hana_ml.DataFrame = None, id_colm: str = None
+    ):
+        if self.meta_model is None:
+            raise BlendingError("Fit stacking ensemble before prediction")
+        wide = self.wide_predictions(data=data, df=df, id_colm=id_colm)
+        res = self.meta_model.predict(
+            self.meta_features(wide), key="ID", features=self.features
+        )
+        if type(res) == tuple:
+            res = res[0]
+        return res.select(res.columns[0], res.columns[1]).rename_columns(
+            ["ID", "PREDICTION"]
+        )
+
+    def save_predictions(self, data: Data, suffix: str) -> hana_ml.DataFrame:
+        """Materializes wide table of members' predictions, so it is computed once and reused."""
+        if self.table_name is None:
+            self.table_name = "#TEMP_TABLE"
+        return self.wide_predictions(data=data).save(
+            self.table_name + suffix, force=True
+        )
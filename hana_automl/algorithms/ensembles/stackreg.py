@@ -0,0 +1,64 @@
+import hana_ml
+from hana_ml.algorithms.pal.linear_model import LinearRegression
+from hana_ml.algorithms.pal.metrics import r2_score
+
+from hana_automl.algorithms.ensembles.blending import ensemble_attributes
+from hana_automl.algorithms.ensembles.stacking import Stacking
+from hana_automl.metric.mae import mae_score
+from hana_automl.metric.mse import mse_score
+from hana_automl.metric.rmse import rmse_score
+from hana_automl.pipeline.data import Data
+from hana_automl.utils.tracing import traced
+
+
+class StackingReg(Stacking):
+    """Stacking regressor. Linear regression is used as a meta-model."""
+
+    def __init__(
+        self,
+        id_col: str = None,
+        connection_context: hana_ml.dataframe.ConnectionContext = None,
+        table_name: str = None,
+        model_list: list = None,
+        leaderboard: list = None,
+        n_models: int = 3,
+    ):
+        super(StackingReg, self).__init__(
+            id_col,
+            connection_context,
+            table_name,
+            model_list,
+            leaderboard,
+            n_models,
+        )
+        self.title = "StackingRegressor"
+
+    def create_meta_model(self, data: Data):
+        return LinearRegression()
+
+    def meta_features(self, wide: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        return wide.select(
+            *(["ID"] + [(f"TO_DOUBLE({col})", col) for col in self.features])
+        )
+
+    @traced("ensemble.score", attributes=ensemble_attributes)
+    def score(self, data: Data, metric: str):
+        return self.inner_score(
+            data, key=data.id_colm, metric=metric, label=data.target
+        )
+
+    def inner_score(self, data: Data, key: str, metric: str, label: str = None):
+        prediction = self.predict(data=data)
+        prediction = prediction.select("ID", "PREDICTION").rename_columns(
+            ["ID_P", "PREDICTION"]
+        )
+        actual = data.valid.select(key, label).rename_columns(["ID_A", "ACTUAL"])
+        joined = actual.join(prediction, "ID_P=ID_A").select("ACTUAL", "PREDICTION")
+        if metric == "r2_score":
+            return r2_score(joined, label_true="ACTUAL", label_pred="PREDICTION")
+        if metric == "mae":
+            return mae_score(df=joined)
+        if metric == "mse":
+            return mse_score(df=joined)
+        if metric == "rmse":
+            return rmse_score(df=joined)
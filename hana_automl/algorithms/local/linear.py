@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from hana_automl.utils.error import ExportError
+
+INTERCEPT = "__PAL_INTERCEPT__"
+DELIMITER = "__PAL_DELIMIT__"
+
+
+class LinearModel:
+    """Coefficients table of a PAL linear model as NumPy vectors.
+
+    Categorical variables are stored by PAL as one coefficient per value
+    (VARIABLE__PAL_DELIMIT__VALUE), they become 0/1 indicator columns here.
+
+    Attributes
+    ----------
+    terms : list
+        (column, value) pairs; value is None for numeric columns.
+    weights : np.ndarray
+        Matrix of shape (terms, classes) with coefficients.
+    intercept : np.ndarray
+        Intercept for every class.
+    classes : list
+        Class labels for multi-class models, None otherwise.
+    """
+
+    def __init__(self, coefficients: pd.DataFrame):
+        names = coefficients["VARIABLE_NAME"].astype(str).to_numpy()
+        value_column = [
+            c for c in ["COEFFICIENT", "COEFFICIENT_VALUE"] if c in coefficients.columns
+        ][0]
+        values = coefficients[value_column].astype(float).to_numpy()
+        if "CLASS" in coefficients.columns:
+            labels = coefficients["CLASS"].to_numpy()
+            self.classes = list(pd.unique(labels))
+        else:
+            labels = np.zeros(len(names))
+            self.classes = None
+        columns = [0] if self.classes is None else self.classes
+        self.terms = list()
+        for name in names:
+            if name == INTERCEPT:
+                continue
+            if DELIMITER in name:
+                term = tuple(name.split(DELIMITER, 1))
+            else:
+                term = (name, None)
+            if term not in self.terms:
+                self.terms.append(term)
+        self.weights = np.zeros((len(self.terms), len(columns)))
+        self.intercept = np.zeros(len(columns))
+        for name, label, value in zip(names, labels, values):
+            column = columns.index(label)
+            if name == INTERCEPT:
+                self.intercept[column] = value
+            elif DELIMITER in name:
+                self.weights[
+                    self.terms.index(tuple(name.split(DELIMITER, 1))), column
+                ] = value
+            else:
+                self.weights[self.terms.index((name, None)), column] = value
+
+    def decision(self, df: pd.DataFrame) -> np.ndarray:
+        """Returns linear part of the model for every row and class."""
+        matrix = np.zeros((len(df), len(self.terms)))
+        for i, (name, value) in enumerate(self.terms):
+            if name not in df.columns:
+                raise ExportError(f"Column {name} is missing in data")
+            if value is None:
+                matrix[:, i] = pd.to_numeric(df[name], errors="coerce")
+            else:
+                matrix[:, i] = df[name].astype(str).to_numpy() == value
+        return matrix @ self.weights + self.intercept
+
+
+class LogisticModel(LinearModel):
+    """PAL LogisticRegression. Output matches PAL predict: CLASS and PROBABILITY
+    (of the positive class for binary models, of the predicted class otherwise)."""
+
+    def __init__(self, coefficients: pd.DataFrame, class_map0=0, class_map1=1):
+        super(LogisticModel, self).__init__(coefficients)
+        self.class_map0 = class_map0
+        self.class_map1 = class_map1
+
+    def predict(self, df: pd.DataFrame):
+        decision = self.decision(df)
+        if self.classes is None:
+            probability = 1 / (1 + np.exp(-decision[:, 0]))
+            labels = np.where(probability > 0.5, self.class_map1, self.class_map0)
+            return labels, probability
+        decision = np.exp(decision - decision.max(axis=1, keepdims=True))
+        probability = decision / decision.sum(axis=1, keepdims=True)
+        winner = np.argmax(probability, axis=1)
+        return (
+            np.array(self.classes, dtype=object)[winner],
+            probability[np.arange(len(df)), winner],
+        )
+
+
+class ExponentialModel(LinearModel):
+    """PAL ExponentialRegression: y = b0 * exp(b1 * x1 + ... + bn * xn)."""
+
+    def predict(self, df: pd.DataFrame):
+        decision = self.decision(df)[:, 0] - self.intercept[0]
+        return self.intercept[0] * np.exp(decision), None
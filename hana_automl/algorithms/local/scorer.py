@@ -0,0 +1,125 @@
+import pandas as pd
+from hana_ml.algorithms.pal.linear_model import LogisticRegression
+from hana_ml.algorithms.pal.regression import ExponentialRegression
+from hana_ml.algorithms.pal.trees import (
+    DecisionTreeClassifier,
+    DecisionTreeRegressor,
+    RDTClassifier,
+    RDTRegressor,
+)
+
+from hana_automl.algorithms.local.linear import ExponentialModel, LogisticModel
+from hana_automl.algorithms.local.trees import Forest
+from hana_automl.pipeline.modelres import resolve_model
+from hana_automl.preprocess.plan import PreprocessingPlan
+from hana_automl.utils.error import ExportError
+
+
+class LocalScorer:
+    """Scores pandas data in-process, without a database round trip.
+
+    Attributes
+    ----------
+    model
+        Exported model: Forest, LogisticModel or ExponentialModel.
+    plan : PreprocessingPlan
+        Compiled preprocessing, applied before the model. None if data is already preprocessed.
+    columns : list
+        Names of output columns after the ID column, the same as in PAL predict output.
+    """
+
+    def __init__(self, model, plan: PreprocessingPlan = None, columns: list = None):
+        self.model = model
+        self.plan = plan
+        self.columns = columns
+
+    def predict(self, df: pd.DataFrame, key: str) -> pd.DataFrame:
+        """Makes predictions.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Raw data, like the one passed to :meth:`hana_automl.automl.AutoML.predict`.
+        key : str
+            ID column.
+
+        Returns
+        -------
+        pandas.DataFrame
+            ID column and prediction columns named like in PAL predict output.
+        """
+        if self.plan is not None:
+            df = self.plan.transform(df)
+        prediction, confidence = self.model.predict(df)
+        result = pd.DataFrame({key: df[key].to_numpy(), self.columns[0]: prediction})
+        if len(self.columns) > 1:
+            result[self.columns[1]] = confidence
+        return result
+
+
+def export_model(algorithm, preprocessor=None) -> LocalScorer:
+    """Reads fitted model tables of algorithm and converts them for local scoring.
+
+    Supported are DecisionTreeCls/Reg, RDTCls/Reg, LogRegressionCls and ExponentialReg.
+    Decision trees must be fitted with model_format='pmml' (done by the algorithm wrappers).
+
+    Parameters
+    ----------
+    algorithm : BaseAlgorithm
+        Fitted algorithm.
+    preprocessor : PreprocessorSettings
+        Tuned preprocessor settings. Their compiled plan is applied before scoring.
+
+    Returns
+    -------
+    LocalScorer
+        Scorer with exported model.
+    """
+    model = resolve_model(algorithm.model)
+    plan = None
+    if preprocessor is not None:
+        plan = PreprocessingPlan.from_dict(getattr(preprocessor, "compiled_plan", None))
+        if plan is None:
+            raise ExportError("Preprocessing of this model can't be compiled")
+    if isinstance(
+        model,
+        (DecisionTreeClassifier, DecisionTreeRegressor, RDTClassifier, RDTRegressor),
+    ):
+        forest = Forest(pmml_documents(model.model_.collect()))
+        return LocalScorer(forest, plan, ["SCORE", "CONFIDENCE"])
+    if isinstance(model, LogisticRegression):
+        logistic = LogisticModel(coefficients(model, "coef_"))
+        if getattr(algorithm, "class_map0", None) is not None:
+            logistic.class_map0 = algorithm.class_map0
+            logistic.class_map1 = algorithm.class_map1
+        return LocalScorer(logistic, plan, ["CLASS", "PROBABILITY"])
+    if isinstance(model, ExponentialRegression):
+        exponential = ExponentialModel(coefficients(model, "coefficients_"))
+        return LocalScorer(exponential, plan, ["VALUE"])
+    raise ExportError(f"Local scoring of {algorithm.title} is not supported")
+
+
+def coefficients(model, attribute: str) -> pd.DataFrame:
+    """Collects coefficients table, which is model_ for models loaded from storage."""
+    table = getattr(model, attribute, None)
+    if table is None:
+        table = model.model_
+    return table.collect()
+
+
+def pmml_documents(table: pd.DataFrame) -> list:
+    """Joins MODEL_CONTENT chunks of a PAL model table into one PMML document per tree."""
+    if "MODEL_CONTENT" not in table.columns:
+        raise ExportError("Model is not stored in PMML format")
+    order = [c for c in ["TREE_INDEX", "ROW_INDEX"] if c in table.columns]
+    table = table.sort_values(order)
+    if "TREE_INDEX" not in table.columns:
+        documents = ["".join(table["MODEL_CONTENT"])]
+    else:
+        documents = [
+            "".join(group["MODEL_CONTENT"])
+            for _, group in table.groupby("TREE_INDEX", sort=True)
+        ]
+    if not documents[0].lstrip().startswith("<"):
+        raise ExportError("Model is not stored in PMML format")
+    return documents
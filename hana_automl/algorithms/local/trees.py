@@ -0,0 +1,308 @@
+import xml.etree.ElementTree as ET
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from hana_automl.utils.error import ExportError
+
+# predicate codes
+TRUE, FALSE = 0, 1
+LESS, LESS_EQUAL, GREATER, GREATER_EQUAL = 2, 3, 4, 5
+EQUAL, NOT_EQUAL, MISSING, NOT_MISSING = 6, 7, 8, 9
+IN, NOT_IN = 10, 11
+
+OPERATORS = {
+    "lessThan": LESS,
+    "lessOrEqual": LESS_EQUAL,
+    "greaterThan": GREATER,
+    "greaterOrEqual": GREATER_EQUAL,
+    "equal": EQUAL,
+    "notEqual": NOT_EQUAL,
+    "isMissing": MISSING,
+    "isNotMissing": NOT_MISSING,
+}
+
+
+class Forest:
+    """Trees from PMML, flattened into NumPy arrays and scored all at once.
+
+    Every node keeps the predicate that leads to it from its parent. Children of a node are
+    stored next to each other, starting at `first_child`, so a batch of rows walks down all
+    trees together:
+    on each level every row tests children of its current node in order and moves to the first
+    matching one, as PMML prescribes. Rows stop at leaves or when no child matches.
+
+    Attributes
+    ----------
+    features : list
+        Input column names, in order of feature indexes.
+    categories : dict
+        Codes of category values for categorical features.
+    classes : list
+        Class labels for classification, None for regression.
+    roots : np.ndarray
+        Root node of every tree.
+    """
+
+    def __init__(self, documents: list):
+        self.features = list()
+        self.categories = dict()
+        self.classes = None
+        self.categorical = set()
+        nodes = list()
+        roots = list()
+        for document in documents:
+            pmml = ET.fromstring(document)
+            for field in pmml.iter():
+                if local_name(field) == "DataField" and (
+                    field.get("optype") == "categorical"
+                    or field.get("dataType") == "string"
+                ):
+                    self.categorical.add(field.get("name"))
+            for tree in tree_models(pmml):
+                classification = tree.get("functionName") == "classification"
+                if classification and self.classes is None:
+                    self.classes = list()
+                root = find(tree, "Node")
+                roots.append(len(nodes))
+                self.__flatten(root, nodes)
+        if len(roots) == 0:
+            raise ExportError("Model doesn't contain any TreeModel")
+        self.roots = np.array(roots)
+        self.__build(nodes)
+
+    def __flatten(self, root, nodes: list):
+        # breadth first, so that children of every node are stored next to each other
+        queue = deque([(root, len(nodes))])
+        nodes.append(None)
+        while queue:
+            element, index = queue.popleft()
+            children = [c for c in element if local_name(c) == "Node"]
+            first = len(nodes)
+            nodes.extend([None] * len(children))
+            nodes[index] = self.__node(element, first, len(children))
+            queue.extend((child, first + i) for i, child in enumerate(children))
+
+    def __node(self, element, first: int, count: int) -> tuple:
+        feature, op, threshold, values = self.__predicate(element)
+        score = element.get("score")
+        counts = dict()
+        for distribution in element:
+            if local_name(distribution) == "ScoreDistribution":
+                counts[distribution.get("value")] = float(
+                    distribution.get("probability", distribution.get("recordCount"))
+                )
+        if self.classes is not None:
+            if score is not None and score not in self.classes:
+                self.classes.append(score)
+            total = sum(counts.values())
+            confidence = counts.get(score, total) / total if total > 0 else 1.0
+            score = -1 if score is None else self.classes.index(score)
+        else:
+            score = np.nan if score is None else float(score)
+            confidence = 1.0
+        return feature, op, threshold, values, first, count, score, confidence
+
+    def __predicate(self, element):
+        for predicate in element:
+            name = local_name(predicate)
+            if name == "CompoundPredicate":
+                if predicate.get("booleanOperator") != "surrogate":
+                    raise ExportError(
+                        f"Predicate {predicate.get('booleanOperator')} is not supported"
+                    )
+                # values are imputed, so the first (main) predicate always decides
+                predicate = [p for p in predicate][0]
+                name = local_name(predicate)
+            if name == "True":
+                return -1, TRUE, np.nan, None
+            if name == "False":
+                return -1, FALSE, np.nan, None
+            if name == "SimplePredicate":
+                feature = self.__feature(predicate.get("field"))
+                op = OPERATORS[predicate.get("operator")]
+                value = predicate.get("value")
+                categorical = self.features[feature] in self.categorical
+                if op in [EQUAL, NOT_EQUAL] and categorical:
+                    return feature, op, self.__code(feature, value), None
+                return feature, op, np.nan if value is None else float(value), None
+            if name == "SimpleSetPredicate":
+                feature = self.__feature(predicate.get("field"))
+                op = IN if predicate.get("booleanOperator") == "isIn" else NOT_IN
+                values = parse_array(find(predicate, "Array"))
+                return feature, op, np.nan, [self.__code(feature, v) for v in values]
+        return -1, TRUE, np.nan, None
+
+    def __feature(self, name: str) -> int:
+        if name not in self.features:
+            self.features.append(name)
+        return self.features.index(name)
+
+    def __code(self, feature: int, value: str) -> int:
+        codes = self.categories.setdefault(self.features[feature], dict())
+        return codes.setdefault(value, len(codes))
+
+    def __build(self, nodes: list):
+        self.feature = np.array([n[0] for n in nodes])
+        self.op = np.array([n[1] for n in nodes])
+        self.threshold = np.array([n[2] for n in nodes], dtype=float)
+        self.first_child = np.array([n[4] for n in nodes])
+        self.child_count = np.array([n[5] for n in nodes])
+        self.score = np.array([n[6] for n in nodes])
+        self.confidence = np.array([n[7] for n in nodes], dtype=float)
+        self.max_children = int(self.child_count.max())
+        # membership matrix with a row for every node with set predicate
+        with_sets = [i for i, node in enumerate(nodes) if node[3] is not None]
+        width = max([len(c) for c in self.categories.values()] + [1])
+        self.set_row = np.full(len(nodes), -1)
+        self.set_row[with_sets] = np.arange(len(with_sets))
+        self.sets = np.zeros((len(with_sets) + 1, width), dtype=bool)
+        for row, i in enumerate(with_sets):
+            self.sets[row, nodes[i][3]] = True
+
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        """Converts input columns to a float matrix, categories to their codes (-1 if unknown)."""
+        matrix = np.empty((len(df), len(self.features)))
+        for i, name in enumerate(self.features):
+            if name not in df.columns:
+                raise ExportError(f"Column {name} is missing in data")
+            column = df[name]
+            if name in self.categorical:
+                codes = self.categories.get(name, dict())
+                matrix[:, i] = [
+                    np.nan if pd.isnull(v) else codes.get(category(v), -1)
+                    for v in column
+                ]
+            else:
+                matrix[:, i] = pd.to_numeric(column, errors="coerce")
+        return matrix
+
+    def leaves(self, matrix: np.ndarray) -> np.ndarray:
+        """Returns reached node for every row (axis 0) and tree (axis 1)."""
+        n_rows, n_trees = len(matrix), len(self.roots)
+        rows = np.repeat(np.arange(n_rows), n_trees)
+        current = np.tile(self.roots, n_rows)
+        active = np.flatnonzero(self.child_count[current] > 0)
+        while len(active) > 0:
+            moved = np.zeros(len(active), dtype=bool)
+            for k in range(self.max_children):
+                candidates = np.flatnonzero(
+                    ~moved & (k < self.child_count[current[active]])
+                )
+                if len(candidates) == 0:
+                    break
+                nodes = self.first_child[current[active[candidates]]] + k
+                matched = self.__test(nodes, matrix, rows[active[candidates]])
+                current[active[candidates[matched]]] = nodes[matched]
+                moved[candidates[matched]] = True
+            active = active[moved]
+            active = active[self.child_count[current[active]] > 0]
+        return current.reshape(n_rows, n_trees)
+
+    def __test(self, nodes: np.ndarray, matrix: np.ndarray, rows: np.ndarray):
+        op = self.op[nodes]
+        feature = self.feature[nodes]
+        value = matrix[rows, np.maximum(feature, 0)]
+        threshold = self.threshold[nodes]
+        missing = np.isnan(value)
+        codes = np.where(missing | (value < 0), -1, value).astype(int)
+        # nodes without set predicate point to the last, empty row
+        codes = np.clip(codes, -1, self.sets.shape[1] - 1)
+        in_set = (codes >= 0) & self.sets[self.set_row[nodes], np.maximum(codes, 0)]
+        with np.errstate(invalid="ignore"):
+            return np.select(
+                [
+                    op == TRUE,
+                    op == LESS,
+                    op == LESS_EQUAL,
+                    op == GREATER,
+                    op == GREATER_EQUAL,
+                    op == EQUAL,
+                    op == NOT_EQUAL,
+                    op == MISSING,
+                    op == NOT_MISSING,
+                    op == IN,
+                    op == NOT_IN,
+                ],
+                [
+                    True,
+                    value < threshold,
+                    value <= threshold,
+                    value > threshold,
+                    value >= threshold,
+                    value == threshold,
+                    ~missing & (value != threshold),
+                    missing,
+                    ~missing,
+                    in_set,
+                    ~missing & ~in_set,
+                ],
+                False,
+            )
+
+    def predict(self, df: pd.DataFrame):
+        """Returns predictions and confidences.
+
+        Classification uses majority vote of the trees, confidence is the share of votes
+        (for a single tree, share of training records in the leaf).
+        Regression uses mean of the trees.
+        """
+        leaves = self.leaves(self.encode(df))
+        if self.classes is None:
+            return self.score[leaves].mean(axis=1), None
+        if len(self.roots) == 1:
+            return (
+                np.array(self.classes, dtype=object)[self.score[leaves[:, 0]]],
+                self.confidence[leaves[:, 0]],
+            )
+        votes = np.zeros((len(df), len(self.classes)))
+        rows = np.repeat(np.arange(len(df)), len(self.roots))
+        np.add.at(votes, (rows, self.score[leaves].ravel()), 1)
+        winner = np.argmax(votes, axis=1)
+        return (
+            np.array(self.classes, dtype=object)[winner],
+            votes[np.arange(len(df)), winner] / len(self.roots),
+        )
+
+
+def tree_models(element):
+    """Finds all TreeModel elements, including segments of a MiningModel."""
+    if local_name(element) == "TreeModel":
+        return [element]
+    return [e for e in element.iter() if local_name(e) == "TreeModel"]
+
+
+def local_name(element) -> str:
+    return element.tag.split("}")[-1]
+
+
+def find(element, name: str):
+    for child in element:
+        if local_name(child) == name:
+            return child
+    return None
+
+
+def parse_array(element) -> list:
+    text = element.text or ""
+    values, current, quoted = list(), "", False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif char.isspace() and not quoted:
+            if current:
+                values.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        values.append(current)
+    return values
+
+
+def category(value) -> str:
+    """String form of a category value, as it is written in PMML."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,48 @@
+"""Built-in algorithms by title.
+
+Algorithm modules import their PAL estimators, so they are imported only when an algorithm is
+created. Loading a stored model imports the module of its algorithm and nothing else.
+"""
+
+import importlib
+
+CLASSIFIERS = {
+    "KNeighborsClassifier": "classification.kneighborscls.KNeighborsCls",
+    "DecisionTreeClassifier": "classification.decisiontreecls.DecisionTreeCls",
+    "LogisticRegressionClassifier": "classification.logregressioncls.LogRegressionCls",
+    "NaiveBayesClassifier": "classification.naive_bayes.NBayesCls",
+    "MLPClassifier": "classification.mlpcl.MLPcls",
+    "SupportVectorClassifier": "classification.svc.SVCls",
+    "RandomDecisionTreeClassifier": "classification.rdtclas.RDTCls",
+    "GradientBoostingClassifier": "classification.gradboostcls.GBCls",
+    "HybridGradientBoostingClassifier": "classification.hybgradboostcls.HGBCls",
+}
+REGRESSORS = {
+    "DecisionTreeRegressor": "regression.decisiontreereg.DecisionTreeReg",
+    "GLMRegressor": "regression.glmreg.GLMReg",
+    "ExponentialRegressor": "regression.expreg.ExponentialReg",
+    "MLPRegressor": "regression.mlpreg.MLPreg",
+    "Random_Decision_Tree_Regressor": "regression.rdtreg.RDTReg",
+    "SupportVectorRegressor": "regression.svr.SVReg",
+    "GradientBoostingRegressor": "regression.gradboostreg.GBReg",
+    "HybridGradientBoostingRegressor": "regression.hybgradboostreg.HGBReg",
+    "KNNRegressor": "regression.kneighborsreg.KNeighborsReg",
+}
+
+
+def algorithm_class(title: str):
+    """Imports and returns class of the algorithm with given title.
+
+    Raises
+    ------
+    KeyError
+        If there is no built-in algorithm with this title.
+    """
+    path = CLASSIFIERS[title] if title in CLASSIFIERS else REGRESSORS[title]
+    module, name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(f"hana_automl.algorithms.{module}"), name)
+
+
+def create(title: str, **kwargs):
+    """Returns new instance of the algorithm with given title."""
+    return algorithm_class(title)(**kwargs)
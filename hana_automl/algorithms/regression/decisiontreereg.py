@@ -19,7 +19,8 @@ class DecisionTreeReg(BaseAlgorithm):
         params["min_records_of_parent"] = round(params["min_records_of_parent"])
         params["max_depth"] = round(params["max_depth"])
         self.tuned_params = params
-        self.model = DecisionTreeRegressor(**params)
+        # PMML model can be exported for local scoring
+        self.model = DecisionTreeRegressor(model_format="pmml", **params)
 
     def optunatune(self, trial):
         algorithm = "cart"
@@ -33,5 +34,6 @@ class DecisionTreeReg(BaseAlgorithm):
             max_depth=max_depth,
             min_records_of_leaf=min_records_of_leaf,
             min_records_of_parent=min_records_of_parent,
+            model_format="pmml",
         )
         self.model = model
@@ -2,10 +2,11 @@ from hana_ml.algorithms.pal import metrics
 from hana_ml.algorithms.pal.metrics import r2_score
 from hana_ml.algorithms.pal.neighbors import KNNRegressor
 
-from hana_automl.algorithms.base_algo import BaseAlgorithm
+from hana_automl.algorithms.base_algo import BaseAlgorithm, score_attributes, timed
 from hana_automl.metric.mae import mae_score
 from hana_automl.metric.mse import mse_score
 from hana_automl.metric.rmse import rmse_score
+from hana_automl.utils.tracing import traced
 
 
 class KNeighborsReg(BaseAlgorithm):
@@ -49,6 +50,8 @@ class KNeighborsReg(BaseAlgorithm):
         )
         self.model = model
 
+    @traced("score", attributes=score_attributes)
+    @timed("score_seconds")
     def score(self, data, df, metric):
         if metric in ["mae", "mse", "rmse"]:
             c = df.columns
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from urllib.parse import quote
+
+import pandas as pd
+
+MANIFEST_VERSION = 1
+BUNDLE_VERSION = 1
+# size of the fixed part of a zip local file header
+ZIP_HEADER_SIZE = 30
+
+
+class ArtifactCache:
+    """Content-addressed local copy of stored models.
+
+    Model tables are written as Parquet files named by SHA-256 of their content, so equal tables
+    are kept once. Every model (or ensemble) has a JSON manifest with hana_ml metadata,
+    preprocessor rows and checksums of its tables::
+
+        path/
+            models/<name>/<version>.json
+            objects/<sha256>.parquet
+
+    Entries are written atomically (temporary file and rename), so a worker never reads a
+    half-written entry. Tables are checked against their checksums on every read; a damaged or
+    incomplete entry is treated as missing.
+
+    Parameters
+    ----------
+    path : str
+        Cache directory. It is created if it doesn't exist.
+
+    Examples
+    --------
+    >>> from hana_automl.artifacts import ArtifactCache
+    >>> cache = ArtifactCache('/var/cache/automl')
+    >>> automl = storage.load_model('model', 1, cache=cache)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.join(path, "models"), exist_ok=True)
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+
+    def put(self, name: str, version: int, ensemble: bool, members: list) -> dict:
+        """Writes entry for model and returns its manifest.
+
+        Parameters
+        ----------
+        name : str
+            Model (or ensemble) name.
+        version : int
+            Model version.
+        ensemble : bool
+            Whether members belong to an ensemble.
+        members : list
+            Dicts with 'row' (preprocessor row), 'class' and 'json' (hana_ml metadata),
+            'single' (model_ is one table, not a list) and 'tables' (list of pandas.DataFrame).
+
+        Returns
+        -------
+        dict
+            Manifest, where tables are replaced by their checksums.
+        """
+        manifest = {
+            "format": MANIFEST_VERSION,
+            "name": name,
+            "version": version,
+            "ensemble": ensemble,
+            "created": time.time(),
+            "members": [],
+        }
+        for member in members:
+            entry = {key: value for key, value in member.items() if key != "tables"}
+            entry["row"] = list(entry["row"])
+            entry["tables"] = [self.__write_table(table) for table in member["tables"]]
+            manifest["members"].append(entry)
+        path = self.manifest_path(name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(manifest, file)
+        os.replace(temporary, path)
+        return manifest
+
+    def get(self, name: str, version: int):
+        """Reads entry of model.
+
+        Returns
+        -------
+        dict
+            Manifest, where 'tables' of members are pandas.DataFrame objects, or None if there is no
+            valid entry.
+        """
+        path = self.manifest_path(name, version)
+        try:
+            with open(path) as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != MANIFEST_VERSION:
+            return None
+        for member in manifest["members"]:
+            tables = list()
+            for checksum in member["tables"]:
+                table = self.__read_table(checksum)
+                if table is None:
+                    return None
+                tables.append(table)
+            member["tables"] = tables
+        return manifest
+
+    def remove(self, name: str, version: int):
+        """Removes manifest of model. Table files are left, they may be shared."""
+        try:
+            os.remove(self.manifest_path(name, version))
+        except FileNotFoundError:
+            pass
+
+    def manifest_path(self, name: str, version: int) -> str:
+        return os.path.join(
+            self.path, "models", quote(str(name), safe=""), f"{version}.json"
+        )
+
+    def object_path(self, checksum: str) -> str:
+        return os.path.join(self.path, "objects", f"{checksum}.parquet")
+
+    def __write_table(self, table: pd.DataFrame) -> str:
+        temporary = os.path.join(self.path, "objects", f"{uuid.uuid4().hex}.tmp")
+        table.to_parquet(temporary, index=False)
+        checksum = file_checksum(temporary)
+        os.replace(temporary, self.object_path(checksum))
+        return checksum
+
+    def __read_table(self, checksum: str):
+        path = self.object_path(checksum)
+        if not os.path.exists(path) or file_checksum(path) != checksum:
+            return None
+        return pd.read_parquet(path)
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_table_chunks(cursor, statement: str, file, chunk_size: int = 10000) -> int:
+    """Streams result of a query to file in Arrow IPC format (zstd compressed).
+
+    Only one chunk of rows is held in memory; every chunk becomes one record batch.
+
+    Returns
+    -------
+    int
+        Number of written rows.
+    """
+    import pyarrow as pa
+
+    cursor.execute(statement)
+    columns = [column[0] for column in cursor.description]
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    writer, schema, count = None, None, 0
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if len(rows) == 0 and writer is not None:
+                break
+            chunk = pd.DataFrame(
+                [[read_lob(value) for value in row] for row in rows], columns=columns
+            )
+            batch = pa.RecordBatch.from_pandas(
+                chunk, schema=schema, preserve_index=False
+            )
+            if writer is None:
+                schema = batch.schema
+                writer = pa.ipc.new_file(file, schema, options=options)
+            writer.write_batch(batch)
+            count += len(rows)
+            if len(rows) == 0:
+                # empty table, only its schema is written
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def table_chunks(buffer):
+    """Yields pandas.DataFrame for every record batch of Arrow IPC file in buffer."""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(buffer)
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i).to_pandas()
+
+
+def entry_buffer(archive: bytes, info):
+    """Returns zero-copy view of uncompressed zip entry.
+
+    Parameters
+    ----------
+    archive
+        Memory map (or bytes) of the whole zip file.
+    info : zipfile.ZipInfo
+        Entry stored with ZIP_STORED.
+    """
+    import pyarrow as pa
+
+    header = info.header_offset
+    name_length = int.from_bytes(archive[header + 26 : header + 28], "little")
+    extra_length = int.from_bytes(archive[header + 28 : header + 30], "little")
+    start = header + ZIP_HEADER_SIZE + name_length + extra_length
+    return pa.py_buffer(memoryview(archive)[start : start + info.file_size])
+
+
+def read_lob(value):
+    """Reads content of hdbcli LOB objects (NCLOB, BLOB), other values are returned as is."""
+    if hasattr(value, "read"):
+        return value.read()
+    return value
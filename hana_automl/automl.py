@@ -6,15 +6,16 @@ from typing import Union
 import hana_ml
 import pandas
 import pandas as pd
-from tqdm import tqdm
 
-from hana_automl.algorithms.ensembles.blendcls import BlendingCls
-from hana_automl.algorithms.ensembles.blendreg import BlendingReg
+from hana_automl.algorithms.ensembles.blending import preprocessing_fingerprint
 from hana_automl.pipeline.data import Data
+from hana_automl.pipeline.history import TrialHistory
 from hana_automl.pipeline.input import Input
-from hana_automl.pipeline.pipeline import Pipeline
+from hana_automl.pipeline.staging import StagingTable
 from hana_automl.preprocess.preprocessor import Preprocessor
+from hana_automl.utils import events, profiling, sqlcapture, sqlstats
 from hana_automl.utils.error import AutoMLError, BlendingError
+from hana_automl.utils.tracing import keywords, traced
 
 
 # pylint: disable=line-too-long
@@ -31,13 +32,36 @@ class AutoML:
     model
         Tuned and fitted HANA PAL model.
     predicted
-        Dataframe containing predicted values.
+        Dataframe containing predicted values. It never reads from the staging table, so later
+        uploads don't change it.
     preprocessor_settings : PreprocessorSettings
         Preprocessor settings.
+    staging : StagingTable
+        Table that pandas data passed to predict and score is uploaded to. Dropped by :meth:`close`.
+    sql_stats : StatsConnection
+        Counts SQL statements, server time, fetched rows and bytes of :meth:`fit`, :meth:`predict`
+        and :meth:`score`, in total and by pipeline phase. Per-trial numbers are in the `sql`
+        attribute of leaderboard members. `sql_stats.tables` keeps track of tables they create.
+    peak_memory : int
+        Peak memory of tables created by the last :meth:`fit`, bytes, sampled from M_CS_TABLES.
+    history : TrialHistory
+        Every trial of every :meth:`fit` of this object: algorithm, hyperparameters, preprocessing,
+        scores, durations and SQL traffic, see :class:`~hana_automl.pipeline.history.TrialHistory`.
+    profiler : Profiler
+        Client-side profile of the last :meth:`fit` with `profile` directory, None otherwise.
+    events : EventBus
+        Progress of :meth:`fit`: trials, phases and best scores. Subscribe to it to present progress
+        or to log it, see :class:`~hana_automl.utils.events.EventBus`. Console output of `verbose`
+        levels is a subscriber too.
     """
 
     def __init__(self, connection_context: hana_ml.dataframe.ConnectionContext = None):
         self.connection_context = connection_context
+        self.sql_stats = sqlstats.StatsConnection()
+        self.peak_memory = 0
+        self.profiler = None
+        self.history = TrialHistory()
+        self.events = events.EventBus()
         self.opt = None
         self.model = None
         self.predicted = None
@@ -49,7 +73,24 @@ class AutoML:
         self.leaderboard_metric = None
         self.val_data = None
         self.ensemble_score = 0
-
+        self.staging = StagingTable(connection_context)
+
+    @profiling.profiled
+    @traced(
+        "automl.fit",
+        attributes=keywords(
+            "task",
+            "steps",
+            "target",
+            "optimizer",
+            "time_limit",
+            "ensemble",
+            "tuning_metric",
+        ),
+    )
+    @sqlcapture.captured
+    @sqlstats.counted
+    @events.presented
     def fit(
         self,
         df: Union[pandas.DataFrame, hana_ml.dataframe.DataFrame, str] = None,
@@ -63,11 +104,13 @@ class AutoML:
         id_column: str = None,
         optimizer: str = "OptunaSearch",
         time_limit: int = None,
-        ensemble: bool = False,
+        ensemble: Union[bool, str] = False,
         verbose=2,
         output_leaderboard: bool = False,
         strategy_by_col: list = None,
         tuning_metric: str = None,
+        profile: str = None,
+        history_path: str = None,
     ):
         """Fits AutoML object
 
@@ -104,9 +147,9 @@ class AutoML:
             Currently supported: "OptunaSearch" (default), "BayesianOptimizer" (unstable)
         time_limit: int
             Amount of time(in seconds) to tune the model
-        ensemble: bool
+        ensemble: bool or str
             Specify if you want to get an ensemble.
-            Currently supported: "blending". What is that? Details here: :doc:`./algorithms`
+            Currently supported: "blending" (same as True), "stacking" and "greedy". What is that? Details here: :doc:`./algorithms`
         verbose: int
             Level of output. 1 - minimal, 2 - all output.
         output_leaderboard : bool
@@ -116,6 +159,12 @@ class AutoML:
             Each tuple in the list should contain at least two elements, such that: the 1st element is the name of a column;
             the 2nd element is the imputation strategy of that column(For numerical: "mean", "median", "delete", "als", 'numerical_const'. Or categorical_const for categorical).
             If the imputation strategy is 'categorical_const' or 'numerical_const', then a 3rd element must be included in the tuple, which specifies the constant value to be used to substitute the detected missing values in the column
+        profile : str
+            Directory to save cProfile statistics of the run to, by pipeline phase, with a summary of client CPU time,
+            SQL server time and hotspots. See :class:`~hana_automl.utils.profiling.Profiler`. Off if None.
+        history_path : str
+            JSON lines file that trials are appended to while they run, in addition to :attr:`history`.
+            Read it back with :meth:`TrialHistory.load <hana_automl.pipeline.history.TrialHistory.load>`.
 
 
         Notes
@@ -168,6 +217,7 @@ class AutoML:
         if time_limit is not None:
             if time_limit < 1:
                 raise AutoMLError("The number of time_limit < 1!")
+        self.sql_stats.tables.reset_peak()
         inputted = Input(
             connection_context=self.connection_context,
             df=df,
@@ -193,6 +243,9 @@ class AutoML:
         data.drop_duplicates()
         self.val_data = copy.copy(data)
         self.val_data.train = None
+        # tuning machinery is only imported by fit, loading and predicting don't need it
+        from hana_automl.pipeline.pipeline import Pipeline
+
         pipe = Pipeline(
             data=data,
             steps=steps,
@@ -200,11 +253,15 @@ class AutoML:
             time_limit=time_limit,
             verbose=verbose,
             tuning_metric=tuning_metric,
+            history=self.history,
+            events=self.events,
         )
+        self.history.path = history_path
         self.opt = pipe.train(
             categorical_features=categorical_features, optimizer=optimizer
         )
         if output_leaderboard:
+            self.events.flush()
             self.opt.print_leaderboard(self.opt.tuning_metric)
         self.model = self.opt.get_model()
         self.algorithm = self.opt.get_algorithm()
@@ -215,7 +272,9 @@ class AutoML:
         elif tuning_metric is None and pipe.task == "reg":
             tuning_metric = "r2_score"
         self.leaderboard_metric = tuning_metric
-        if ensemble and pipe.task == "cls" and not data.binomial:
+        if ensemble not in [False, True, "blending", "stacking", "greedy"]:
+            raise BlendingError(f"Ensemble {ensemble} is not supported!")
+        if ensemble in [True, "blending"] and pipe.task == "cls" and not data.binomial:
             raise BlendingError(
                 "Sorry, non binomial blending classification is not supported yet!"
             )
@@ -224,34 +283,71 @@ class AutoML:
                 raise BlendingError(
                     "Sorry, not enough fitted models for ensembling! Restart the process"
                 )
-            if verbose > 0:
-                print("Starting ensemble accuracy evaluation on the validation data!")
+            self.events.emit(events.PHASE_CHANGED, phase="ensemble")
             self.ensemble = ensemble
-            if pipe.task == "cls":
-                self.model = BlendingCls(
-                    id_col=id_column,
-                    connection_context=self.connection_context,
-                    table_name=table_name,
-                    leaderboard=self.opt.leaderboard,
-                )
+            from hana_automl.algorithms.ensembles.blendcls import BlendingCls
+            from hana_automl.algorithms.ensembles.blendreg import BlendingReg
+            from hana_automl.algorithms.ensembles.greedycls import GreedyEnsembleCls
+            from hana_automl.algorithms.ensembles.greedyreg import GreedyEnsembleReg
+            from hana_automl.algorithms.ensembles.stackcls import StackingCls
+            from hana_automl.algorithms.ensembles.stackreg import StackingReg
+
+            if ensemble == "stacking":
+                if pipe.task == "cls":
+                    ensemble_class = StackingCls
+                else:
+                    ensemble_class = StackingReg
+            elif ensemble == "greedy":
+                if pipe.task == "cls":
+                    ensemble_class = GreedyEnsembleCls
+                else:
+                    ensemble_class = GreedyEnsembleReg
+            elif pipe.task == "cls":
+                ensemble_class = BlendingCls
             else:
-                self.model = BlendingReg(
-                    id_col=id_column,
-                    connection_context=self.connection_context,
-                    table_name=table_name,
-                    leaderboard=self.opt.leaderboard,
-                )
+                ensemble_class = BlendingReg
+            self.model = ensemble_class(
+                id_col=id_column,
+                connection_context=self.connection_context,
+                table_name=table_name,
+                leaderboard=self.opt.leaderboard,
+            )
             self.leaderboard_metric = tuning_metric
-            self.ensemble_score = self.model.score(data=data, metric=tuning_metric)
-            print("\033[33m {}".format("\n"))
-            print(
-                "Ensemble consists of: "
-                + f"{self.model.model_list[0].algorithm}, {self.model.model_list[1].algorithm}, {self.model.model_list[2].algorithm}"
-                + f"\nEnsemble {tuning_metric} score: "
-                + str(self.ensemble_score)
+            if ensemble == "stacking":
+                self.model.fit(data)
+            if ensemble == "greedy":
+                self.model.fit(data, tuning_metric)
+                self.ensemble_score = self.model.valid_score
+            else:
+                self.ensemble_score = self.model.score(data=data, metric=tuning_metric)
+            self.events.emit(
+                events.BEST_UPDATED,
+                phase="ensemble",
+                members=[str(member.algorithm) for member in self.model.model_list],
+                score=self.ensemble_score,
+                tuning_metric=tuning_metric,
             )
-            print("\033[0m {}".format(""))
+        self.__compile_preprocessing(data)
+        self.sql_stats.tables.sample(self.sql_stats.connection)
+        self.peak_memory = self.sql_stats.tables.peak_memory
 
+    def __compile_preprocessing(self, data: Data):
+        """Compiles preprocessing of the final model(s), so that inference doesn't call PAL for it."""
+        if self.ensemble:
+            settings_list = [member.preprocessor for member in self.model.model_list]
+        else:
+            settings_list = [self.preprocessor_settings]
+        compiled = dict()
+        pr = Preprocessor()
+        for settings in settings_list:
+            key = preprocessing_fingerprint(settings)
+            if key not in compiled:
+                pr.compile_settings(data.train, data.id_colm, data.target, settings)
+                compiled[key] = settings.compiled_plan
+            settings.compiled_plan = compiled[key]
+
+    @traced("automl.predict")
+    @sqlstats.counted
     def predict(
         self,
         df: Union[pandas.DataFrame, hana_ml.dataframe.DataFrame, str] = None,
@@ -303,6 +399,124 @@ class AutoML:
         ...                target_drop='target',
         ...                verbose=1)
         """
+        res = self.__predict_frame(
+            df, file_path, table_name, id_column, target_drop, verbose
+        )
+        if verbose > 0:
+            print("Prediction results (first 20 rows): \n", res.head(20).collect())
+        return res.collect()
+
+    @sqlstats.counted
+    def predict_to_table(
+        self,
+        target_table: str,
+        df: Union[pandas.DataFrame, hana_ml.dataframe.DataFrame, str] = None,
+        file_path: str = None,
+        table_name: str = None,
+        id_column: str = None,
+        target_drop: str = None,
+        verbose=0,
+    ) -> dict:
+        """Makes predictions and writes them to a table, without collecting them to the client.
+
+        Predictions are inserted with a single INSERT ... SELECT statement, so the data never leaves
+        HANA. If target_table does not exist, it is created with the columns of model output
+        (ID, PREDICTION/SCORE and, depending on algorithm, confidence columns).
+        Input parameters are the same as in :meth:`predict`.
+
+        Parameters
+        ----------
+        target_table : str
+            Name of table to write predictions to. Existing rows are kept.
+
+        Returns
+        -------
+        dict
+            Number of inserted rows ('rows') and elapsed time in seconds ('seconds').
+
+        Examples
+        --------
+        >>> automl.predict_to_table('SCORED_CUSTOMERS', table_name='CUSTOMERS', id_column='ID')
+        {'rows': 100000, 'seconds': 3.2}
+        """
+        start = time.perf_counter()
+        res = self.__predict_frame(
+            df, file_path, table_name, id_column, target_drop, verbose
+        )
+        columns = ", ".join(f'"{column}"' for column in res.columns)
+        cursor = self.connection_context.connection.cursor()
+        try:
+            if not self.connection_context.has_table(target_table):
+                cursor.execute(
+                    f'CREATE COLUMN TABLE "{target_table}" '
+                    f"AS ({res.select_statement}) WITH NO DATA"
+                )
+                sqlstats.keep_table(self.connection_context, target_table)
+            cursor.execute(
+                f'INSERT INTO "{target_table}" ({columns}) {res.select_statement}'
+            )
+            rows = cursor.rowcount
+            if not self.connection_context.connection.getautocommit():
+                self.connection_context.connection.commit()
+        finally:
+            cursor.close()
+        seconds = time.perf_counter() - start
+        if verbose > 0:
+            print(f"{rows} predictions written to {target_table} in {seconds:.2f}s")
+        return {"rows": rows, "seconds": seconds}
+
+    @sqlstats.counted
+    def predict_iter(
+        self,
+        chunk_size: int = 10000,
+        df: Union[pandas.DataFrame, hana_ml.dataframe.DataFrame, str] = None,
+        file_path: str = None,
+        table_name: str = None,
+        id_column: str = None,
+        target_drop: str = None,
+        verbose=0,
+    ):
+        """Makes predictions and yields them in chunks.
+
+        Rows are fetched from the result set with cursor.fetchmany, so client memory depends on
+        chunk_size only, not on the number of predictions.
+        Input parameters are the same as in :meth:`predict`.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Maximum number of rows in one chunk.
+
+        Yields
+        ------
+        pandas.DataFrame
+            Next chunk of predictions.
+
+        Examples
+        --------
+        >>> for i, chunk in enumerate(automl.predict_iter(50000, table_name='CUSTOMERS')):
+        ...     chunk.to_csv('predictions.csv', mode='a', header=i == 0, index=False)
+        """
+        if chunk_size < 1:
+            raise AutoMLError("chunk_size must be a positive number")
+        res = self.__predict_frame(
+            df, file_path, table_name, id_column, target_drop, verbose
+        )
+        columns = res.columns
+        cursor = self.connection_context.connection.cursor()
+        try:
+            cursor.execute(res.select_statement)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame([tuple(row) for row in rows], columns=columns)
+        finally:
+            cursor.close()
+
+    def __predict_frame(
+        self, df, file_path, table_name, id_column, target_drop, verbose
+    ) -> hana_ml.DataFrame:
         data = Input(
             connection_context=self.connection_context,
             df=df,
@@ -310,6 +524,7 @@ class AutoML:
             table_name=table_name,
             id_col=id_column,
             verbose=verbose > 0,
+            staging=self.staging,
         )
         data.load_data()
         if id_column is not None:
@@ -336,25 +551,21 @@ class AutoML:
                     self.preprocessor_settings,
                 )
             pr = Preprocessor()
-            data.hana_df = pr.autoimput(
-                df=data.hana_df,
-                id=id_column,
-                strategy_by_col=self.preprocessor_settings.strategy_by_col,
-                imputer_num_strategy=self.preprocessor_settings.tuned_num_strategy,
-                normalizer_strategy=self.preprocessor_settings.tuned_normalizer_strategy,
-                normalizer_z_score_method=self.preprocessor_settings.tuned_z_score_method,
-                normalize_int=self.preprocessor_settings.tuned_normalize_int,
-                categorical_list=self.preprocessor_settings.categorical_cols,
-                normalization_excp=self.preprocessor_settings.normalization_exceptions,
+            data.hana_df = pr.apply_settings(
+                data.hana_df, id_column, self.preprocessor_settings
             )
             self.predicted = self.model.predict(data.hana_df, data.id_col)
+        # predictions are kept after the staging table gets the next upload
+        if type(self.predicted) == tuple:
+            self.predicted = tuple(self.staging.detach(df) for df in self.predicted)
+        else:
+            self.predicted = self.staging.detach(self.predicted)
         res = self.predicted
         if type(self.predicted) == tuple:
             res = res[0]
-        if verbose > 0:
-            print("Prediction results (first 20 rows): \n", res.head(20).collect())
-        return res.collect()
+        return res
 
+    @sqlstats.counted
     def score(
         self,
         df: Union[pandas.DataFrame, hana_ml.dataframe.DataFrame, str] = None,
@@ -408,6 +619,7 @@ class AutoML:
             table_name=table_name,
             id_col=id_column,
             target=target,
+            staging=self.staging,
         )
         inp.load_data()
         data = Data()
@@ -434,19 +646,26 @@ class AutoML:
             return self.model.score(data, metric)
         else:
             pr = Preprocessor()
-            inp.hana_df = pr.autoimput(
-                df=inp.hana_df,
-                id=inp.id_col,
-                strategy_by_col=self.preprocessor_settings.strategy_by_col,
-                imputer_num_strategy=self.preprocessor_settings.tuned_num_strategy,
-                normalizer_strategy=self.preprocessor_settings.tuned_normalizer_strategy,
-                normalizer_z_score_method=self.preprocessor_settings.tuned_z_score_method,
-                normalize_int=self.preprocessor_settings.tuned_normalize_int,
-                categorical_list=self.preprocessor_settings.categorical_cols,
-                normalization_excp=self.preprocessor_settings.normalization_exceptions,
+            inp.hana_df = pr.apply_settings(
+                inp.hana_df, inp.id_col, self.preprocessor_settings
             )
             return self.algorithm.score(data, inp.hana_df, metric)
 
+    def close(self):
+        """Drops the staging table and all tables created by fit, predict and score: uploaded
+        data, PAL results and model tables. Fitted models can't be used after it, so save them
+        with :class:`~hana_automl.storage.Storage` before closing."""
+        self.staging.drop()
+        self.sql_stats.tables.forget(self.staging.name)
+        if self.connection_context is not None:
+            self.sql_stats.tables.drop(self.connection_context.connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def save_results_as_csv(self, file_path: str):
         """Saves prediciton results to .csv file
 
@@ -484,6 +703,30 @@ class AutoML:
         with open(file_path, "w+") as file:
             json.dump(self.opt.get_tuned_params(), file)
 
+    def export_local(self):
+        """Exports fitted model for in-process scoring of small batches.
+
+        Works for single decision tree, random decision trees, logistic and exponential regression
+        models with compiled preprocessing. See :func:`hana_automl.algorithms.local.scorer.export_model`.
+
+        Returns
+        -------
+        LocalScorer
+            Object with predict(df, key) method, that takes raw pandas data.
+
+        Examples
+        --------
+        >>> scorer = automl.export_local()
+        >>> scorer.predict(pd.DataFrame(request_rows), key='ID')
+        """
+        if self.ensemble:
+            raise AutoMLError("Local scoring of ensembles is not supported")
+        if self.algorithm is None:
+            raise AutoMLError("Run fit process or load a model before export!")
+        from hana_automl.algorithms.local.scorer import export_model
+
+        return export_model(self.algorithm, self.preprocessor_settings)
+
     def get_algorithm(self):
         """Returns fitted AutoML algorithm. If 'ensemble' parameter is True, returns ensemble algorithm."""
         if self.ensemble:
@@ -494,6 +737,7 @@ class AutoML:
         """Returns fitted HANA PAL model"""
         return self.model
 
+    @events.presented
     def sort_leaderboard(self, metric, df=None, id_col=None, target=None, verbose=1):
         """Sorts leaderboard by given metric"""
         if (
@@ -510,18 +754,13 @@ class AutoML:
         else:
             data = Data(valid=df, id_col=id_col, target=target)
             clean_sets = ["valid"]
-        if verbose > 0:
-            print(f"Starting model {metric} score evaluation on the validation data!")
-            time.sleep(1)
-            lst = tqdm(
-                self.leaderboard,
-                desc=f"\033[33mLeaderboard {metric} score evaluation",
-                colour="yellow",
-                bar_format="{l_bar}{bar}\033[33m{r_bar}\033[0m",
-            )
-        else:
-            lst = self.leaderboard
-        for member in lst:
+        self.events.emit(
+            events.PHASE_CHANGED,
+            phase="validation",
+            members=len(self.leaderboard),
+            tuning_metric=metric,
+        )
+        for index, member in enumerate(self.leaderboard):
             data_temp = data.clear(
                 num_strategy=member.preprocessor.tuned_num_strategy,
                 strategy_by_col=member.preprocessor.strategy_by_col,
@@ -534,6 +773,14 @@ class AutoML:
             )
             acc = member.algorithm.score(data=data, df=data_temp.valid, metric=metric)
             member.add_valid_score(acc)
+            self.events.emit(
+                events.VALIDATED,
+                trial=member.trial,
+                algorithm=member.algorithm.title,
+                score=acc,
+                index=index,
+                total=len(self.leaderboard),
+            )
         self.leaderboard_metric = metric
         reverse = metric == "r2_score" or metric == "accuracy"
         self.leaderboard.sort(
@@ -541,6 +788,7 @@ class AutoML:
             reverse=reverse,
         )
         if verbose > 0:
+            self.events.flush()
             self.print_leaderboard()
 
     def print_leaderboard(self):
@@ -1,4 +1,7 @@
 from hana_ml import DataFrame
+from hana_ml.algorithms.pal.neural_network import MLPRegressor
+
+from hana_automl.pipeline.modelres import resolve_model
 
 
 def mae_score(
@@ -12,10 +15,7 @@ def mae_score(
         res = algo.predict(df, id, ftr)
         if type(res) == tuple:
             res = res[0]
-        if (
-            str(algo).split(" ")[0]
-            == "<hana_ml.algorithms.pal.neural_network.MLPRegressor"
-        ):
+        if isinstance(resolve_model(algo), MLPRegressor):
             id_val = 2
         else:
             id_val = 1
@@ -0,0 +1,109 @@
+"""Offline backend: runs hana_automl without SAP HANA.
+
+A SQLite database takes the place of HANA and scikit-learn models take the place of PAL
+algorithms. :func:`install` registers stand-in modules under hana_ml names, so it must be called
+before hana_automl modules are imported::
+
+    from hana_automl import offline
+    offline.install()
+
+    from hana_automl.automl import AutoML
+    automl = AutoML(offline.ConnectionContext())
+
+Only the part of hana_ml used by hana_automl is covered. It is meant for benchmarks and tests of
+the pipeline; scores of offline models say nothing about PAL models.
+"""
+
+import sys
+import types
+
+from hana_automl.offline import dataframe, model_storage, pal
+from hana_automl.offline.dataframe import ConnectionContext
+from hana_automl.utils.error import OfflineError
+
+PAL_MODULES = {
+    "trees": [
+        "DecisionTreeClassifier",
+        "DecisionTreeRegressor",
+        "RDTClassifier",
+        "RDTRegressor",
+        "GradientBoostingClassifier",
+        "GradientBoostingRegressor",
+        "HybridGradientBoostingClassifier",
+        "HybridGradientBoostingRegressor",
+    ],
+    "neighbors": ["KNNClassifier", "KNNRegressor"],
+    "svm": ["SVC", "SVR"],
+    "naive_bayes": ["NaiveBayes"],
+    "neural_network": ["MLPClassifier", "MLPRegressor"],
+    "linear_model": ["LogisticRegression", "LinearRegression"],
+    "regression": ["ExponentialRegression", "GLM"],
+    "preprocessing": ["Imputer", "FeatureNormalizer", "variance_test"],
+    "partition": ["train_test_val_split"],
+    "metrics": ["accuracy_score", "r2_score"],
+}
+
+
+def install():
+    """Registers offline modules as hana_ml.
+
+    Raises
+    ------
+    OfflineError
+        If hana_automl modules that import hana_ml are already loaded.
+    """
+    loaded = [
+        name
+        for name in sys.modules
+        if name.startswith("hana_automl.")
+        and not name.startswith(("hana_automl.offline", "hana_automl.utils"))
+    ]
+    if len(loaded) > 0:
+        raise OfflineError(
+            f"Offline backend must be installed before hana_automl modules: {loaded}"
+        )
+    modules = dict()
+    modules["hana_ml.dataframe"] = module(
+        "hana_ml.dataframe",
+        ConnectionContext=ConnectionContext,
+        DataFrame=dataframe.DataFrame,
+        create_dataframe_from_pandas=dataframe.create_dataframe_from_pandas,
+    )
+    for cls in [ConnectionContext, dataframe.DataFrame]:
+        cls.__module__ = "hana_ml.dataframe"
+    modules["hana_ml"] = module(
+        "hana_ml",
+        ConnectionContext=ConnectionContext,
+        DataFrame=dataframe.DataFrame,
+        dataframe=modules["hana_ml.dataframe"],
+    )
+    modules["hana_ml.ml_base"] = module(
+        "hana_ml.ml_base", ListOfStrings=pal.ListOfStrings
+    )
+    modules["hana_ml.model_storage"] = module(
+        "hana_ml.model_storage", ModelStorage=model_storage.ModelStorage
+    )
+    model_storage.ModelStorage.__module__ = "hana_ml.model_storage"
+    modules["hana_ml.algorithms"] = module("hana_ml.algorithms")
+    modules["hana_ml.algorithms.pal"] = module("hana_ml.algorithms.pal")
+    modules["hana_ml"].algorithms = modules["hana_ml.algorithms"]
+    modules["hana_ml.algorithms"].pal = modules["hana_ml.algorithms.pal"]
+    for name, members in PAL_MODULES.items():
+        path = f"hana_ml.algorithms.pal.{name}"
+        attributes = {member: getattr(pal, member) for member in members}
+        modules[path] = module(path, **attributes)
+        setattr(modules["hana_ml.algorithms.pal"], name, modules[path])
+        for member in attributes.values():
+            if isinstance(member, type):
+                # hana_automl recognises some models by their class path
+                member.__module__ = path
+    sys.modules.update(modules)
+
+
+def module(name: str, **attributes) -> types.ModuleType:
+    result = types.ModuleType(name)
+    result.__dict__.update(attributes)
+    return result
+
+
+__all__ = ["ConnectionContext", "install", "OfflineError"]
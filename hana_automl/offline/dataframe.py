@@ -0,0 +1,609 @@
+import datetime
+import re
+import sqlite3
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+from hana_automl.utils.error import OfflineError
+from hana_automl.utils.sqlcapture import nesting_depth
+
+NUMERIC_TYPES = ["INT", "DOUBLE"]
+TYPE_SIZES = {"INT": 10, "DOUBLE": 15, "VARCHAR": 5000}
+MAX_NESTING = 8
+TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|[A-Za-z_#][\w#$]*")
+NO_DATA = re.compile(r"\bAS\s*\((.*)\)\s*WITH\s+NO\s+DATA\s*$", re.I | re.S)
+BLOCK = re.compile(r"^\s*DO\s+BEGIN\b(.*)\bEND\s*$", re.I | re.S)
+REWRITES = [
+    (
+        re.compile(r"\bCREATE\s+LOCAL\s+TEMPORARY\s+(COLUMN\s+|ROW\s+)?TABLE\b", re.I),
+        "CREATE TEMP TABLE",
+    ),
+    (re.compile(r"\bCREATE\s+(COLUMN|ROW)\s+TABLE\b", re.I), "CREATE TABLE"),
+    (re.compile(r"\bTRUNCATE\s+TABLE\b", re.I), "DELETE FROM"),
+    (
+        re.compile(r"^(ALTER\s+TABLE\s+\S+\s+ADD)\s*\((.*)\)$", re.I | re.S),
+        r"\1 COLUMN \2",
+    ),
+]
+# HANA rejects longer strings, SQLite would store them
+BOUNDED_STRING = re.compile(r"(\"[^\"]+\"|\b\w+)\s+N?VARCHAR\s*\((\d+)\)", re.I)
+
+
+class ConnectionContext:
+    """SQLite database in place of hana_ml.dataframe.ConnectionContext.
+
+    HANA SQL that hana_automl issues is translated on the fly: schema prefixes of known schemas
+    are removed (all schemas share one namespace), column table and temporary table DDL, TRUNCATE,
+    ``DO BEGIN ... END`` blocks, ``CREATE TABLE ... AS (...) WITH NO DATA`` and ``ALTER TABLE ... ADD
+    (...)`` are rewritten, lengths of NVARCHAR columns are checked, and TABLES and INDEXES system
+    views are emulated.
+
+    Parameters
+    ----------
+    database : str
+        SQLite database file. By default the database is in memory and lives as long as the
+        connection.
+    user : str
+        User name, which is also the current schema.
+
+    Examples
+    --------
+    >>> from hana_automl import offline
+    >>> offline.install()
+    >>> cc = offline.ConnectionContext()
+    >>> automl = AutoML(cc)
+    """
+
+    def __init__(self, database: str = ":memory:", user: str = "OFFLINE"):
+        self.database = database
+        self.user = user
+        self.schemas = list()
+        self.connection = Connection(self, database)
+        self.add_schema(user)
+
+    def add_schema(self, schema: str):
+        """Makes schema known, so that its prefixes are removed from statements."""
+        if schema is None or schema in self.schemas:
+            return
+        self.schemas.append(schema)
+        self.connection.sqlite.execute(
+            "INSERT INTO temp.AUTOML_OFFLINE_SCHEMAS VALUES (?)", (schema,)
+        )
+
+    def get_current_schema(self) -> str:
+        return self.user
+
+    def sql(self, sql: str):
+        return DataFrame(self, sql.strip().rstrip(";"))
+
+    def table(self, table: str, schema: str = None):
+        self.add_schema(schema)
+        return DataFrame(self, f"SELECT * FROM {quotename(table)}")
+
+    def has_table(self, table: str, schema: str = None) -> bool:
+        self.add_schema(schema)
+        return (
+            self.connection.sqlite.execute(
+                "SELECT COUNT(*) FROM TABLES WHERE TABLE_NAME = ?", (table,)
+            ).fetchone()[0]
+            > 0
+        )
+
+    def drop_table(self, table: str, schema: str = None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {quotename(table)}")
+
+    def close(self):
+        self.connection.close()
+
+    def translate(self, statement: str) -> list:
+        """Returns SQLite statements for HANA statement."""
+        statement = statement.strip().rstrip(";").strip()
+        if re.match(r"SET\s+TRANSACTION\b", statement, re.I):
+            return []
+        block = BLOCK.match(statement)
+        if block is not None:
+            result = list()
+            for part in block.group(1).split(";"):
+                if part.strip():
+                    result += self.translate(part)
+            return result
+        for pattern, replacement in REWRITES:
+            statement = pattern.sub(replacement, statement)
+        statement = NO_DATA.sub(r"AS SELECT * FROM (\1) LIMIT 0", statement)
+        if re.match(r"CREATE\s+(TEMP\s+)?TABLE\b", statement, re.I):
+            statement = BOUNDED_STRING.sub(
+                r"\1 NVARCHAR(\2) CHECK (LENGTH(\1) <= \2)", statement
+            )
+        for schema in self.schemas:
+            name = re.escape(schema)
+            statement = re.sub(
+                rf"(?<![\w.\"#$])(?:\"{name}\"|{name})\.(?=[\w\"#])", "", statement
+            )
+        return [statement]
+
+
+class Connection:
+    """sqlite3 connection with the hdbcli methods used by hana_automl and hana_ml."""
+
+    def __init__(self, context: ConnectionContext, database: str):
+        self.context = context
+        # transactions are opened explicitly, like hdbcli does when autocommit is off
+        self.sqlite = sqlite3.connect(
+            database, isolation_level=None, check_same_thread=False
+        )
+        self.autocommit = True
+        self.sqlite.execute("PRAGMA case_sensitive_like = ON")
+        self.sqlite.create_function("TO_DOUBLE", 1, to_double, deterministic=True)
+        self.sqlite.create_function("TO_NVARCHAR", 1, to_nvarchar, deterministic=True)
+        self.sqlite.create_aggregate("MEDIAN", 1, Median)
+        self.sqlite.create_aggregate("STDDEV", 1, StandardDeviation)
+        self.sqlite.executescript("""
+            CREATE TEMP TABLE AUTOML_OFFLINE_SCHEMAS (SCHEMA_NAME TEXT);
+            CREATE TEMP VIEW TABLES AS
+                SELECT S.SCHEMA_NAME, M.name AS TABLE_NAME
+                FROM temp.AUTOML_OFFLINE_SCHEMAS AS S,
+                    (SELECT name FROM main.sqlite_master WHERE type = 'table'
+                     UNION ALL
+                     SELECT name FROM temp.sqlite_master WHERE type = 'table') AS M;
+            CREATE TEMP VIEW INDEXES AS
+                SELECT S.SCHEMA_NAME, M.tbl_name AS TABLE_NAME, M.name AS INDEX_NAME
+                FROM temp.AUTOML_OFFLINE_SCHEMAS AS S,
+                    (SELECT name, tbl_name FROM main.sqlite_master WHERE type = 'index'
+                     UNION ALL
+                     SELECT name, tbl_name FROM temp.sqlite_master WHERE type = 'index') AS M;
+            """)
+        try:
+            # page sizes stand in for memory of column tables
+            self.sqlite.execute("""
+                CREATE TEMP VIEW M_CS_TABLES AS
+                    SELECT name AS TABLE_NAME, SUM(pgsize) AS MEMORY_SIZE_IN_TOTAL
+                    FROM dbstat('main') GROUP BY name
+                    UNION ALL
+                    SELECT name, SUM(pgsize) FROM dbstat('temp') GROUP BY name
+                """)
+        except sqlite3.OperationalError:
+            # SQLite is built without dbstat, memory sampling reports the error
+            pass
+
+    def cursor(self):
+        return Cursor(self)
+
+    def getautocommit(self) -> bool:
+        return self.autocommit
+
+    def setautocommit(self, value: bool):
+        if value and not self.autocommit:
+            self.commit()
+        self.autocommit = value
+
+    def begin(self):
+        if not self.autocommit and not self.sqlite.in_transaction:
+            self.sqlite.execute("BEGIN")
+
+    def commit(self):
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("COMMIT")
+
+    def rollback(self):
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("ROLLBACK")
+        # schemas registered inside the transaction are rolled back too
+        self.sqlite.execute("DELETE FROM temp.AUTOML_OFFLINE_SCHEMAS")
+        self.sqlite.executemany(
+            "INSERT INTO temp.AUTOML_OFFLINE_SCHEMAS VALUES (?)",
+            [(schema,) for schema in self.context.schemas],
+        )
+
+    def isconnected(self) -> bool:
+        return True
+
+    def close(self):
+        self.sqlite.close()
+
+
+class Cursor:
+    """sqlite3 cursor that executes translated HANA statements."""
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.cursor = connection.sqlite.cursor()
+        self.processing_time = 0.0
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self.cursor.rowcount
+
+    def execute(self, statement: str, parameters=None):
+        statements = self.connection.context.translate(statement)
+        if parameters is not None and len(statements) != 1:
+            raise OfflineError(f"Can't bind parameters to statement: {statement}")
+        self.connection.begin()
+        start = time.perf_counter()
+        for sql in statements:
+            if parameters is None:
+                self.cursor.execute(sql)
+            else:
+                self.cursor.execute(sql, [adapt(value) for value in parameters])
+        self.processing_time = time.perf_counter() - start
+        return self
+
+    def executemany(self, statement: str, rows):
+        statements = self.connection.context.translate(statement)
+        self.connection.begin()
+        start = time.perf_counter()
+        self.cursor.executemany(
+            statements[0], [[adapt(value) for value in row] for row in rows]
+        )
+        self.processing_time = time.perf_counter() - start
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self) -> list:
+        return self.cursor.fetchall()
+
+    def fetchmany(self, size: int = None) -> list:
+        if size is None:
+            return self.cursor.fetchmany()
+        return self.cursor.fetchmany(size)
+
+    def server_processing_time(self) -> int:
+        """Time of the last statement in microseconds, as hdbcli reports it."""
+        return int(self.processing_time * 1e6)
+
+    def close(self):
+        self.cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class DataFrame:
+    """Lazy SELECT statement, the subset of hana_ml.DataFrame used by hana_automl.
+
+    Parameters
+    ----------
+    connection_context : ConnectionContext
+        Offline connection.
+    select_statement : str
+        Statement that returns the data.
+    name : str
+        Alias of the statement in joins.
+    """
+
+    def __init__(self, connection_context, select_statement: str, name: str = None):
+        self.connection_context = connection_context
+        self.select_statement = select_statement
+        self.name = name
+        self._columns = None
+
+    @property
+    def columns(self) -> list:
+        if self._columns is None:
+            with self.connection_context.connection.cursor() as cursor:
+                cursor.execute(f"SELECT * FROM ({self.select_statement}) LIMIT 0")
+                self._columns = [column[0] for column in cursor.description]
+        return list(self._columns)
+
+    def __derive(self, statement: str):
+        if nesting_depth(statement) <= MAX_NESTING:
+            return DataFrame(self.connection_context, statement)
+        # SQLite parser has a small stack, deep statements are materialized
+        name = f"#OFFLINE_DERIVED_{uuid.uuid4().hex.upper()}"
+        with self.connection_context.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE LOCAL TEMPORARY COLUMN TABLE {quotename(name)} AS {statement}"
+            )
+        return self.connection_context.table(name)
+
+    def collect(self) -> pd.DataFrame:
+        with self.connection_context.connection.cursor() as cursor:
+            cursor.execute(self.select_statement)
+            rows = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def dtypes(self, subset: list = None) -> list:
+        """Returns (name, type, size) for every column. SQLite values are typed, not columns,
+        so the type is derived from the stored values: VARCHAR, DOUBLE or INT."""
+        columns = self.columns if subset is None else subset
+        checks = list()
+        for column in columns:
+            checks += [
+                f"MAX(typeof({quotename(column)}) = 'text')",
+                f"MAX(typeof({quotename(column)}) = 'real')",
+            ]
+        row = (
+            self.__derive(f"SELECT {', '.join(checks)} FROM ({self.select_statement})")
+            .collect()
+            .iloc[0]
+        )
+        result = list()
+        for i, column in enumerate(columns):
+            if row.iloc[2 * i] == 1:
+                tp = "VARCHAR"
+            elif row.iloc[2 * i + 1] == 1:
+                tp = "DOUBLE"
+            else:
+                tp = "INT"
+            result.append((column, tp, TYPE_SIZES[tp]))
+        return result
+
+    def is_numeric(self, cols) -> bool:
+        if isinstance(cols, str):
+            cols = [cols]
+        return all(tp in NUMERIC_TYPES for _, tp, _ in self.dtypes(cols))
+
+    def has(self, col: str) -> bool:
+        return col in self.columns
+
+    def select(self, *cols):
+        columns = self.columns
+        selection = list()
+        for col in flatten(cols):
+            if isinstance(col, tuple):
+                selection.append(
+                    f"{quote_columns(col[0], columns)} AS {quotename(col[1])}"
+                )
+            else:
+                selection.append(quotename(col))
+        return self.__derive(
+            f"SELECT {', '.join(selection)} FROM ({self.select_statement}) AS SELECTED"
+        )
+
+    def drop(self, cols):
+        if isinstance(cols, str):
+            cols = [cols]
+        return self.select(*[c for c in self.columns if c not in cols])
+
+    def deselect(self, cols):
+        return self.drop(cols)
+
+    def rename_columns(self, names):
+        columns = self.columns
+        if isinstance(names, dict):
+            names = [names.get(c, c) for c in columns]
+        if len(names) != len(columns):
+            raise OfflineError("Number of new names doesn't match number of columns")
+        return self.select(*[(quotename(c), n) for c, n in zip(columns, names)])
+
+    def cast(self, cols, new_type: str):
+        if isinstance(cols, str):
+            cols = [cols]
+        return self.select(
+            *[
+                (f"CAST({quotename(c)} AS {new_type})", c) if c in cols else c
+                for c in self.columns
+            ]
+        )
+
+    def alias(self, alias: str):
+        return DataFrame(self.connection_context, self.select_statement, alias)
+
+    def join(self, other, condition: str, how: str = "inner", select: list = None):
+        left = self.name or "LEFT_TABLE"
+        right = other.name or "RIGHT_TABLE"
+        condition = quote_columns(condition, self.columns + other.columns)
+        joined = self.__derive(
+            f"SELECT * FROM ({self.select_statement}) AS {left} "
+            f"{how.upper()} JOIN ({other.select_statement}) AS {right} ON {condition}"
+        )
+        if select is not None:
+            return joined.select(*select)
+        return joined
+
+    def filter(self, condition: str):
+        condition = quote_columns(condition, self.columns)
+        return self.__derive(
+            f"SELECT * FROM ({self.select_statement}) AS FILTERED WHERE {condition}"
+        )
+
+    def distinct(self, cols=None):
+        if cols is None:
+            cols = self.columns
+        if isinstance(cols, str):
+            cols = [cols]
+        selection = ", ".join(quotename(c) for c in cols)
+        return self.__derive(
+            f"SELECT DISTINCT {selection} FROM ({self.select_statement}) AS DISTINCTED"
+        )
+
+    def drop_duplicates(self, subset: list = None):
+        columns = self.columns
+        partition = ", ".join(quotename(c) for c in (subset or columns))
+        selection = ", ".join(quotename(c) for c in columns)
+        return self.__derive(
+            f"SELECT {selection} FROM (SELECT *, ROW_NUMBER() OVER "
+            f"(PARTITION BY {partition}) AS OFFLINE_ROW_NUMBER "
+            f"FROM ({self.select_statement})) WHERE OFFLINE_ROW_NUMBER = 1"
+        )
+
+    def union(self, other, _all: bool = True):
+        if not isinstance(other, (list, tuple)):
+            other = [other]
+        operator = " UNION ALL " if _all else " UNION "
+        return self.__derive(
+            operator.join(
+                f"SELECT * FROM ({df.select_statement})" for df in [self] + list(other)
+            )
+        )
+
+    def sort(self, cols, desc: bool = False):
+        if isinstance(cols, str):
+            cols = [cols]
+        order = ", ".join(f"{quotename(c)}{' DESC' if desc else ''}" for c in cols)
+        return self.__derive(
+            f"SELECT * FROM ({self.select_statement}) AS SORTED ORDER BY {order}"
+        )
+
+    def add_id(self, id_col: str = "ID", ref_col: str = None):
+        order = "" if ref_col is None else f"ORDER BY {quotename(ref_col)}"
+        return self.__derive(
+            f"SELECT ROW_NUMBER() OVER ({order}) AS {quotename(id_col)}, * "
+            f"FROM ({self.select_statement})"
+        )
+
+    def head(self, n: int = 1):
+        return self.__derive(f"SELECT * FROM ({self.select_statement}) LIMIT {int(n)}")
+
+    def count(self) -> int:
+        with self.connection_context.connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM ({self.select_statement})")
+            return cursor.fetchone()[0]
+
+    def save(self, where, table_type: str = None, force: bool = False):
+        if isinstance(where, tuple):
+            self.connection_context.add_schema(where[0])
+            where = where[1]
+        with self.connection_context.connection.cursor() as cursor:
+            if force:
+                cursor.execute(f"DROP TABLE IF EXISTS {quotename(where)}")
+            temporary = "TEMP " if where.startswith("#") else ""
+            cursor.execute(
+                f"CREATE {temporary}TABLE {quotename(where)} AS {self.select_statement}"
+            )
+        return self.connection_context.table(where)
+
+    def declare_lttab_usage(self, usage: bool):
+        pass
+
+
+def create_dataframe_from_pandas(
+    connection_context: ConnectionContext,
+    pandas_df: pd.DataFrame,
+    table_name: str,
+    schema: str = None,
+    force: bool = False,
+    replace: bool = False,
+    drop_exist_tab: bool = True,
+    disable_progressbar: bool = False,
+    **kwargs,
+) -> DataFrame:
+    """Uploads pandas data to a new table, like the hana_ml function with the same name."""
+    connection_context.add_schema(schema)
+    definition = ", ".join(
+        f"{quotename(str(name))} {sql_type(pandas_df[name])}"
+        for name in pandas_df.columns
+    )
+    rows = list(
+        pandas_df.astype(object)
+        .where(pd.notnull(pandas_df), None)
+        .itertuples(index=False, name=None)
+    )
+    with connection_context.connection.cursor() as cursor:
+        if force or drop_exist_tab:
+            cursor.execute(f"DROP TABLE IF EXISTS {quotename(table_name)}")
+        temporary = "LOCAL TEMPORARY " if table_name.startswith("#") else ""
+        cursor.execute(
+            f"CREATE {temporary}TABLE {quotename(table_name)} ({definition})"
+        )
+        if rows:
+            params = ", ".join("?" * len(pandas_df.columns))
+            cursor.executemany(
+                f"INSERT INTO {quotename(table_name)} VALUES ({params})", rows
+            )
+    connection_context.connection.commit()
+    return connection_context.table(table_name)
+
+
+def upload(connection_context: ConnectionContext, df: pd.DataFrame, prefix: str):
+    """Uploads result of a stand-in PAL function to a new temporary table."""
+    return create_dataframe_from_pandas(
+        connection_context, df, f"#{prefix}_{uuid.uuid4().hex.upper()}"
+    )
+
+
+def sql_type(column: pd.Series) -> str:
+    if types.is_bool_dtype(column) or types.is_integer_dtype(column):
+        return "INT"
+    if types.is_float_dtype(column):
+        return "DOUBLE"
+    return "VARCHAR(5000)"
+
+
+def quotename(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def quote_columns(expression: str, columns: list) -> str:
+    """Quotes bare column names in expression. HANA accepts names like DROP or REAL as
+    identifiers, SQLite needs them quoted."""
+    names = {c.upper() for c in columns}
+
+    def replace(match):
+        token = match.group(0)
+        end = match.end()
+        is_call = expression[end : end + 1] == "("
+        if token[0] in "'\"" or is_call or token.upper() not in names:
+            return token
+        return quotename(token)
+
+    return TOKENS.sub(replace, expression)
+
+
+def flatten(cols) -> list:
+    result = list()
+    for col in cols:
+        if isinstance(col, list):
+            result += col
+        else:
+            result.append(col)
+    return result
+
+
+def adapt(value):
+    """Converts parameter to a type sqlite3 can bind."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return str(value)
+    if isinstance(value, pd.Timestamp):
+        return str(value.to_pydatetime())
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def to_double(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def to_nvarchar(value):
+    return None if value is None else str(value)
+
+
+class Median:
+    def __init__(self):
+        self.values = list()
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return statistics.median(self.values) if self.values else None
+
+
+class StandardDeviation(Median):
+    def finalize(self):
+        return statistics.stdev(self.values) if len(self.values) > 1 else None
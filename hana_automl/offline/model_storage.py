@@ -0,0 +1,243 @@
+import importlib
+import json
+import time
+
+import pandas as pd
+
+from hana_automl.offline.dataframe import quotename
+from hana_automl.utils.error import OfflineError
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ModelStorage:
+    """Stand-in for hana_ml.model_storage.ModelStorage with the same tables and metadata.
+
+    Attributes
+    ----------
+    connection_context : ConnectionContext
+        Offline connection.
+    schema : str
+        Schema of model tables, the current schema by default.
+    """
+
+    _METADATA_TABLE_NAME = "HANAML_MODEL_STORAGE"
+
+    def __init__(self, connection_context, schema: str = None, meta: str = None):
+        self.connection_context = connection_context
+        if schema is None:
+            schema = connection_context.get_current_schema()
+        self.schema = schema
+        if meta is not None:
+            self._METADATA_TABLE_NAME = meta
+        connection_context.add_schema(schema)
+
+    def save_model(
+        self, model, if_exists: str = "upgrade", storage_type: str = "default"
+    ):
+        if if_exists not in ["fail", "replace", "upgrade"]:
+            raise OfflineError(f"Unknown value of if_exists: {if_exists}")
+        if model.name is None or model.name == "":
+            raise OfflineError("Model has no name")
+        if model.model_ is None:
+            raise OfflineError("Model is not fitted")
+        connection = self.connection_context.connection
+        autocommit = connection.getautocommit()
+        connection.setautocommit(False)
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SET TRANSACTION AUTOCOMMIT DDL OFF")
+            self.__create_metadata_table(cursor)
+            if model.version is None:
+                model.version = 1
+            if self.model_already_exists(model.name, model.version):
+                if if_exists == "fail":
+                    raise OfflineError(
+                        f"Model {model.name} (version {model.version}) already exists"
+                    )
+                if if_exists == "replace":
+                    self.__delete(cursor, model.name, model.version)
+                else:
+                    model.version = self.__max_version(cursor, model.name) + 1
+            tables = model.model_ if isinstance(model.model_, list) else [model.model_]
+            base = (
+                f"HANAML_{model.name.replace(' ', '_').upper()}_{model.version}_MODELS"
+            )
+            names = list()
+            for i, table in enumerate(tables):
+                name = (
+                    base
+                    if len(tables) == 1 and not isinstance(model.model_, list)
+                    else f"{base}_{i}"
+                )
+                cursor.execute(f"DROP TABLE IF EXISTS {self.__table(name)}")
+                cursor.execute(
+                    f"CREATE TABLE {self.__table(name)} AS {table.select_statement}"
+                )
+                names.append(name)
+            metadata = {
+                "model_attributes": getattr(model, "hanaml_parameters", dict()),
+                "fit_params": dict(),
+                "artifacts": {
+                    "schema": self.schema,
+                    "model_tables": (
+                        names if isinstance(model.model_, list) else names[0]
+                    ),
+                    "library": "PAL",
+                },
+                "pal_meta": dict(),
+            }
+            cursor.execute(
+                f"INSERT INTO {self.__table(self._METADATA_TABLE_NAME)} "
+                f"(NAME, VERSION, LIBRARY, CLASS, JSON, TIMESTAMP, STORAGE_TYPE, "
+                f"MODEL_STORAGE_VER, SCHEDULE, MODEL_REPORT) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    model.name,
+                    model.version,
+                    "PAL",
+                    f"{type(model).__module__}.{type(model).__name__}",
+                    json.dumps(metadata),
+                    time.strftime(TIMESTAMP_FORMAT),
+                    storage_type,
+                    1,
+                    "{}",
+                    None,
+                ),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.setautocommit(autocommit)
+
+    def load_model(self, name: str, version: int = None, **kwargs):
+        models = self.list_models(name, version)
+        if len(models) == 0:
+            raise OfflineError(f"Model {name} (version {version}) not found")
+        row = models.sort_values("VERSION").iloc[-1]
+        metadata = json.loads(row["JSON"])
+        model_class = self._load_class(row["CLASS"])
+        try:
+            model = model_class(**metadata["model_attributes"])
+        except Exception:
+            model = model_class()
+        tables = metadata["artifacts"]["model_tables"]
+        if isinstance(tables, list):
+            model.model_ = [self.__dataframe(table) for table in tables]
+        else:
+            model.model_ = self.__dataframe(tables)
+        for attribute, value in metadata.get("pal_meta", dict()).items():
+            setattr(model, attribute, value)
+        model.name = row["NAME"]
+        model.version = int(row["VERSION"])
+        return model
+
+    def list_models(self, name: str = None, version: int = None) -> pd.DataFrame:
+        columns = [
+            "NAME",
+            "VERSION",
+            "LIBRARY",
+            "CLASS",
+            "JSON",
+            "TIMESTAMP",
+            "STORAGE_TYPE",
+            "MODEL_STORAGE_VER",
+            "SCHEDULE",
+            "MODEL_REPORT",
+        ]
+        if not self.__metadata_exists():
+            return pd.DataFrame(columns=columns)
+        conditions, parameters = list(), list()
+        if name is not None:
+            conditions.append("NAME = ?")
+            parameters.append(name)
+        if version is not None:
+            conditions.append("VERSION = ?")
+            parameters.append(version)
+        where = "" if len(conditions) == 0 else " WHERE " + " AND ".join(conditions)
+        with self.connection_context.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM "
+                f"{self.__table(self._METADATA_TABLE_NAME)}{where}",
+                parameters,
+            )
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def model_already_exists(self, name: str, version: int) -> bool:
+        return len(self.list_models(name, version)) > 0
+
+    def delete_model(self, name: str, version: int):
+        with self.connection_context.connection.cursor() as cursor:
+            self.__delete(cursor, name, version)
+        self.connection_context.connection.commit()
+
+    def delete_models(self, name: str, start_time: str = None, end_time: str = None):
+        models = self.list_models(name)
+        if start_time is not None:
+            models = models[models["TIMESTAMP"] >= start_time]
+        if end_time is not None:
+            models = models[models["TIMESTAMP"] <= end_time]
+        for version in models["VERSION"]:
+            self.delete_model(name, int(version))
+
+    def clean_up(self):
+        models = self.list_models()
+        with self.connection_context.connection.cursor() as cursor:
+            for _, row in models.iterrows():
+                self.__delete(cursor, row["NAME"], row["VERSION"])
+            cursor.execute(
+                f"DROP TABLE IF EXISTS {self.__table(self._METADATA_TABLE_NAME)}"
+            )
+        self.connection_context.connection.commit()
+
+    @staticmethod
+    def _load_class(class_full_name: str):
+        module, _, name = class_full_name.rpartition(".")
+        return getattr(importlib.import_module(module), name)
+
+    def __delete(self, cursor, name: str, version: int):
+        cursor.execute(
+            f"SELECT JSON FROM {self.__table(self._METADATA_TABLE_NAME)} "
+            f"WHERE NAME = ? AND VERSION = ?",
+            (name, version),
+        )
+        for (js_str,) in cursor.fetchall():
+            tables = json.loads(js_str)["artifacts"]["model_tables"]
+            for table in tables if isinstance(tables, list) else [tables]:
+                cursor.execute(f"DROP TABLE IF EXISTS {self.__table(table)}")
+        cursor.execute(
+            f"DELETE FROM {self.__table(self._METADATA_TABLE_NAME)} "
+            f"WHERE NAME = ? AND VERSION = ?",
+            (name, version),
+        )
+
+    def __max_version(self, cursor, name: str) -> int:
+        cursor.execute(
+            f"SELECT MAX(VERSION) FROM {self.__table(self._METADATA_TABLE_NAME)} "
+            f"WHERE NAME = ?",
+            (name,),
+        )
+        version = cursor.fetchall()[0][0]
+        return 0 if version is None else int(version)
+
+    def __metadata_exists(self) -> bool:
+        return self.connection_context.has_table(self._METADATA_TABLE_NAME, self.schema)
+
+    def __create_metadata_table(self, cursor):
+        if self.__metadata_exists():
+            return
+        cursor.execute(
+            f"CREATE COLUMN TABLE {self.__table(self._METADATA_TABLE_NAME)} "
+            f"(NAME NVARCHAR(255), VERSION INT, LIBRARY NVARCHAR(128), "
+            f"CLASS NVARCHAR(255), JSON NCLOB, TIMESTAMP TIMESTAMP, "
+            f"STORAGE_TYPE NVARCHAR(255), MODEL_STORAGE_VER INT, SCHEDULE NCLOB, "
+            f"MODEL_REPORT NCLOB, PRIMARY KEY (NAME, VERSION))"
+        )
+
+    def __table(self, name: str) -> str:
+        return f"{quotename(self.schema)}.{quotename(name)}"
+
+    def __dataframe(self, table: str):
+        return self.connection_context.table(table, self.schema)
@@ -0,0 +1,631 @@
+import base64
+import math
+import pickle
+import typing
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn import ensemble, linear_model, naive_bayes, neighbors, neural_network
+from sklearn import svm, tree
+
+from hana_automl.offline.dataframe import NUMERIC_TYPES, quotename, upload
+from hana_automl.utils.error import OfflineError
+
+# base64 characters of pickled model in one row of model table
+CHUNK_SIZE = 4000
+RANDOM_STATE = 17
+# libsvm may not converge on unscaled data, offline runs must stay bounded
+SVM_MAX_ITER = 100000
+
+ListOfStrings = typing.List[str]
+
+
+class Encoder:
+    """Converts PAL input columns to a numeric matrix. Categorical columns are one-hot encoded
+    with categories seen in training, unknown values get all zeros (like in PAL)."""
+
+    def __init__(self, frame: pd.DataFrame, features: list, categorical: set):
+        self.features = list(features)
+        self.categories = dict()
+        for column in self.features:
+            values = frame[column]
+            if column in categorical or not pd.api.types.is_numeric_dtype(values):
+                self.categories[column] = sorted(values.dropna().astype(str).unique())
+
+    def transform(self, frame: pd.DataFrame) -> np.ndarray:
+        missing = [c for c in self.features if c not in frame.columns]
+        if len(missing) > 0:
+            raise OfflineError(f"Columns {missing} are missing in data")
+        parts = list()
+        for column in self.features:
+            values = frame[column]
+            if column in self.categories:
+                codes = pd.Categorical(
+                    values.astype(str), categories=self.categories[column]
+                ).codes
+                onehot = np.zeros((len(frame), len(self.categories[column])))
+                known = codes >= 0
+                onehot[np.nonzero(known)[0], codes[known]] = 1
+                parts.append(onehot)
+            else:
+                numeric = pd.to_numeric(values, errors="coerce").astype(float)
+                parts.append(numeric.fillna(0).to_numpy()[:, None])
+        if len(parts) == 0:
+            return np.zeros((len(frame), 0))
+        return np.hstack(parts)
+
+
+class PALEstimator:
+    """Base of stand-in PAL estimators, which wrap scikit-learn models.
+
+    The fitted model is pickled into model_ table (ROW_INDEX, MODEL_CONTENT), so ModelStorage
+    saves and loads it like a PAL model table. Predict output has PAL column names.
+
+    Attributes
+    ----------
+    hanaml_parameters : dict
+        Constructor arguments, saved as model attributes by ModelStorage.
+    model_ : DataFrame
+        Model table.
+    """
+
+    output = ["SCORE", "CONFIDENCE"]
+    regression = False
+
+    def __init__(self, **params):
+        self.hanaml_parameters = params
+        self.model_ = None
+        self.name = None
+        self.version = None
+        self._fitted = None
+
+    def param(self, name: str, default=None):
+        value = self.hanaml_parameters.get(name)
+        return default if value is None else value
+
+    def estimator(self):
+        """Returns unfitted scikit-learn model."""
+        raise NotImplementedError
+
+    def fit(
+        self,
+        data,
+        key: str = None,
+        features: list = None,
+        label: str = None,
+        categorical_variable=None,
+        **kwargs,
+    ):
+        columns = data.columns
+        if key is not None:
+            columns.remove(key)
+        if label is None:
+            label = columns[-1]
+        columns.remove(label)
+        if features is None:
+            features = columns
+        categorical = set(listify(categorical_variable))
+        categorical |= set(listify(self.param("categorical_variable")))
+        frame = data.select(*(list(features) + [label])).collect()
+        frame = frame[frame[label].notnull()]
+        encoder = Encoder(frame, features, categorical)
+        target = frame[label]
+        if self.regression:
+            target = target.astype(float)
+        estimator = self.estimator()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            estimator.fit(encoder.transform(frame), target.to_numpy())
+        self._fitted = {"estimator": estimator, "encoder": encoder, "label": label}
+        content = base64.b64encode(pickle.dumps(self._fitted)).decode()
+        chunks = [
+            content[i : i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE)
+        ]
+        self.model_ = upload(
+            data.connection_context,
+            pd.DataFrame({"ROW_INDEX": range(len(chunks)), "MODEL_CONTENT": chunks}),
+            "PAL_MODEL",
+        )
+        return self
+
+    def fitted(self) -> dict:
+        """Returns fitted model, unpickled from model_ table for loaded models."""
+        if self._fitted is None:
+            if self.model_ is None:
+                raise OfflineError("Model is not fitted")
+            table = self.model_[0] if isinstance(self.model_, list) else self.model_
+            table = table.collect().sort_values("ROW_INDEX")
+            content = "".join(table["MODEL_CONTENT"])
+            self._fitted = pickle.loads(base64.b64decode(content))
+        return self._fitted
+
+    def predict(self, data, key: str = None, features: list = None, **kwargs):
+        fitted = self.fitted()
+        if key is None:
+            key = data.columns[0]
+        frame = data.collect()
+        matrix = fitted["encoder"].transform(frame)
+        result = pd.DataFrame({key: frame[key].to_numpy()})
+        values = self.outputs(fitted, matrix)
+        for column, value in zip(self.output, values):
+            result[column] = value
+        return self.wrap(upload(data.connection_context, result, "PAL_PREDICT"))
+
+    def outputs(self, fitted: dict, matrix: np.ndarray) -> list:
+        """Returns values of output columns (after ID) for matrix."""
+        estimator = fitted["estimator"]
+        prediction = estimator.predict(matrix) if len(matrix) > 0 else []
+        if (
+            self.regression
+            or not hasattr(estimator, "predict_proba")
+            or len(matrix) == 0
+        ):
+            return [prediction, None]
+        return [prediction, estimator.predict_proba(matrix).max(axis=1)]
+
+    def wrap(self, result):
+        return result
+
+    def score(self, data, key: str = None, features: list = None, label: str = None):
+        if label is None:
+            label = self.fitted()["label"]
+        prediction = self.predict(data, key, features)
+        if isinstance(prediction, tuple):
+            prediction = prediction[0]
+        predicted = prediction.collect().set_index(key)
+        actual = data.select(key, label).collect().set_index(key)[label]
+        predicted = predicted.loc[actual.index, self.output[self.value_column()]]
+        if self.regression:
+            return r2(actual.to_numpy(), predicted.to_numpy())
+        return float(np.mean(actual.to_numpy() == predicted.to_numpy()))
+
+    def value_column(self) -> int:
+        return 0
+
+
+class DecisionTreeClassifier(PALEstimator):
+    def estimator(self):
+        return tree.DecisionTreeClassifier(
+            max_depth=self.param("max_depth"),
+            min_samples_leaf=self.param("min_records_of_leaf", 1),
+            min_samples_split=self.param("min_records_of_parent", 2),
+            random_state=RANDOM_STATE,
+        )
+
+
+class DecisionTreeRegressor(PALEstimator):
+    regression = True
+
+    def estimator(self):
+        return tree.DecisionTreeRegressor(
+            max_depth=self.param("max_depth"),
+            min_samples_leaf=self.param("min_records_of_leaf", 1),
+            min_samples_split=max(2, self.param("min_records_of_parent", 2)),
+            random_state=RANDOM_STATE,
+        )
+
+
+class RDTClassifier(PALEstimator):
+    def estimator(self):
+        return ensemble.RandomForestClassifier(
+            n_estimators=self.param("n_estimators", 100),
+            max_depth=self.param("max_depth"),
+            min_samples_leaf=self.param("min_samples_leaf", 1),
+            random_state=RANDOM_STATE,
+        )
+
+
+class RDTRegressor(PALEstimator):
+    regression = True
+
+    def estimator(self):
+        return ensemble.RandomForestRegressor(
+            n_estimators=self.param("n_estimators", 100),
+            max_depth=self.param("max_depth"),
+            min_samples_leaf=self.param("min_samples_leaf", 1),
+            random_state=RANDOM_STATE,
+        )
+
+
+class GradientBoostingClassifier(PALEstimator):
+    def estimator(self):
+        return ensemble.GradientBoostingClassifier(
+            n_estimators=self.param("n_estimators", 10),
+            max_depth=self.param("max_depth", 6),
+            learning_rate=self.param("learning_rate", 0.1),
+            random_state=RANDOM_STATE,
+        )
+
+
+class GradientBoostingRegressor(PALEstimator):
+    regression = True
+
+    def estimator(self):
+        return ensemble.GradientBoostingRegressor(
+            n_estimators=self.param("n_estimators", 10),
+            max_depth=self.param("max_depth", 6),
+            learning_rate=self.param("learning_rate", 0.1),
+            random_state=RANDOM_STATE,
+        )
+
+
+class HybridGradientBoostingClassifier(GradientBoostingClassifier):
+    pass
+
+
+class HybridGradientBoostingRegressor(GradientBoostingRegressor):
+    pass
+
+
+class KNNClassifier(PALEstimator):
+    """Predict returns (result, statistics) tuple, result has ID and TARGET columns."""
+
+    output = ["TARGET"]
+
+    def estimator(self):
+        weights = self.param("voting_type", self.param("aggregate_type", "majority"))
+        return self.neighbors(
+            n_neighbors=self.param("n_neighbors", 1),
+            weights="distance" if weights == "distance-weighted" else "uniform",
+            metric=self.param("metric", "euclidean"),
+        )
+
+    def neighbors(self, **params):
+        return NeighborsModel(neighbors.KNeighborsClassifier, params)
+
+    def wrap(self, result):
+        return result, None
+
+
+class KNNRegressor(KNNClassifier):
+    regression = True
+
+    def neighbors(self, **params):
+        return NeighborsModel(neighbors.KNeighborsRegressor, params)
+
+
+class NeighborsModel:
+    """Nearest neighbours model that limits number of neighbours to training size."""
+
+    def __init__(self, model_class, params: dict):
+        self.model_class = model_class
+        self.params = params
+        self.model = None
+
+    def fit(self, matrix, target):
+        params = dict(
+            self.params, n_neighbors=min(self.params["n_neighbors"], len(matrix))
+        )
+        self.model = self.model_class(**params).fit(matrix, target)
+        return self
+
+    def predict(self, matrix):
+        return self.model.predict(matrix)
+
+
+class NaiveBayes(PALEstimator):
+    output = ["CLASS", "CONFIDENCE"]
+
+    def estimator(self):
+        return naive_bayes.GaussianNB()
+
+
+class SVC(PALEstimator):
+    output = ["SCORE", "PROBABILITY"]
+
+    def estimator(self):
+        return svm.SVC(
+            C=self.param("c", 100.0),
+            kernel=self.param("kernel", "rbf"),
+            shrinking=self.param("shrink", True),
+            tol=self.param("tol", 0.001),
+            max_iter=SVM_MAX_ITER,
+        )
+
+
+class SVR(SVC):
+    regression = True
+
+    def estimator(self):
+        return svm.SVR(
+            C=self.param("c", 100.0),
+            kernel=self.param("kernel", "rbf"),
+            shrinking=self.param("shrink", True),
+            tol=self.param("tol", 0.001),
+            max_iter=SVM_MAX_ITER,
+        )
+
+
+class MLPClassifier(PALEstimator):
+    """Predict returns (result, softmax) tuple, result has ID, TARGET (class) and VALUE
+    (softmax of the class) columns."""
+
+    output = ["TARGET", "VALUE"]
+
+    def estimator(self):
+        return neural_network.MLPClassifier(
+            hidden_layer_sizes=tuple(self.param("hidden_layer_size", (10,))),
+            activation=activation(self.param("activation", "tanh")),
+            solver="lbfgs",
+            random_state=RANDOM_STATE,
+        )
+
+    def wrap(self, result):
+        return result, None
+
+
+class MLPRegressor(PALEstimator):
+    """Result has ID, TARGET (name of target column) and VALUE (prediction) columns."""
+
+    output = ["TARGET", "VALUE"]
+    regression = True
+
+    def estimator(self):
+        return neural_network.MLPRegressor(
+            hidden_layer_sizes=tuple(self.param("hidden_layer_size", (10,))),
+            activation=activation(self.param("activation", "tanh")),
+            solver="lbfgs",
+            random_state=RANDOM_STATE,
+        )
+
+    def outputs(self, fitted: dict, matrix: np.ndarray) -> list:
+        prediction = fitted["estimator"].predict(matrix) if len(matrix) > 0 else []
+        return [fitted["label"], prediction]
+
+    def value_column(self) -> int:
+        return 1
+
+
+class LogisticRegression(PALEstimator):
+    output = ["CLASS", "PROBABILITY"]
+
+    def estimator(self):
+        return linear_model.LogisticRegression(max_iter=self.param("max_iter", 100))
+
+
+class LinearRegression(PALEstimator):
+    output = ["VALUE"]
+    regression = True
+
+    def estimator(self):
+        return linear_model.LinearRegression()
+
+    def outputs(self, fitted: dict, matrix: np.ndarray) -> list:
+        return [fitted["estimator"].predict(matrix) if len(matrix) > 0 else []]
+
+
+class ExponentialRegression(LinearRegression):
+    """y = b0 * exp(b1 * x1 + ... + bn * xn), fitted as linear regression of log(y)."""
+
+    def estimator(self):
+        return ExponentialModel()
+
+
+class GLM(LinearRegression):
+    output = ["PREDICTION"]
+
+
+class ExponentialModel:
+    def __init__(self):
+        self.model = linear_model.LinearRegression()
+
+    def fit(self, matrix, target):
+        positive = target > 0
+        if not positive.any():
+            raise OfflineError("Exponential regression needs positive target values")
+        self.model.fit(matrix[positive], np.log(target[positive]))
+        return self
+
+    def predict(self, matrix):
+        return np.exp(self.model.predict(matrix))
+
+
+class Imputer:
+    """Fills missing values like PAL Imputer: numeric columns with the strategy, other and
+    categorical columns with the most frequent value. 'als' is replaced by 'mean'."""
+
+    def __init__(self, strategy: str = None, **kwargs):
+        self.strategy = "mean" if strategy is None else strategy
+
+    def fit_transform(
+        self, data, key: str = None, categorical_variable=None, strategy_by_col=None
+    ):
+        frame = data.collect()
+        column_types = {column[0]: column[1] for column in data.dtypes()}
+        categorical = set(listify(categorical_variable))
+        rules = {rule[0]: list(rule[1:]) for rule in strategy_by_col or []}
+        delete = list()
+        for column in frame.columns:
+            if column == key:
+                continue
+            numeric = (
+                column_types[column] in NUMERIC_TYPES and column not in categorical
+            )
+            if column in rules:
+                rule = rules[column]
+            elif self.strategy == "delete":
+                rule = ["delete"]
+            elif numeric:
+                rule = [self.strategy]
+            else:
+                rule = ["most_frequent"]
+            values = frame[column]
+            if rule[0] == "delete":
+                delete.append(column)
+                continue
+            if rule[0] in ["mean", "als"]:
+                fill = pd.to_numeric(values).mean()
+            elif rule[0] == "median":
+                fill = pd.to_numeric(values).median()
+            elif rule[0] == "zero":
+                fill = 0
+            elif rule[0] == "most_frequent":
+                counts = values.dropna().value_counts()
+                fill = None if len(counts) == 0 else counts.index[0]
+            elif rule[0] in ["categorical_const", "numerical_const"]:
+                fill = rule[1]
+            else:
+                continue
+            if fill is None or (isinstance(fill, float) and math.isnan(fill)):
+                continue
+            if column_types[column] == "INT" and rule[0] in ["mean", "median", "als"]:
+                fill = round(fill)
+            frame[column] = values.fillna(fill)
+        frame = frame.dropna(subset=delete)
+        for column in frame.columns:
+            if column_types[column] == "INT" and frame[column].notnull().all():
+                frame[column] = frame[column].astype("int64")
+        return upload(data.connection_context, frame, "PAL_IMPUTER")
+
+
+class FeatureNormalizer:
+    """Scales columns like PAL FeatureNormalizer, with the same constants as
+    :func:`hana_automl.preprocess.plan.collect_scaling` computes."""
+
+    def __init__(
+        self,
+        method: str,
+        z_score_method: str = None,
+        new_max: float = None,
+        new_min: float = None,
+        **kwargs,
+    ):
+        self.method = method
+        self.z_score_method = z_score_method
+        self.new_max = 1.0 if new_max is None else new_max
+        self.new_min = 0.0 if new_min is None else new_min
+
+    def fit_transform(self, data, key: str, features: list = None):
+        if features is None:
+            features = [c for c in data.columns if c != key]
+        frame = data.select(*([key] + list(features))).collect()
+        for column in features:
+            if not pd.api.types.is_numeric_dtype(frame[column]):
+                # text columns are passed through
+                continue
+            values = frame[column].astype(float)
+            offset, scale = self.scaling(values)
+            values = (values - offset) / scale
+            if self.method == "min-max":
+                values = values * (self.new_max - self.new_min) + self.new_min
+            frame[column] = values
+        return upload(data.connection_context, frame, "PAL_NORMALIZER")
+
+    def scaling(self, values: pd.Series):
+        if self.method == "min-max":
+            offset, scale = values.min(), values.max() - values.min()
+        elif self.method == "z-score" and self.z_score_method == "mean-mean":
+            offset = values.mean()
+            scale = (values - offset).abs().mean()
+        elif self.method == "z-score" and self.z_score_method == "median-median":
+            offset = values.median()
+            scale = (values - offset).abs().median()
+        elif self.method == "z-score":
+            offset, scale = values.mean(), values.std()
+        else:
+            largest = values.abs().max()
+            offset = 0.0
+            scale = (
+                10.0 ** (math.floor(math.log10(largest)) + 1) if largest > 0 else 1.0
+            )
+        if scale == 0 or pd.isnull(scale):
+            scale = 1.0
+        return 0.0 if pd.isnull(offset) else offset, scale
+
+
+def variance_test(data, sigma_num: float, thread_ratio=None, key=None, data_col=None):
+    """Marks values further than sigma_num standard deviations from the mean.
+
+    Returns
+    -------
+    tuple
+        Result (key, IS_OUT_OF_RANGE) and statistics (STAT_NAME, STAT_VALUE).
+    """
+    if key is None:
+        key = data.columns[0]
+    if data_col is None:
+        data_col = [c for c in data.columns if c != key][0]
+    frame = data.select(key, data_col).collect()
+    values = pd.to_numeric(frame[data_col]).astype(float)
+    mean, std = values.mean(), values.std()
+    out = ((values - mean).abs() > sigma_num * std).astype("int64")
+    result = pd.DataFrame({key: frame[key].to_numpy(), "IS_OUT_OF_RANGE": out})
+    stats = pd.DataFrame({"STAT_NAME": ["mean", "sd"], "STAT_VALUE": [mean, std]})
+    cc = data.connection_context
+    return upload(cc, result, "PAL_VARIANCE"), upload(cc, stats, "PAL_VARIANCE_STAT")
+
+
+def train_test_val_split(
+    data,
+    id_column: str = None,
+    random_seed: int = None,
+    partition_method: str = "random",
+    training_percentage: float = None,
+    testing_percentage: float = None,
+    validation_percentage: float = None,
+    **kwargs,
+):
+    """Randomly splits data into train, test and validation parts (80/10/10 by default)."""
+    if id_column is None:
+        id_column = data.columns[0]
+    ids = data.select(id_column).collect()[id_column].to_numpy()
+    shares = [
+        0.8 if training_percentage is None else training_percentage,
+        0.1 if testing_percentage is None else testing_percentage,
+        0.1 if validation_percentage is None else validation_percentage,
+    ]
+    ids = ids[np.random.RandomState(random_seed).permutation(len(ids))]
+    train = int(round(len(ids) * shares[0] / sum(shares)))
+    test = int(round(len(ids) * shares[1] / sum(shares)))
+    partition = np.full(len(ids), 3)
+    partition[:train] = 1
+    partition[train : train + test] = 2
+    table = upload(
+        data.connection_context,
+        pd.DataFrame({id_column: ids, "PARTITION_TYPE": partition}),
+        "PAL_PARTITION",
+    )
+    key = quotename(id_column)
+    return tuple(
+        data.connection_context.sql(
+            f"SELECT * FROM ({data.select_statement}) AS PARTITIONED WHERE {key} IN "
+            f"(SELECT {key} FROM ({table.select_statement}) WHERE PARTITION_TYPE = {i})"
+        )
+        for i in [1, 2, 3]
+    )
+
+
+def accuracy_score(data, label_true: str, label_pred: str) -> float:
+    frame = data.select(label_true, label_pred).collect()
+    return float(np.mean(frame[label_true].to_numpy() == frame[label_pred].to_numpy()))
+
+
+def r2_score(data, label_true: str, label_pred: str) -> float:
+    frame = data.select(label_true, label_pred).collect()
+    return r2(frame[label_true].to_numpy(), frame[label_pred].to_numpy())
+
+
+def r2(actual: np.ndarray, predicted: np.ndarray) -> float:
+    actual, predicted = actual.astype(float), predicted.astype(float)
+    total = np.sum((actual - actual.mean()) ** 2)
+    return float(1 - np.sum((actual - predicted) ** 2) / total) if total > 0 else 0.0
+
+
+def activation(name: str) -> str:
+    """Maps PAL activation function to the closest scikit-learn one."""
+    if "sigmoid" in name:
+        return "logistic"
+    if name == "linear":
+        return "identity"
+    if name == "relu":
+        return "relu"
+    return "tanh"
+
+
+def listify(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 
+from hana_automl.utils import events
+from hana_automl.utils.sqlstats import SQLStats
+
 
 class BaseOptimizer(ABC):
     """Base optimizer class. Inherit from it to create custom optimizers."""
@@ -35,6 +38,123 @@ class BaseOptimizer(ABC):
     def get_preprocessor_settings(self):
         """Return a :meth:`PreprocessorSettings` object with preprocessor settings"""
 
+    def begin_run(self, optimizer: str):
+        """Starts a run of the optimizer in `history`, with row counts of the data sets."""
+        self.optimizer_name = optimizer
+        self.best_score = None
+        self.run = self.history.begin_run(
+            optimizer=optimizer,
+            task=self.problem,
+            tuning_metric=self.tuning_metric,
+            train_rows=row_count(self.data.train),
+            test_rows=row_count(self.data.test),
+            valid_rows=row_count(self.data.valid),
+        )
+
+    def record_trial(
+        self,
+        member,
+        params: dict,
+        preprocessing: dict,
+        seconds: float,
+        sql: SQLStats,
+    ):
+        """Records a trial that produced leaderboard `member` in `history` and emits its events.
+
+        Parameters
+        ----------
+        member : ModelBoard
+            Leaderboard member of the trial, with `trial` number set.
+        params : dict
+            Hyperparameters of the algorithm.
+        preprocessing : dict
+            Tuned preprocessing settings.
+        seconds : float
+            Duration of the trial.
+        sql : SQLStats
+            SQL traffic of the trial.
+        """
+        algorithm = member.algorithm
+        self.history.record(
+            self.run,
+            member.trial,
+            params=params,
+            algorithm=algorithm.title,
+            **preprocessing,
+            train_score=member.train_score,
+            valid_score=None,
+            seconds=seconds,
+            fit_seconds=getattr(algorithm, "fit_seconds", None),
+            score_seconds=getattr(algorithm, "score_seconds", None),
+            **{f"sql_{name}": value for name, value in sql.to_dict().items()},
+        )
+        self.events.emit(
+            events.TRIAL_FINISHED,
+            optimizer=self.optimizer_name,
+            trial=member.trial,
+            algorithm=algorithm.title,
+            params=dict(params),
+            preprocessing=dict(preprocessing),
+            score=member.train_score,
+            seconds=seconds,
+        )
+        if self.best_score is None or self.better(member.train_score, self.best_score):
+            self.best_score = member.train_score
+            self.events.emit(
+                events.BEST_UPDATED,
+                phase="tuning",
+                trial=member.trial,
+                algorithm=algorithm.title,
+                score=member.train_score,
+            )
+
+    def start_trial(self, trial: int, algorithm: str, preprocessing: dict):
+        self.events.emit(
+            events.TRIAL_STARTED,
+            optimizer=self.optimizer_name,
+            trial=trial,
+            algorithm=algorithm,
+            preprocessing=dict(preprocessing),
+        )
+
+    def start_validation(self, trials: int, iterations: int):
+        """Emits the validation phase, after `trials` of planned `iterations` (None if unlimited)."""
+        self.events.emit(
+            events.PHASE_CHANGED,
+            phase="validation",
+            trials=trials,
+            iterations=iterations,
+            members=len(self.leaderboard),
+            tuning_metric=self.tuning_metric,
+        )
+
+    def member_validated(self, index: int, member):
+        self.events.emit(
+            events.VALIDATED,
+            trial=member.trial,
+            algorithm=member.algorithm.title,
+            score=member.valid_score,
+            index=index,
+            total=len(self.leaderboard),
+        )
+
+    def finish_validation(self):
+        """Emits the best leaderboard member, call after sorting."""
+        best = self.leaderboard[0]
+        self.events.emit(
+            events.BEST_UPDATED,
+            phase="validation",
+            trial=best.trial,
+            algorithm=best.algorithm.title,
+            score=best.valid_score,
+            train_score=best.train_score,
+        )
+
+    def better(self, score: float, other: float) -> bool:
+        if self.tuning_metric in ["mse", "rmse", "mae"]:
+            return score < other
+        return score > other
+
     def print_leaderboard(self, metric):
         print("\033[33m {}".format("Leaderboard (top best algorithms):\n"))
         place = 1
@@ -52,3 +172,7 @@ class BaseOptimizer(ABC):
             )
             print("\033[0m {}".format(""))
             place += 1
+
+
+def row_count(df) -> int:
+    return None if df is None else df.count()
@@ -1,16 +1,17 @@
 import copy
 import time
-from datetime import datetime
 
 import hana_ml
 import numpy as np
 from bayes_opt.bayesian_optimization import BayesianOptimization
-from tqdm import tqdm
 
 from hana_automl.optimizers.base_optimizer import BaseOptimizer
+from hana_automl.pipeline.history import TrialHistory
 from hana_automl.pipeline.modelres import ModelBoard
 from hana_automl.preprocess.settings import PreprocessorSettings
 from hana_automl.utils.error import OptimizerError
+from hana_automl.utils import sqlstats, tracing
+from hana_automl.utils.events import EventBus
 
 np.seterr(divide="ignore", invalid="ignore")
 
@@ -42,6 +43,12 @@ class BayesianOptimizer(BaseOptimizer):
         Imputer for preprocessing
     model
         Tuned HANA ML model in algorithm.
+    history : TrialHistory
+        Record of all trials.
+    run : str
+        Id of the current tuning run in history.
+    events : EventBus
+        Bus that trials, validation and best scores are emitted to.
     """
 
     def __init__(
@@ -54,6 +61,8 @@ class BayesianOptimizer(BaseOptimizer):
         categorical_features: list = None,
         verbose=2,
         tuning_metric: str = None,
+        history: TrialHistory = None,
+        events: EventBus = None,
     ):
         self.data = data
         self.algo_list = algo_list
@@ -78,7 +87,14 @@ class BayesianOptimizer(BaseOptimizer):
         self.verbose = verbose
         self.tuning_metric = tuning_metric
         self.trial_num = 0
+        self.sql = sqlstats.find(data.train.connection_context)
+        self.history = TrialHistory() if history is None else history
+        self.run = None
+        self.events = EventBus() if events is None else events
 
+    @tracing.traced(
+        "trial", attributes=lambda self, **kwargs: {"number": self.trial_num}
+    )
     def objective(
         self,
         algo_index_tuned: int,
@@ -115,6 +131,8 @@ class BayesianOptimizer(BaseOptimizer):
         if self.time_limit is not None:
             if time.perf_counter() - self.start_time > self.time_limit:
                 raise OptimizerError()
+        started = time.perf_counter()
+        start = sqlstats.snapshot(self.sql)
         self.algo_index = round(algo_index_tuned)
         imputer = self.prepset.num_strategy[round(num_strategy_method)]
         self.prepset.tuned_num_strategy = imputer
@@ -128,6 +146,16 @@ class BayesianOptimizer(BaseOptimizer):
         self.prepset.tuned_normalize_int = normalize_int_2
         drop_outers = self.prepset.drop_outers[round(drop_outers)]
         self.prepset.tuned_drop_outers = drop_outers
+        preprocessing = {
+            "imputer": imputer,
+            "normalizer_strategy": normalizer_strategy_2,
+            "z_score_method": z_score_method_2,
+            "normalize_int": normalize_int_2,
+            "drop_outers": drop_outers,
+        }
+        algo = self.algo_list[self.algo_index]
+        tracing.current().set_attributes(algorithm=algo.title, **preprocessing)
+        self.start_trial(self.trial_num, algo.title, preprocessing)
         self.inner_data = self.data.clear(
             num_strategy=imputer,
             strategy_by_col=self.prepset.strategy_by_col,
@@ -139,34 +167,34 @@ class BayesianOptimizer(BaseOptimizer):
             normalization_excp=self.prepset.normalization_exceptions,
             clean_sets=["test", "train"],
         )
-        target, params = self.algo_list[self.algo_index].bayes_tune(
-            f=self.child_objective
-        )
-        now = datetime.now()
+        algo.fit_seconds = algo.score_seconds = 0.0
+        target, params = algo.bayes_tune(f=self.child_objective)
         if self.tuning_metric not in ["accuracy", "r2_score"]:
             tr = -1 * target
         else:
             tr = target
-        if self.verbose > 1:
-            print(
-                f"\033[32m[I {now}] \033[36mTrial {self.trial_num} finished with value: {tr} and parametrs: {{ 'algo': {self.algo_list[self.algo_index]}, 'imputer': {imputer}, 'normalizer_strategy': {normalizer_strategy_2}, 'normalize_int': {normalize_int_2}, 'drop_outers': {drop_outers}}}\033[0m"
-            )
+        tracing.current().set_attribute("score", tr)
+        trial_num = self.trial_num
         self.trial_num = self.trial_num + 1
-        algo = self.algo_list[self.algo_index]
         algo.set_params(**params)
-        if self.verbose > 1:
-            print(
-                "\033[36m {}\033[0m".format(
-                    algo.title + " trial params :" + str(algo.tuned_params)
-                )
-            )
         self.fit(algo, self.inner_data)
-        self.leaderboard.append(
-            ModelBoard(copy.copy(algo), tr, copy.copy(self.prepset))
+        sql = sqlstats.snapshot(self.sql) - start
+        tracing.current().set_attributes(**sql.to_dict())
+        member = ModelBoard(
+            copy.copy(algo), tr, copy.copy(self.prepset), sql, trial=trial_num
+        )
+        self.leaderboard.append(member)
+        self.record_trial(
+            member,
+            params=algo.tuned_params,
+            preprocessing=preprocessing,
+            seconds=time.perf_counter() - started,
+            sql=sql,
         )
 
         return target
 
+    @tracing.traced("child_trial", attributes=lambda self, **kwargs: dict(kwargs))
     def child_objective(self, **hyperparameters) -> float:
         """Mini objective function. It is used to tune hyperparameters of algorithm that was chosen in main objective.
 
@@ -227,69 +255,45 @@ class BayesianOptimizer(BaseOptimizer):
             random_state=17,
             verbose=False,
         )
-        now = datetime.now()
-        print(
-            f"\033[32m[I {now}] \033[36mA new bayesian optimization process created in memory\033[0m"
-        )
         self.start_time = time.perf_counter()
+        self.begin_run("BayesianOptimizer")
         try:
             if self.iter is None:
                 opt.maximize(n_iter=99999999999999, init_points=1)
             else:
                 opt.maximize(n_iter=self.iter, init_points=1)
         except OptimizerError:
-            if self.verbose > 0:
-                if self.iter is None:
-                    print(
-                        "There was a stop due to a time limit! Completed "
-                        + str(len(opt.res))
-                        + " iterations"
-                    )
-                else:
-                    print(
-                        "There was a stop due to a time limit! Completed "
-                        + str(len(opt.res))
-                        + " iterations of "
-                        + str(self.iter)
-                    )
+            # stopped by the time limit
+            self.start_validation(len(opt.res), self.iter)
         else:
-            if self.verbose > 0:
-                print("All iterations completed successfully!")
+            self.start_validation(len(opt.res), len(opt.res))
         self.tuned_params = opt.max
-        if self.verbose > 0:
-            print(
-                f"Starting model {self.tuning_metric} score evaluation on the validation data!"
-            )
-        if self.verbose > 1:
-            time.sleep(1)
-            lst = tqdm(
-                self.leaderboard,
-                desc=f"\033[33m Leaderboard {self.tuning_metric} score evaluation",
-                colour="yellow",
-                bar_format="{l_bar}{bar}\033[33m{r_bar}\033[0m",
-            )
-        else:
-            lst = self.leaderboard
-        for member in lst:
-            data2 = self.data.clear(
-                num_strategy=member.preprocessor.tuned_num_strategy,
-                strategy_by_col=member.preprocessor.strategy_by_col,
-                categorical_list=member.preprocessor.categorical_cols,
-                normalizer_strategy=member.preprocessor.tuned_normalizer_strategy,
-                normalizer_z_score_method=member.preprocessor.tuned_z_score_method,
-                normalize_int=member.preprocessor.tuned_normalize_int,
-                normalization_excp=member.preprocessor.normalization_exceptions,
-                clean_sets=["valid"],
-            )
-            acc = member.algorithm.score(
-                data=data2, df=data2.valid, metric=self.tuning_metric
-            )
-            member.add_valid_score(acc)
+        with tracing.span("validation"):
+            for index, member in enumerate(self.leaderboard):
+                start = sqlstats.snapshot(self.sql)
+                data2 = self.data.clear(
+                    num_strategy=member.preprocessor.tuned_num_strategy,
+                    strategy_by_col=member.preprocessor.strategy_by_col,
+                    categorical_list=member.preprocessor.categorical_cols,
+                    normalizer_strategy=member.preprocessor.tuned_normalizer_strategy,
+                    normalizer_z_score_method=member.preprocessor.tuned_z_score_method,
+                    normalize_int=member.preprocessor.tuned_normalize_int,
+                    normalization_excp=member.preprocessor.normalization_exceptions,
+                    clean_sets=["valid"],
+                )
+                acc = member.algorithm.score(
+                    data=data2, df=data2.valid, metric=self.tuning_metric
+                )
+                member.add_valid_score(acc)
+                member.sql.add(sqlstats.snapshot(self.sql) - start)
+                self.history.update(self.run, member.trial, valid_score=acc)
+                self.member_validated(index, member)
         reverse = self.tuning_metric == "r2_score" or self.tuning_metric == "accuracy"
         self.leaderboard.sort(
             key=lambda member: member.valid_score + member.train_score,
             reverse=reverse,
         )
+        self.finish_validation()
         self.model = self.leaderboard[0].algorithm.model
         self.algorithm = self.leaderboard[0].algorithm
 
@@ -4,11 +4,12 @@ import uuid
 
 import optuna
 
-from tqdm import tqdm
-
 from hana_automl.optimizers.base_optimizer import BaseOptimizer
+from hana_automl.pipeline.history import TrialHistory
 from hana_automl.pipeline.modelres import ModelBoard
 from hana_automl.preprocess.settings import PreprocessorSettings
+from hana_automl.utils import sqlstats, tracing
+from hana_automl.utils.events import EventBus
 
 
 class OptunaOptimizer(BaseOptimizer):
@@ -36,6 +37,12 @@ class OptunaOptimizer(BaseOptimizer):
         Tuned HANA ML model in algorithm.
     droplist_columns
         Columns in dataframe to be dropped.
+    history : TrialHistory
+        Record of all trials.
+    run : str
+        Id of the current tuning run in history.
+    events : EventBus
+        Bus that trials, validation and best scores are emitted to.
     """
 
     def __init__(
@@ -50,6 +57,8 @@ class OptunaOptimizer(BaseOptimizer):
         droplist_columns: list = None,
         verbose=2,
         tuning_metric: str = None,
+        history: TrialHistory = None,
+        events: EventBus = None,
     ):
         self.algo_list = algo_list
         self.data = data
@@ -78,28 +87,10 @@ class OptunaOptimizer(BaseOptimizer):
         self.algorithm = None
         self.study = None
         self.tuning_metric = tuning_metric
-
-    def inner_params(self, study, trial):
-        if self.verbose > 1:
-            time.sleep(1)
-            print(
-                "\033[31m {}\033[0m".format(
-                    self.leaderboard[len(self.leaderboard) - 1].algorithm.title
-                    + " trial params :"
-                    + str(
-                        self.leaderboard[len(self.leaderboard) - 1]
-                        .algorithm.optuna_opt.trials[
-                            len(
-                                self.leaderboard[
-                                    len(self.leaderboard) - 1
-                                ].algorithm.optuna_opt.trials
-                            )
-                            - 1
-                        ]
-                        .params
-                    )
-                )
-            )
+        self.sql = sqlstats.find(data.train.connection_context)
+        self.history = TrialHistory() if history is None else history
+        self.run = None
+        self.events = EventBus() if events is None else events
 
     def tune(self):
         if self.tuning_metric in ["mse", "rmse", "mae"]:
@@ -110,54 +101,26 @@ class OptunaOptimizer(BaseOptimizer):
             direction=dirc,
             study_name="hana_automl optimization process(" + str(uuid.uuid4()) + ")",
         )
+        self.begin_run("OptunaSearch")
         if self.iterations is not None and self.time_limit is not None:
             self.study.optimize(
                 self.objective,
                 n_trials=self.iterations,
                 timeout=self.time_limit,
-                callbacks=[self.inner_params],
             )
         elif self.iterations is None:
-            self.study.optimize(
-                self.objective, timeout=self.time_limit, callbacks=[self.inner_params]
-            )
+            self.study.optimize(self.objective, timeout=self.time_limit)
         else:
-            self.study.optimize(
-                self.objective, n_trials=self.iterations, callbacks=[self.inner_params]
-            )
-        time.sleep(2)
+            self.study.optimize(self.objective, n_trials=self.iterations)
         self.tuned_params = self.study.best_params
-        if self.verbose > 0:
-            res = len(self.study.trials)
-            if self.iterations is None:
-                print(
-                    "There was a stop due to a time limit! Completed "
-                    + str(res)
-                    + " iterations"
-                )
-            elif res == self.iterations:
-                print("All iterations completed successfully!")
-            else:
-                print(
-                    "There was a stop due to a time limit! Completed "
-                    + str(res)
-                    + " iterations of "
-                    + str(self.iterations)
-                )
-            print(
-                f"Starting model {self.tuning_metric} score evaluation on the validation data!"
-            )
-        if self.verbose > 1:
-            time.sleep(1)
-            lst = tqdm(
-                self.leaderboard,
-                desc=f"\033[33m Leaderboard {self.tuning_metric} score evaluation",
-                colour="yellow",
-                bar_format="{l_bar}{bar}\033[33m{r_bar}\033[0m",
-            )
-        else:
-            lst = self.leaderboard
-        for member in lst:
+        self.start_validation(len(self.study.trials), self.iterations)
+        self.validate()
+
+    @tracing.traced("validation")
+    def validate(self):
+        """Scores leaderboard members on the validation data and sorts them."""
+        for index, member in enumerate(self.leaderboard):
+            start = sqlstats.snapshot(self.sql)
             data = self.data.clear(
                 num_strategy=member.preprocessor.tuned_num_strategy,
                 strategy_by_col=member.preprocessor.strategy_by_col,
@@ -172,14 +135,19 @@ class OptunaOptimizer(BaseOptimizer):
                 data=data, df=data.valid, metric=self.tuning_metric
             )
             member.add_valid_score(acc)
+            member.sql.add(sqlstats.snapshot(self.sql) - start)
+            self.history.update(self.run, member.trial, valid_score=acc)
+            self.member_validated(index, member)
         reverse = self.tuning_metric == "r2_score" or self.tuning_metric == "accuracy"
         self.leaderboard.sort(
             key=lambda member: member.valid_score + member.train_score,
             reverse=reverse,
         )
+        self.finish_validation()
         self.model = self.leaderboard[0].algorithm.model
         self.algorithm = self.leaderboard[0].algorithm
 
+    @tracing.traced("trial", attributes=lambda self, trial: {"number": trial.number})
     def objective(self, trial: optuna.trial.Trial) -> int:
         """Objective function. Optimizer uses it to search for best algorithm and preprocess method.
 
@@ -194,10 +162,13 @@ class OptunaOptimizer(BaseOptimizer):
             Model's accuracy.
 
         """
+        started = time.perf_counter()
+        start = sqlstats.snapshot(self.sql)
         algo = self.algo_dict.get(
             trial.suggest_categorical("algo", self.algo_dict.keys())
         )
         algo.set_categ(self.categorical_features)
+        algo.fit_seconds = algo.score_seconds = 0.0
         imputer = trial.suggest_categorical("imputer", self.prepset.num_strategy)
         self.prepset.tuned_num_strategy = imputer
         normalizer_strategy = trial.suggest_categorical(
@@ -216,6 +187,12 @@ class OptunaOptimizer(BaseOptimizer):
         self.prepset.tuned_normalize_int = normalize_int
         drop_outers = trial.suggest_categorical("drop_outers", self.prepset.drop_outers)
         self.prepset.tuned_drop_outers = drop_outers
+        tracing.current().set_attributes(algorithm=algo.title, **trial.params)
+        self.start_trial(
+            trial.number,
+            algo.title,
+            {k: v for k, v in trial.params.items() if k != "algo"},
+        )
         data = self.data.clear(
             strategy_by_col=self.prepset.strategy_by_col,
             num_strategy=imputer,
@@ -228,8 +205,21 @@ class OptunaOptimizer(BaseOptimizer):
             clean_sets=["test", "train"],
         )
         acc = algo.optuna_tune(data, self.tuning_metric)
-        self.leaderboard.append(
-            ModelBoard(copy.copy(algo), acc, copy.copy(self.prepset))
+        sql = sqlstats.snapshot(self.sql) - start
+        trial.set_user_attr("sql", sql.to_dict())
+        tracing.current().set_attributes(score=acc, **sql.to_dict())
+        member = ModelBoard(
+            copy.copy(algo), acc, copy.copy(self.prepset), sql, trial=trial.number
+        )
+        self.leaderboard.append(member)
+        preprocessing = {k: v for k, v in trial.params.items() if k != "algo"}
+        preprocessing.setdefault("z_score_method", None)
+        self.record_trial(
+            member,
+            params=algo.optuna_opt.trials[-1].params,
+            preprocessing=preprocessing,
+            seconds=time.perf_counter() - started,
+            sql=sql,
         )
         return acc
 
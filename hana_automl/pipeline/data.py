@@ -2,6 +2,7 @@ from hana_ml import DataFrame
 from hana_ml.algorithms.pal.partition import train_test_val_split
 
 from hana_automl.preprocess.preprocessor import Preprocessor
+from hana_automl.utils.tracing import keywords, traced
 import pandas as pd
 
 pd.options.display.max_columns = None
@@ -53,6 +54,17 @@ class Data:
         self.train = pr.removecolumns(droplist_columns, df=self.train)
         self.test = pr.removecolumns(droplist_columns, df=self.test)
 
+    @traced(
+        "preprocess",
+        attributes=keywords(
+            "num_strategy",
+            "normalizer_strategy",
+            "normalizer_z_score_method",
+            "normalize_int",
+            "drop_outers",
+            "clean_sets",
+        ),
+    )
     def clear(
         self,
         num_strategy: str = "mean",
@@ -152,6 +164,7 @@ class Data:
             train=train, test=test, valid=valid, target=self.target, id_col=self.id_colm
         )
 
+    @traced("normalization_exceptions")
     def check_norm_except(self, categorical_list):
         return Preprocessor.check_normalization_exceptions(
             df=self.test.union([self.train, self.valid]).sort(self.id_colm, desc=False),
@@ -0,0 +1,171 @@
+import json
+import os
+import uuid
+
+import pandas as pd
+
+
+class TrialHistory:
+    """Columnar record of optimizer trials, one row per trial.
+
+    Rows have the run id and trial number, algorithm, hyperparameters flattened to 'param_<name>'
+    columns, preprocessing settings, train and validation scores, seconds of the trial and of
+    fitting and scoring in it, SQL traffic ('sql_<counter>' columns) and row counts of the
+    train, test and validation sets before preprocessing. Analysis works on :meth:`frame`, a
+    pandas DataFrame, so filtering and sorting are vectorized and never touch PAL models.
+
+    With `path`, every row is appended to a JSON lines file as soon as it's recorded, so history
+    of long or interrupted runs is not lost. Validation scores are appended as separate update
+    lines later; :meth:`load` applies them.
+
+    Parameters
+    ----------
+    path : str
+        JSON lines file to append to. None keeps history in memory only.
+
+    Examples
+    --------
+    >>> history = TrialHistory.load('run1.jsonl', 'run2.jsonl')
+    >>> history.query("algorithm == 'MLPClassifier' and drop_outers").sort_values('valid_score')
+    >>> history.best(5)
+    >>> history.to_parquet('trials.parquet')
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.columns = dict()
+        self.length = 0
+        self.runs = dict()
+        # (run, trial) -> row
+        self.rows = dict()
+        # trials loaded from Parquet files, read only
+        self.frames = list()
+        self.cached_frame = None
+
+    def begin_run(self, **values) -> str:
+        """Starts a run, e.g. a fit. Values are added to all its trials.
+
+        Returns
+        -------
+        str
+            Run id.
+        """
+        run = uuid.uuid4().hex[:12]
+        self.runs[run] = values
+        return run
+
+    def record(self, run: str, trial: int, params: dict = None, **values):
+        """Appends a trial. `params` are hyperparameters, nested dicts are flattened."""
+        row = {"run": run, "trial": trial, **self.runs.get(run, dict()), **values}
+        for name, value in flatten(params or dict(), "param_").items():
+            row[name] = value
+        self.__append(row)
+        self.__write({"event": "trial", **row})
+
+    def update(self, run: str, trial: int, **values):
+        """Sets values of a recorded trial, e.g. its validation score."""
+        self.__set(self.rows[(run, trial)], values)
+        self.__write({"event": "update", "run": run, "trial": trial, **values})
+
+    def frame(self) -> pd.DataFrame:
+        """Returns all trials as a DataFrame. It's cached until the next change."""
+        if self.cached_frame is None:
+            frames = self.frames + [pd.DataFrame(self.columns)]
+            if self.length == 0 and len(self.frames) > 0:
+                frames.pop()
+            if len(frames) == 1:
+                self.cached_frame = frames[0]
+            else:
+                self.cached_frame = pd.concat(frames, ignore_index=True)
+        return self.cached_frame
+
+    def query(self, expression: str) -> pd.DataFrame:
+        """Returns trials matching a :meth:`pandas.DataFrame.query` expression."""
+        return self.frame().query(expression)
+
+    def best(self, n: int = 10, by: str = "valid_score", ascending: bool = False):
+        """Returns `n` trials with the best `by` value, use ascending=True for errors."""
+        frame = self.frame()
+        if ascending:
+            return frame.nsmallest(n, by)
+        return frame.nlargest(n, by)
+
+    def to_parquet(self, path: str):
+        """Saves trials to a Parquet file. Columns of mixed types are saved as strings."""
+        frame = self.frame().copy()
+        for name in frame.columns[frame.dtypes == object]:
+            values = frame[name].dropna()
+            if values.map(type).nunique() > 1:
+                frame[name] = frame[name].where(
+                    frame[name].isna(), frame[name].astype(str)
+                )
+        frame.to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, *paths: str) -> "TrialHistory":
+        """Reads history from JSON lines files of :class:`TrialHistory` and Parquet exports.
+
+        The result is in memory only, its `path` is None. Trials from Parquet files are kept as
+        DataFrames and can't be updated.
+        """
+        history = cls()
+        for path in paths:
+            if os.path.splitext(path)[1] == ".parquet":
+                history.frames.append(pd.read_parquet(path))
+                continue
+            with open(path) as file:
+                for line in file:
+                    row = json.loads(line)
+                    event = row.pop("event")
+                    if event == "trial":
+                        history.__append(row)
+                    else:
+                        key = (row.pop("run"), row.pop("trial"))
+                        history.__set(history.rows[key], row)
+        return history
+
+    def __len__(self):
+        return self.length + sum(len(frame) for frame in self.frames)
+
+    def __append(self, row: dict):
+        for name in row:
+            if name not in self.columns:
+                self.columns[name] = [None] * self.length
+        for name, column in self.columns.items():
+            column.append(row.get(name))
+        self.rows[(row["run"], row["trial"])] = self.length
+        self.length += 1
+        self.cached_frame = None
+
+    def __set(self, index: int, values: dict):
+        for name, value in values.items():
+            if name not in self.columns:
+                self.columns[name] = [None] * self.length
+            self.columns[name][index] = value
+        self.cached_frame = None
+
+    def __write(self, row: dict):
+        if self.path is None:
+            return
+        with open(self.path, "a") as file:
+            file.write(json.dumps(row, default=json_value) + "\n")
+
+
+def flatten(values: dict, prefix: str = "") -> dict:
+    """Flattens nested dicts to one level, joining keys with dots."""
+    result = dict()
+    for key, value in values.items():
+        if isinstance(value, dict):
+            result.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (list, tuple)):
+            result[f"{prefix}{key}"] = str(value)
+        else:
+            result[f"{prefix}{key}"] = value
+    return result
+
+
+def json_value(value):
+    # numpy scalars, e.g. scores of PAL models
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
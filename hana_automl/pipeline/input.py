@@ -4,11 +4,14 @@ import hana_ml.dataframe
 import pandas as pd
 import uuid
 from hana_automl.pipeline.data import Data
+from hana_automl.pipeline.staging import StagingTable
 from hana_ml.algorithms.pal.partition import train_test_val_split
 from hana_ml.dataframe import create_dataframe_from_pandas
 from typing import Union
 from hana_automl.preprocess.preprocessor import Preprocessor
+from hana_automl.utils import sqlstats
 from hana_automl.utils.error import InputError
+from hana_automl.utils.tracing import traced
 import pandas
 
 
@@ -33,6 +36,8 @@ class Input:
         Converted HANA dataframe.
     verbose
         Level of output
+    staging : StagingTable
+        If set, pandas data without table_name is uploaded to this reusable table instead of a new one.
     """
 
     def __init__(
@@ -44,6 +49,7 @@ class Input:
         id_col: str = None,
         table_name: str = None,
         verbose: bool = True,
+        staging: StagingTable = None,
     ):
         self.df = df
         self.id_col = id_col
@@ -53,7 +59,15 @@ class Input:
         self.verbose = verbose
         self.hana_df: hana_ml.dataframe.DataFrame = None
         self.connection_context = connection_context
+        self.staging = staging
 
+    @traced(
+        "load_data",
+        attributes=lambda self: {
+            "table": self.table_name,
+            "rows": len(self.df) if isinstance(self.df, pd.DataFrame) else None,
+        },
+    )
     def load_data(self):
         """Loads data to HANA database."""
 
@@ -80,16 +94,21 @@ class Input:
             ) and self.table_name is None:
                 if self.file_path is not None:
                     self.df = self.download_data(self.file_path)
-                if self.verbose:
-                    print(f"Creating table with name: {name}")
-                self.hana_df = create_dataframe_from_pandas(
-                    self.connection_context,
-                    self.df,
-                    name,
-                    disable_progressbar=not self.verbose,
-                    drop_exist_tab=True,
-                    force=True,
-                )
+                if self.staging is not None:
+                    self.staging.connection_context = self.connection_context
+                    self.hana_df = self.staging.load(self.df)
+                    name = self.staging.name
+                else:
+                    if self.verbose:
+                        print(f"Creating table with name: {name}")
+                    self.hana_df = create_dataframe_from_pandas(
+                        self.connection_context,
+                        self.df,
+                        name,
+                        disable_progressbar=not self.verbose,
+                        drop_exist_tab=True,
+                        force=True,
+                    )
                 self.table_name = name
             elif (
                 self.table_name is not None
@@ -111,6 +130,7 @@ class Input:
                     drop_exist_tab=True,
                     disable_progressbar=not self.verbose,
                 )
+                sqlstats.keep_table(self.connection_context, self.table_name)
             elif self.table_name is not None and self.df is not None:
                 if self.verbose:
                     print(
@@ -124,6 +144,7 @@ class Input:
                     drop_exist_tab=True,
                     disable_progressbar=not self.verbose,
                 )
+                sqlstats.keep_table(self.connection_context, self.table_name)
             self.hana_df.declare_lttab_usage(True)  # TODO: research
         if self.id_col is None:
             self.hana_df = self.hana_df.add_id(id_col="ID")
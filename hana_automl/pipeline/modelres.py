@@ -1,19 +1,85 @@
 from hana_automl.preprocess.settings import PreprocessorSettings
+from hana_automl.utils.sqlstats import SQLStats
 
 
 class ModelBoard:
-    """This class stores models that are shown in leaderboard."""
+    """This class stores models that are shown in leaderboard.
+
+    Attributes
+    ----------
+    sql : SQLStats
+        SQL traffic of the model's trial and validation.
+    trial : int
+        Number of the model's trial in the optimizer's TrialHistory.
+    """
 
     def __init__(
         self,
         algorithm,
         train_score: float,
         preprocessor: PreprocessorSettings,
+        sql: SQLStats = None,
+        trial: int = None,
     ):
         self.algorithm = algorithm
         self.train_score = train_score
         self.valid_score = 0
         self.preprocessor = preprocessor
+        self.sql = SQLStats() if sql is None else sql
+        self.trial = trial
 
     def add_valid_score(self, accuracy):
         self.valid_score = accuracy
+
+
+class LazyModel:
+    """Stored model that is fetched from the database only when it is used.
+
+    Name and version are known without loading. Any other attribute access (predict, score,
+    model_ ...) loads the model once with `loader` and is forwarded to it.
+
+    Attributes
+    ----------
+    name : str
+        Model name in storage.
+    version : int
+        Model version in storage.
+    """
+
+    def __init__(self, loader, name: str, version: int):
+        self.__dict__["_loader"] = loader
+        self.__dict__["_model"] = None
+        self.__dict__["name"] = name
+        self.__dict__["version"] = version
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def resolve(self):
+        """Returns loaded model, fetching it on first call."""
+        if self._model is None:
+            self.__dict__["_model"] = self._loader(self.name, self.version)
+        return self._model
+
+    def __getattr__(self, item):
+        return getattr(self.resolve(), item)
+
+    def __setattr__(self, key, value):
+        if key in ["name", "version"]:
+            self.__dict__[key] = value
+            if self._model is not None:
+                setattr(self._model, key, value)
+        else:
+            setattr(self.resolve(), key, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"LazyModel({self.name!r}, version={self.version}, {state})"
+
+
+def resolve_model(model):
+    """Returns the model itself, loading it first if it's a LazyModel."""
+    if isinstance(model, LazyModel):
+        return model.resolve()
+    return model
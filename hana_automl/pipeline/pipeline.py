@@ -1,11 +1,11 @@
-import time
-
 from hana_automl.optimizers.bayes import BayesianOptimizer
 from hana_automl.optimizers.optuna_optimizer import OptunaOptimizer
 from hana_automl.pipeline.data import Data
+from hana_automl.pipeline.history import TrialHistory
 from hana_automl.preprocess.preprocessor import Preprocessor
 
 from hana_automl.utils.error import PipelineError
+from hana_automl.utils.events import PHASE_CHANGED, EventBus
 
 
 class Pipeline:
@@ -23,6 +23,10 @@ class Pipeline:
         In seconds
     verbose
         Level of output.
+    history : TrialHistory
+        Record of trials that optimizers add to.
+    events : EventBus
+        Bus that the pipeline and optimizers emit progress to.
     """
 
     def __init__(
@@ -33,6 +37,8 @@ class Pipeline:
         time_limit: int = None,
         verbose=2,
         tuning_metric=None,
+        history: TrialHistory = None,
+        events: EventBus = None,
     ):
         self.data = data
         self.iter = steps
@@ -41,6 +47,8 @@ class Pipeline:
         self.opt = None
         self.verbose = verbose
         self.tuning_metric = tuning_metric
+        self.history = history
+        self.events = events
 
     def train(self, categorical_features: list = None, optimizer: str = None):
         """Preprocesses data and starts optimization.
@@ -63,8 +71,6 @@ class Pipeline:
         algo_list, self.task, algo_dict = pr.set_task(
             self.data, target=self.data.target, task=self.task
         )
-        if self.verbose > 0:
-            print("Task:", self.task)
         if self.task == "reg":
             if self.tuning_metric is None:
                 self.tuning_metric = "r2_score"
@@ -75,8 +81,14 @@ class Pipeline:
                 self.tuning_metric = "accuracy"
             if self.tuning_metric not in ["accuracy"]:
                 raise PipelineError(f"Wrong {self.task} task metric error")
-        if self.verbose > 0:
-            print("Tuning metric:", self.tuning_metric)
+        if self.events is not None:
+            self.events.emit(
+                PHASE_CHANGED,
+                phase="tuning",
+                task=self.task,
+                tuning_metric=self.tuning_metric,
+                optimizer=optimizer,
+            )
         if optimizer == "BayesianOptimizer":
             self.opt = BayesianOptimizer(
                 algo_list=algo_list,
@@ -87,6 +99,8 @@ class Pipeline:
                 problem=self.task,
                 verbose=self.verbose,
                 tuning_metric=self.tuning_metric,
+                history=self.history,
+                events=self.events,
             )
         elif optimizer == "OptunaSearch":
             self.opt = OptunaOptimizer(
@@ -99,9 +113,10 @@ class Pipeline:
                 categorical_features=categorical_features,
                 verbose=self.verbose,
                 tuning_metric=self.tuning_metric,
+                history=self.history,
+                events=self.events,
             )
         else:
             raise PipelineError("Optimizer not found!")
         self.opt.tune()
-        time.sleep(1)
         return self.opt
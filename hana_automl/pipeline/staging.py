@@ -0,0 +1,164 @@
+import uuid
+
+import hana_ml
+import pandas as pd
+from pandas.api import types
+
+from hana_automl.utils.error import InputError
+
+
+class StagingTable:
+    """Reusable table for uploading pandas dataframes to HANA.
+
+    The table is created on first upload and then only truncated and refilled, so repeated small
+    uploads don't create new tables. It is recreated only when columns of uploaded data change.
+    Rows are inserted with executemany on one cursor, which keeps the INSERT statement prepared
+    between calls.
+
+    Dataframes returned by previous :meth:`load` calls read from the same table, so they see the
+    newest data only. Results that are kept after the next upload, like `AutoML.predicted`, are
+    copied to their own table with :meth:`detach`.
+
+    Attributes
+    ----------
+    connection_context : hana_ml.ConnectionContext
+        Connection info to HANA database. Setting another connection context drops the table and
+        closes the cursor, which belong to the previous connection.
+    name : str
+        Table name. By default a local temporary table, which exists only in this connection.
+    """
+
+    def __init__(
+        self, connection_context: hana_ml.ConnectionContext = None, name: str = None
+    ):
+        if name is None:
+            name = f"#AUTOML_STAGING_{uuid.uuid4().hex.upper()}"
+        self.name = name
+        self.columns = None
+        self.insert_statement = None
+        self.cursor = None
+        self._connection_context = None
+        self.connection_context = connection_context
+
+    @property
+    def connection_context(self) -> hana_ml.ConnectionContext:
+        return self._connection_context
+
+    @connection_context.setter
+    def connection_context(self, connection_context: hana_ml.ConnectionContext):
+        if connection_context is not self._connection_context:
+            try:
+                self.drop()
+            except Exception:
+                # the previous connection may be closed already
+                pass
+        self._connection_context = connection_context
+
+    def load(self, df: pd.DataFrame) -> hana_ml.DataFrame:
+        """Replaces table content with df.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Data to upload.
+
+        Returns
+        -------
+        hana_ml.DataFrame
+            Dataframe pointing to the staging table.
+        """
+        if self.connection_context is None:
+            raise InputError("Connection is required for data upload")
+        columns = [(str(name), sql_type(df[name])) for name in df.columns]
+        if self.cursor is None:
+            self.cursor = self.connection_context.connection.cursor()
+        if columns != self.columns:
+            if self.columns is not None:
+                self.cursor.execute(f'DROP TABLE "{self.name}"')
+            temporary = "LOCAL TEMPORARY " if self.name.startswith("#") else ""
+            definition = ", ".join(f'"{name}" {tp}' for name, tp in columns)
+            self.cursor.execute(
+                f'CREATE {temporary}COLUMN TABLE "{self.name}" ({definition})'
+            )
+            self.columns = columns
+            params = ", ".join("?" * len(columns))
+            self.insert_statement = f'INSERT INTO "{self.name}" VALUES ({params})'
+        else:
+            self.cursor.execute(f'TRUNCATE TABLE "{self.name}"')
+        return self.append(df)
+
+    def append(self, df: pd.DataFrame) -> hana_ml.DataFrame:
+        """Adds rows of df to the table, which has to be created by :meth:`load` before.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Data with the same columns as in the last :meth:`load` call.
+
+        Returns
+        -------
+        hana_ml.DataFrame
+            Dataframe pointing to the staging table.
+        """
+        if self.columns is None:
+            raise InputError("Staging table is not created yet")
+        rows = list(
+            df.astype(object)
+            .where(pd.notnull(df), None)
+            .itertuples(index=False, name=None)
+        )
+        if rows:
+            self.cursor.executemany(self.insert_statement, rows)
+        if not self.connection_context.connection.getautocommit():
+            self.connection_context.connection.commit()
+        return self.connection_context.table(self.name)
+
+    def detach(self, df: hana_ml.DataFrame) -> hana_ml.DataFrame:
+        """Returns df itself, or its copy in a new table if df reads from the staging table.
+
+        Parameters
+        ----------
+        df : hana_ml.DataFrame
+            Dataframe that has to keep its data after the next :meth:`load`.
+
+        Returns
+        -------
+        hana_ml.DataFrame
+            Dataframe that doesn't depend on the staging table.
+        """
+        statement = getattr(df, "select_statement", None)
+        if (
+            self.columns is None
+            or statement is None
+            or f'"{self.name}"' not in statement
+        ):
+            return df
+        name = f"AUTOML_DETACHED_{uuid.uuid4().hex.upper()}"
+        df.save(name)
+        return self.connection_context.table(name)
+
+    def drop(self):
+        """Drops the table and closes its cursor. The object can be reused after it."""
+        if self.cursor is None:
+            return
+        try:
+            if self.columns is not None:
+                self.cursor.execute(f'DROP TABLE "{self.name}"')
+        finally:
+            self.cursor.close()
+            self.cursor = None
+            self.columns = None
+            self.insert_statement = None
+
+
+def sql_type(column: pd.Series) -> str:
+    """Returns HANA column type for pandas series."""
+    if types.is_bool_dtype(column):
+        return "BOOLEAN"
+    if types.is_integer_dtype(column):
+        return "BIGINT"
+    if types.is_float_dtype(column):
+        return "DOUBLE"
+    if types.is_datetime64_any_dtype(column):
+        return "TIMESTAMP"
+    return "NVARCHAR(5000)"
@@ -0,0 +1,305 @@
+import math
+
+import pandas as pd
+from hana_ml import DataFrame
+
+from hana_automl.utils.error import PreprocessError
+
+NUMERIC_TYPES = ["INT", "SMALLINT", "TINYINT", "BIGINT", "DOUBLE", "DECIMAL", "REAL"]
+INTEGER_TYPES = ["INT", "SMALLINT", "MEDIUMINT", "INTEGER", "BIGINT"]
+
+
+class PreprocessingPlan:
+    """Tuned preprocessing compiled into one SELECT statement.
+
+    Fill values and scaling constants are computed once on the training data, so at inference
+    preprocessing is a single SQL projection with COALESCE and arithmetic expressions instead of
+    PAL Imputer and FeatureNormalizer calls.
+
+    Attributes
+    ----------
+    columns : list
+        Compiled columns as [name, fill, cast_double, normalized, offset, scale] lists,
+        in output order. Value is computed as (COALESCE(name, fill) - offset) / scale.
+    delete : list
+        Columns whose missing values remove the whole row.
+    """
+
+    def __init__(self, columns: list = None, delete: list = None):
+        self.columns = columns if columns is not None else list()
+        self.delete = delete if delete is not None else list()
+
+    @staticmethod
+    def compile(df: DataFrame, id: str, target: str, settings):
+        """Computes plan for tuned settings from training data.
+
+        Parameters
+        ----------
+        df : DataFrame
+            Training data. Statistics are taken from it with at most three queries.
+        id : str
+            ID column.
+        target : str
+            Target column. ID and target are passed through unchanged.
+        settings : PreprocessorSettings
+            Tuned preprocessor settings.
+
+        Returns
+        -------
+        PreprocessingPlan
+            Compiled plan or None, if settings can't be expressed in SQL (e.g. 'als' imputation).
+        """
+        if settings.tuned_num_strategy not in ["mean", "median", "delete"]:
+            return None
+        by_col = dict()
+        for rule in settings.strategy_by_col or []:
+            if rule[1] not in [
+                "non",
+                "delete",
+                "most_frequent",
+                "categorical_const",
+                "mean",
+                "median",
+                "numerical_const",
+            ]:
+                return None
+            by_col[rule[0]] = list(rule[1:])
+        categorical = set(settings.categorical_cols or [])
+        exceptions = set(settings.normalization_exceptions or [])
+        types = {column[0]: column[1] for column in df.dtypes()}
+        features = [c for c in df.columns if c not in [id, target]]
+
+        strategies = dict()
+        for column in features:
+            numeric = types[column] in NUMERIC_TYPES and column not in categorical
+            if column in by_col:
+                strategies[column] = by_col[column]
+            elif settings.tuned_num_strategy == "delete":
+                strategies[column] = ["delete"]
+            elif numeric:
+                strategies[column] = [settings.tuned_num_strategy]
+            else:
+                strategies[column] = ["most_frequent"]
+        fills = collect_fill_values(df, strategies, types)
+        for column, strategy in strategies.items():
+            if strategy[0] in ["categorical_const", "numerical_const"]:
+                fills[column] = strategy[1]
+        for column in features:
+            if column in fills and fills[column] is not None:
+                if types[column] in INTEGER_TYPES and strategies[column][0] in [
+                    "mean",
+                    "median",
+                ]:
+                    fills[column] = round(fills[column])
+        delete = [c for c in features if strategies[c][0] == "delete"]
+
+        # same column selection as Preprocessor.normalize
+        cast_double = list()
+        if settings.tuned_normalize_int:
+            cast_double = [
+                c
+                for c in features
+                if types[c] in INTEGER_TYPES and c not in categorical
+            ]
+        normalized = list()
+        for column in features:
+            column_type = "DOUBLE" if column in cast_double else types[column]
+            if (
+                column not in categorical
+                and column not in exceptions
+                and column_type in NUMERIC_TYPES
+                and column_type != "INT"
+            ):
+                normalized.append(column)
+
+        plan = PreprocessingPlan(delete=delete)
+        for column in features:
+            plan.columns.append(
+                [column, fills.get(column), column in cast_double, False, 0.0, 1.0]
+            )
+        constants = collect_scaling(
+            df,
+            plan,
+            normalized,
+            settings.tuned_normalizer_strategy,
+            settings.tuned_z_score_method,
+        )
+        for entry in plan.columns:
+            if entry[0] in constants:
+                entry[3] = True
+                entry[4], entry[5] = constants[entry[0]]
+        # normalized columns go after the others, like in Preprocessor.normalize
+        plan.columns = [e for e in plan.columns if not e[3]] + [
+            e for e in plan.columns if e[3]
+        ]
+        return plan
+
+    def expressions(self) -> dict:
+        """Returns SQL expression for every compiled column."""
+        result = dict()
+        for name, fill, cast_double, normalized, offset, scale in self.columns:
+            expression = quote(name)
+            if fill is not None:
+                expression = f"COALESCE({expression}, {literal(fill)})"
+            if cast_double or normalized:
+                expression = f"CAST({expression} AS DOUBLE)"
+            if normalized:
+                expression = f"(({expression} - {offset!r}) / {scale!r})"
+            result[name] = expression
+        return result
+
+    def select_statement(self, df: DataFrame) -> str:
+        """Returns SELECT statement that applies the plan to df."""
+        expressions = self.expressions()
+        names = [entry[0] for entry in self.columns]
+        missing = [name for name in names if name not in df.columns]
+        if len(missing) > 0:
+            raise PreprocessError(f"Columns {missing} are missing in data")
+        plain = [c for c in df.columns if c not in names]
+        compiled = [e[0] for e in self.columns if not e[3]]
+        scaled = [e[0] for e in self.columns if e[3]]
+        # keep position of passed through columns (ID, target) among not normalized ones
+        ordered = [c for c in df.columns if c in plain or c in compiled] + scaled
+        selection = ", ".join(
+            f"{expressions[c]} AS {quote(c)}" if c in expressions else quote(c)
+            for c in ordered
+        )
+        statement = f"SELECT {selection} FROM ({df.select_statement}) AS PLAN_SOURCE"
+        if len(self.delete) > 0:
+            conditions = " AND ".join(f"{quote(c)} IS NOT NULL" for c in self.delete)
+            statement += f" WHERE {conditions}"
+        return statement
+
+    def apply(self, df: DataFrame) -> DataFrame:
+        """Applies plan to df without PAL calls."""
+        return df.connection_context.sql(self.select_statement(df))
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Applies plan to pandas data, same as :meth:`apply` does in HANA."""
+        names = [entry[0] for entry in self.columns]
+        missing = [name for name in names if name not in df.columns]
+        if len(missing) > 0:
+            raise PreprocessError(f"Columns {missing} are missing in data")
+        if len(self.delete) > 0:
+            df = df.dropna(subset=self.delete)
+        result = df[[c for c in df.columns if c not in names]].copy()
+        for name, fill, cast_double, normalized, offset, scale in self.columns:
+            column = df[name]
+            if fill is not None:
+                column = column.fillna(fill)
+            if cast_double or normalized:
+                column = column.astype(float)
+            if normalized:
+                column = (column - offset) / scale
+            result[name] = column
+        order = [c for c in df.columns if c not in names] + names
+        return result[order]
+
+    def to_dict(self) -> dict:
+        return {"columns": self.columns, "delete": self.delete}
+
+    @staticmethod
+    def from_dict(data):
+        """Restores plan from to_dict output (dict or object with the same attributes)."""
+        if data is None:
+            return None
+        if not isinstance(data, dict):
+            data = vars(data)
+        return PreprocessingPlan(
+            columns=[list(entry) for entry in data["columns"]],
+            delete=list(data["delete"]),
+        )
+
+
+def collect_fill_values(df: DataFrame, strategies: dict, types: dict) -> dict:
+    """Computes imputation values with one aggregate query and one query for modes."""
+    aggregates = {"mean": "AVG", "median": "MEDIAN"}
+    stats = [c for c, s in strategies.items() if s[0] in aggregates]
+    frequent = [c for c, s in strategies.items() if s[0] == "most_frequent"]
+    fills = dict()
+    conn = df.connection_context
+    if len(stats) > 0:
+        selection = ", ".join(
+            f"{aggregates[strategies[c][0]]}({quote(c)})" for c in stats
+        )
+        row = conn.sql(
+            f"SELECT {selection} FROM ({df.select_statement}) AS FILL_SOURCE"
+        ).collect()
+        for i, column in enumerate(stats):
+            value = row.iloc[0, i]
+            fills[column] = None if value is None else float(value)
+    if len(frequent) > 0:
+        parts = list()
+        for i, column in enumerate(frequent):
+            parts.append(
+                f"SELECT * FROM (SELECT {i} AS N, TO_NVARCHAR({quote(column)}) AS V, "
+                f"COUNT(*) AS C FROM ({df.select_statement}) AS MODE_SOURCE "
+                f"WHERE {quote(column)} IS NOT NULL GROUP BY {quote(column)} "
+                f"ORDER BY C DESC, V LIMIT 1) AS MODE{i}"
+            )
+        result = conn.sql(" UNION ALL ".join(parts)).collect()
+        for n, value in zip(result.iloc[:, 0], result.iloc[:, 1]):
+            column = frequent[int(n)]
+            if types[column] in INTEGER_TYPES:
+                value = int(value)
+            elif types[column] in NUMERIC_TYPES:
+                value = float(value)
+            fills[column] = value
+    return fills
+
+
+def collect_scaling(
+    df: DataFrame, plan: PreprocessingPlan, columns: list, method: str, z_score: str
+) -> dict:
+    """Computes (offset, scale) for normalized columns with one query over imputed data."""
+    if len(columns) == 0:
+        return dict()
+    imputed = plan.select_statement(df)
+    expressions = list()
+    for column in columns:
+        c = f"CAST(D.{quote(column)} AS DOUBLE)"
+        if method == "min-max":
+            expressions += [f"MIN({c})", f"MAX({c})"]
+        elif method == "z-score" and z_score == "mean-mean":
+            expressions += [f"AVG({c})", f"AVG(ABS({c} - M.{quote(column)}))"]
+        elif method == "z-score":
+            expressions += [f"AVG({c})", f"STDDEV({c})"]
+        else:
+            expressions += [f"MAX(ABS({c}))", "0"]
+    source = f"({imputed}) AS D"
+    if method == "z-score" and z_score == "mean-mean":
+        means = ", ".join(
+            f"AVG(CAST({quote(c)} AS DOUBLE)) AS {quote(c)}" for c in columns
+        )
+        source += f", (SELECT {means} FROM ({imputed})) AS M"
+    row = (
+        df.connection_context.sql(f"SELECT {', '.join(expressions)} FROM {source}")
+        .collect()
+        .iloc[0]
+    )
+    constants = dict()
+    for i, column in enumerate(columns):
+        first, second = row.iloc[2 * i], row.iloc[2 * i + 1]
+        first = 0.0 if first is None else float(first)
+        second = 0.0 if second is None else float(second)
+        if method == "min-max":
+            offset, scale = first, second - first
+        elif method == "z-score":
+            offset, scale = first, second
+        else:
+            offset = 0.0
+            scale = 10.0 ** (math.floor(math.log10(first)) + 1) if first > 0 else 1.0
+        if scale == 0 or math.isnan(scale):
+            scale = 1.0
+        constants[column] = (offset, scale)
+    return constants
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
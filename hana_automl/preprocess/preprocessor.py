@@ -1,59 +1,74 @@
 import copy
 import math
 from hana_ml import DataFrame
-from hana_ml.algorithms.pal.neighbors import KNNRegressor
 from hana_ml.algorithms.pal.preprocessing import (
     Imputer,
     FeatureNormalizer,
     variance_test,
 )
 
-from hana_automl.algorithms.classification.decisiontreecls import DecisionTreeCls
-from hana_automl.algorithms.classification.gradboostcls import GBCls
-from hana_automl.algorithms.classification.hybgradboostcls import HGBCls
-from hana_automl.algorithms.classification.kneighborscls import KNeighborsCls
-from hana_automl.algorithms.classification.logregressioncls import LogRegressionCls
-from hana_automl.algorithms.classification.mlpcl import MLPcls
-from hana_automl.algorithms.classification.naive_bayes import NBayesCls
-from hana_automl.algorithms.classification.rdtclas import RDTCls
-from hana_automl.algorithms.classification.svc import SVCls
-from hana_automl.algorithms.regression.decisiontreereg import DecisionTreeReg
-from hana_automl.algorithms.regression.expreg import ExponentialReg
-from hana_automl.algorithms.regression.glmreg import GLMReg
-from hana_automl.algorithms.regression.gradboostreg import GBReg
-from hana_automl.algorithms.regression.hybgradboostreg import HGBReg
-from hana_automl.algorithms.regression.kneighborsreg import KNeighborsReg
-from hana_automl.algorithms.regression.mlpreg import MLPreg
-from hana_automl.algorithms.regression.rdtreg import RDTReg
-from hana_automl.algorithms.regression.svr import SVReg
+from hana_automl.algorithms import registry
+from hana_automl.preprocess.plan import PreprocessingPlan
 from hana_automl.utils.error import PreprocessError
+from hana_automl.utils.tracing import keywords, traced
+
+# turned off, neither tuned nor loaded from storage
+DISABLED_TITLES = ["LogisticRegressionClassifier", "GLMRegressor"]
+# algorithms tuned by BayesianOptimizer, in order; OptunaOptimizer also tunes ExponentialRegressor
+CLASSIFICATION_TITLES = [
+    "DecisionTreeClassifier",
+    "KNeighborsClassifier",
+    "NaiveBayesClassifier",
+    "MLPClassifier",
+    "SupportVectorClassifier",
+    "RandomDecisionTreeClassifier",
+    "GradientBoostingClassifier",
+    "HybridGradientBoostingClassifier",
+]
+REGRESSION_TITLES = [
+    "DecisionTreeRegressor",
+    "KNNRegressor",
+    "MLPRegressor",
+    "SupportVectorRegressor",
+    "Random_Decision_Tree_Regressor",
+    "GradientBoostingRegressor",
+    "HybridGradientBoostingRegressor",
+]
 
 
 class Preprocessor:
     def __init__(self):
-        self.clsdict = {
-            "KNeighborsClassifier": KNeighborsCls(),
-            "DecisionTreeClassifier": DecisionTreeCls(),
-            # "LogisticRegressionClassifier": log,
-            "NaiveBayesClassifier": NBayesCls(),
-            "MLPClassifier": MLPcls(),
-            "SupportVectorClassifier": SVCls(),
-            "RandomDecisionTreeClassifier": RDTCls(),
-            "GradientBoostingClassifier": GBCls(),
-            "HybridGradientBoostingClassifier": HGBCls(),
-        }
-        self.regdict = {
-            "DecisionTreeRegressor": DecisionTreeReg(),
-            # "GLMRegressor": GLMReg(),
-            "ExponentialRegressor": ExponentialReg(),
-            "MLPRegressor": MLPreg(),
-            "Random_Decision_Tree_Regressor": RDTReg(),
-            "SupportVectorRegressor": SVReg(),
-            "GradientBoostingRegressor": GBReg(),
-            "HybridGradientBoostingRegressor": HGBReg(),
-            "KNNRegressor": KNeighborsReg(),
-        }
+        self._clsdict = None
+        self._regdict = None
+
+    @property
+    def clsdict(self) -> dict:
+        """Classification algorithms by title, created (and imported) on first access."""
+        if self._clsdict is None:
+            self._clsdict = {
+                title: registry.create(title)
+                for title in registry.CLASSIFIERS
+                if title not in DISABLED_TITLES
+            }
+        return self._clsdict
 
+    @property
+    def regdict(self) -> dict:
+        """Regression algorithms by title, created (and imported) on first access."""
+        if self._regdict is None:
+            self._regdict = {
+                title: registry.create(title)
+                for title in registry.REGRESSORS
+                if title not in DISABLED_TITLES
+            }
+        return self._regdict
+
+    @traced(
+        "autoimput",
+        attributes=keywords(
+            "imputer_num_strategy", "normalizer_strategy", "normalize_int"
+        ),
+    )
     def autoimput(
         self,
         df: DataFrame = None,
@@ -105,6 +120,39 @@ class Preprocessor:
         )
         return result
 
+    def apply_settings(self, df: DataFrame, id: str, settings, target: str = None):
+        """Preprocesses data with tuned settings.
+
+        Uses compiled preprocessing plan if settings have it, so no PAL calls are made.
+        Otherwise falls back to :meth:`autoimput`.
+        """
+        plan = PreprocessingPlan.from_dict(getattr(settings, "compiled_plan", None))
+        if plan is not None:
+            return plan.apply(df)
+        return self.autoimput(
+            df=df,
+            id=id,
+            target=target,
+            strategy_by_col=settings.strategy_by_col,
+            imputer_num_strategy=settings.tuned_num_strategy,
+            normalizer_strategy=settings.tuned_normalizer_strategy,
+            normalizer_z_score_method=settings.tuned_z_score_method,
+            normalize_int=settings.tuned_normalize_int,
+            categorical_list=settings.categorical_cols,
+            normalization_excp=settings.normalization_exceptions,
+        )
+
+    def compile_settings(self, df: DataFrame, id: str, target: str, settings):
+        """Compiles tuned settings into a preprocessing plan and stores it in settings.
+
+        Parameters
+        ----------
+        df : DataFrame
+            Training data, fill values and scaling constants are computed from it.
+        """
+        plan = PreprocessingPlan.compile(df, id, target, settings)
+        settings.compiled_plan = None if plan is None else plan.to_dict()
+
     def removecolumns(self, columns: list, df: DataFrame):
         if df is None:
             raise PreprocessError("Enter not null data!")
@@ -229,22 +277,17 @@ class Preprocessor:
         if task == "cls":
             if data.binomial:
                 vals = data.train.select(data.target).collect()[data.target].unique()
-                log = LogRegressionCls(
-                    binominal=data.binomial, class_map0=vals[0], class_map1=vals[1]
+                log = registry.create(
+                    "LogisticRegressionClassifier",
+                    binominal=data.binomial,
+                    class_map0=vals[0],
+                    class_map1=vals[1],
                 )
             else:
-                log = LogRegressionCls(binominal=data.binomial)
-            self.clslist = [
-                DecisionTreeCls(),
-                KNeighborsCls(),
-                # log,
-                NBayesCls(),
-                MLPcls(),
-                SVCls(),
-                RDTCls(),
-                GBCls(),
-                HGBCls(),
-            ]
+                log = registry.create(
+                    "LogisticRegressionClassifier", binominal=data.binomial
+                )
+            self.clslist = [registry.create(title) for title in CLASSIFICATION_TITLES]
             clslist = [i for i in self.clslist if i.title not in algo_exceptions]
             clsdict = {
                 key: value
@@ -253,16 +296,7 @@ class Preprocessor:
             }
             return clslist, "cls", clsdict
         else:
-            self.reglist = [
-                DecisionTreeReg(),
-                # GLMReg(),
-                KNeighborsReg(),
-                MLPreg(),
-                SVReg(),
-                RDTReg(),
-                GBReg(),
-                HGBReg(),
-            ]
+            self.reglist = [registry.create(title) for title in REGRESSION_TITLES]
             reglist = [i for i in self.reglist if i.title not in algo_exceptions]
             regdict = {
                 key: value
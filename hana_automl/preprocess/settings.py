@@ -5,6 +5,8 @@ class PreprocessorSettings:
     ----------
     num_strategy : str
         Strategy of preprocessing.
+    compiled_plan : dict
+        Tuned preprocessing compiled to SQL (see :class:`PreprocessingPlan`), None if it wasn't compiled.
     """
 
     def __init__(self, strategy_by_col: list):
@@ -22,3 +24,4 @@ class PreprocessorSettings:
         self.categorical_cols: list = None
         self.task: str = None
         self.normalization_exceptions = None
+        self.compiled_plan: dict = None
@@ -0,0 +1,400 @@
+import asyncio
+import bisect
+import json
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from hana_automl.artifacts import ArtifactCache
+from hana_automl.storage import Storage
+from hana_automl.utils.error import AutoMLError
+
+ROW_ID = "SERVING_ROW_ID"
+LATENCY_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class Histogram:
+    """Cumulative histogram, like Prometheus ones.
+
+    Attributes
+    ----------
+    buckets : list
+        Upper bounds of buckets.
+    counts : list
+        Number of observations in every bucket, the last one is for values above all bounds.
+    """
+
+    def __init__(self, buckets: list = None):
+        self.buckets = LATENCY_BUCKETS if buckets is None else buckets
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        cumulative, result = 0, dict()
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            result[str(bound)] = cumulative
+        return {"buckets": result, "sum": self.total, "count": self.count}
+
+
+class ConnectionPool:
+    """Bounded pool of database connections, created on demand.
+
+    Attributes
+    ----------
+    factory : callable
+        Function without arguments that opens a new connection.
+    size : int
+        Maximum number of open connections.
+    """
+
+    def __init__(self, factory, size: int = 4):
+        self.factory = factory
+        self.size = size
+        self.created = 0
+        self.idle = asyncio.LifoQueue()
+
+    async def acquire(self):
+        if self.idle.empty() and self.created < self.size:
+            self.created += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self.factory
+                )
+            except Exception:
+                self.created -= 1
+                raise
+        return await self.idle.get()
+
+    def release(self, connection):
+        self.idle.put_nowait(connection)
+
+    def close(self):
+        while not self.idle.empty():
+            connection = self.idle.get_nowait()
+            if hasattr(connection, "close"):
+                connection.close()
+        self.created = 0
+
+
+class ServedModel:
+    """Loaded model with its own connection and a queue of pending rows."""
+
+    def __init__(self, key: tuple, automl, connection):
+        self.key = key
+        self.automl = automl
+        self.connection = connection
+        self.queue = asyncio.Queue()
+        self.worker = None
+        self.latency = Histogram()
+        self.batch_size = Histogram([1, 2, 5, 10, 20, 50, 100, 200, 500])
+        self.requests = 0
+        self.closing = False
+
+
+class PredictionService:
+    """Serves predictions of stored models, merging concurrent requests into batches.
+
+    Models are loaded on first request and kept in an LRU cache. Every cached model holds one
+    connection from the pool, so the pool size limits the cache. Models being loaded count
+    against the cache size too, and concurrent requests of one model share its load. Rows sent to a model within
+    `window_ms` of each other are predicted with one AutoML.predict call (one staged upload and one
+    PAL predict).
+
+    Parameters
+    ----------
+    connection_factory : callable
+        Opens a new database connection (hana_ml.ConnectionContext).
+    loader : callable
+        loader(connection, name, version) returns AutoML object. By default models are loaded
+        with :meth:`hana_automl.storage.Storage.load_model`.
+    schema : str
+        Schema with model storage, used by default loader.
+    cache_dir : str
+        Local model cache of default loader (see :class:`hana_automl.artifacts.ArtifactCache`).
+        Restarted services restore models from it without reading storage tables.
+    cache_size : int
+        Maximum number of warm models.
+    pool_size : int
+        Maximum number of database connections. Can't be less than cache_size.
+    window_ms : float
+        How long the batch waits for more rows after the first one.
+    max_batch : int
+        Maximum number of rows in one batch.
+    """
+
+    def __init__(
+        self,
+        connection_factory,
+        loader=None,
+        schema: str = None,
+        cache_dir: str = None,
+        cache_size: int = 4,
+        pool_size: int = None,
+        window_ms: float = 5,
+        max_batch: int = 256,
+    ):
+        if pool_size is None:
+            pool_size = cache_size
+        if pool_size < cache_size:
+            raise AutoMLError("Connection pool must be at least as big as model cache")
+        if loader is None:
+            loader = storage_loader(schema, cache_dir)
+        self.loader = loader
+        self.connection_factory = connection_factory
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pool = None
+        self.models = OrderedDict()
+        self.loading = dict()
+        # key -> number of requests waiting for the model to load, such models aren't evicted
+        self.waiting = dict()
+        # cache slots taken by models being loaded
+        self.reserved = 0
+        self.admission = None
+        self.changed = None
+        self.evictions = 0
+
+    async def predict(self, name: str, version: int, row: dict) -> dict:
+        """Predicts one row. Returns model output columns (without ID) for it."""
+        start = time.perf_counter()
+        served = await self.model(name, version)
+        while served.closing:
+            served = await self.model(name, version)
+        future = asyncio.get_running_loop().create_future()
+        served.queue.put_nowait((row, future))
+        served.requests += 1
+        try:
+            return await future
+        finally:
+            served.latency.observe((time.perf_counter() - start) * 1000)
+
+    async def model(self, name: str, version: int) -> ServedModel:
+        if self.pool is None:
+            self.pool = ConnectionPool(self.connection_factory, self.pool_size)
+            self.admission = asyncio.Lock()
+            self.changed = asyncio.Event()
+        key = (name, version)
+        if key in self.models:
+            self.models.move_to_end(key)
+            return self.models[key]
+        if key not in self.loading:
+            self.loading[key] = asyncio.ensure_future(self.__load(key))
+        self.waiting[key] = self.waiting.get(key, 0) + 1
+        try:
+            return await asyncio.shield(self.loading[key])
+        finally:
+            # the caller queues its row right after this, without yielding to the loop
+            self.waiting[key] -= 1
+            if self.waiting[key] == 0:
+                del self.waiting[key]
+                self.changed.set()
+            if self.loading.get(key) is not None and self.loading[key].done():
+                del self.loading[key]
+
+    async def __load(self, key: tuple) -> ServedModel:
+        await self.__reserve()
+        try:
+            connection = await self.pool.acquire()
+            try:
+                automl = await asyncio.get_running_loop().run_in_executor(
+                    None, self.loader, connection, key[0], key[1]
+                )
+            except Exception:
+                self.pool.release(connection)
+                raise
+            served = ServedModel(key, automl, connection)
+            served.worker = asyncio.ensure_future(self.__work(served))
+            self.models[key] = served
+            return served
+        finally:
+            self.reserved -= 1
+            self.changed.set()
+
+    async def __reserve(self):
+        """Takes a cache slot for a model to load, evicting least recently used models.
+
+        Models whose requests haven't queued their rows yet are skipped, otherwise two loads
+        could evict each other's models forever.
+        """
+        async with self.admission:
+            while len(self.models) + self.reserved >= self.cache_size:
+                idle = [key for key in self.models if key not in self.waiting]
+                if len(idle) > 0:
+                    await self.__evict(idle[0])
+                else:
+                    # every slot is taken by a load in flight or its waiting requests
+                    self.changed.clear()
+                    await self.changed.wait()
+            self.reserved += 1
+
+    async def __evict(self, key: tuple):
+        served = self.models.pop(key)
+        self.evictions += 1
+        # rows that are already queued are still predicted, then the worker stops
+        served.closing = True
+        served.queue.put_nowait(None)
+        await served.worker
+        if hasattr(served.automl, "close"):
+            served.automl.close()
+        self.pool.release(served.connection)
+
+    async def __work(self, served: ServedModel):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            batch = [await served.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch and batch[-1] is not None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(served.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if batch[-1] is None:
+                stop = True
+                batch.pop()
+                if len(batch) == 0:
+                    break
+            served.batch_size.observe(len(batch))
+            rows = [row for row, _ in batch]
+            try:
+                result = await loop.run_in_executor(
+                    None, predict_batch, served.automl, rows
+                )
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), prediction in zip(batch, result):
+                if not future.done():
+                    future.set_result(prediction)
+
+    def metrics(self) -> dict:
+        """Returns cache, pool and per-model queue depth and latency (ms) statistics."""
+        return {
+            "cache": {
+                "size": len(self.models),
+                "capacity": self.cache_size,
+                "evictions": self.evictions,
+            },
+            "pool": {
+                "size": self.pool_size,
+                "open": 0 if self.pool is None else self.pool.created,
+            },
+            "models": {
+                f"{name}:{version}": {
+                    "queue_depth": served.queue.qsize(),
+                    "requests": served.requests,
+                    "latency_ms": served.latency.to_dict(),
+                    "batch_size": served.batch_size.to_dict(),
+                }
+                for (name, version), served in self.models.items()
+            },
+        }
+
+    async def close(self):
+        """Stops workers, closes models and connections."""
+        for key in list(self.models):
+            await self.__evict(key)
+        if self.pool is not None:
+            self.pool.close()
+
+    async def handle(self, reader, writer):
+        """Handles one HTTP connection.
+
+        Routes:
+        POST /predict/<model>/<version> with {"row": {...}} or {"rows": [...]} JSON body,
+        GET /metrics and GET /health.
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = dict()
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, response = await self.route(request_line, body)
+        except Exception as error:
+            status, response = 500, {"error": str(error)}
+        payload = json.dumps(response, default=str).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        writer.close()
+
+    async def route(self, request_line: list, body: bytes):
+        if len(request_line) < 2:
+            return 400, {"error": "Bad request"}
+        method, path = request_line[0], request_line[1].strip("/").split("/")
+        if method == "GET" and path == ["metrics"]:
+            return 200, self.metrics()
+        if method == "GET" and path == ["health"]:
+            return 200, {"status": "ok"}
+        if method == "POST" and len(path) == 3 and path[0] == "predict":
+            request = json.loads(body or b"{}")
+            name, version = path[1], int(path[2])
+            if "rows" in request:
+                predictions = await asyncio.gather(
+                    *[self.predict(name, version, row) for row in request["rows"]]
+                )
+                return 200, {"predictions": predictions}
+            prediction = await self.predict(name, version, request["row"])
+            return 200, {"prediction": prediction}
+        return 404, {"error": "Not found"}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        """Starts HTTP server and returns it."""
+        return await asyncio.start_server(self.handle, host, port)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """Runs HTTP server until interrupted."""
+
+        async def run():
+            server = await self.start(host, port)
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                await self.close()
+
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+
+
+def predict_batch(automl, rows: list) -> list:
+    """Predicts rows with one AutoML.predict call and returns output row for each of them."""
+    df = pd.DataFrame(rows)
+    df[ROW_ID] = range(len(rows))
+    result = automl.predict(df=df, id_column=ROW_ID, verbose=0)
+    result = result.set_index(ROW_ID).sort_index()
+    return result.reindex(range(len(rows))).to_dict("records")
+
+
+def storage_loader(schema: str, cache_dir: str = None):
+    cache = None if cache_dir is None else ArtifactCache(cache_dir)
+
+    def load(connection, name: str, version: int):
+        return Storage(connection, schema).load_model(name, version, cache=cache)
+
+    return load
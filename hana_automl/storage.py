@@ -1,4 +1,8 @@
 import json
+import mmap
+import uuid
+import zipfile
+from contextlib import contextmanager
 from types import SimpleNamespace
 
 import pandas as pd
@@ -6,16 +10,32 @@ from hana_ml.dataframe import ConnectionContext
 from hana_ml.model_storage import ModelStorage
 from typing import List
 
+from hana_automl.algorithms import registry
 from hana_automl.algorithms.base_algo import BaseAlgorithm
 from hana_automl.algorithms.ensembles.blendcls import BlendingCls
 from hana_automl.algorithms.ensembles.blendreg import BlendingReg
+from hana_automl.algorithms.ensembles.greedy import GreedyEnsemble
+from hana_automl.algorithms.ensembles.stacking import Stacking
+from hana_automl.artifacts import (
+    BUNDLE_VERSION,
+    ArtifactCache,
+    entry_buffer,
+    read_lob,
+    table_chunks,
+    write_table_chunks,
+)
 from hana_automl.automl import AutoML
-from hana_automl.pipeline.modelres import ModelBoard
-from hana_automl.preprocess.preprocessor import Preprocessor
+from hana_automl.pipeline.modelres import LazyModel, ModelBoard
+from hana_automl.pipeline.staging import StagingTable
+from hana_automl.preprocess.plan import PreprocessingPlan
 from hana_automl.preprocess.settings import PreprocessorSettings
 from hana_automl.utils.error import StorageError
 
 PREPROCESSORS = "AUTOML_PREPROCESSOR_STORAGE"
+PREPROCESSOR_COLUMNS = (
+    "MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC, PLAN"
+)
+PREPROCESSOR_INDEX = "AUTOML_PREPROCESSOR_STORAGE_MODEL_VERSION"
 ensemble_prefix = "ensemble"
 leaderboard_prefix = "leaderboard"
 
@@ -44,13 +64,19 @@ class Storage(ModelStorage):
         self.create_prep_table = (
             f"CREATE TABLE {self.schema}.{PREPROCESSORS} "
             f"(MODEL NVARCHAR(256), VERSION INT, "
-            f"JSON NVARCHAR(5000), TRAIN_ACC DOUBLE, VALID_ACC DOUBLE, ALGORITHM NVARCHAR(256), METRIC NVARCHAR(256));"
+            f"JSON NVARCHAR(5000), TRAIN_ACC DOUBLE, VALID_ACC DOUBLE, "
+            f"ALGORITHM NVARCHAR(256), METRIC NVARCHAR(256), PLAN NCLOB);"
         )
+        # tables created before compiled preprocessing have no PLAN column;
+        # None until checked
+        self.plan_column = None
+        # tables created before the index have no PREPROCESSOR_INDEX; None until checked
+        self.prep_index = None
         if not table_exists(self.cursor, self.schema, PREPROCESSORS):
-            self.cursor.execute(self.create_prep_table)
-        preprocessor = Preprocessor()
-        self.cls_dict = preprocessor.clsdict
-        self.reg_dict = preprocessor.regdict
+            self.__create_prep_table()
+        # (name, prefix) -> [(model name, version)], cleared on every write
+        self.metadata_cache = dict()
+        self.metadata_exists = False
 
     def save_model(self, automl: AutoML, if_exists="upgrade"):
         """
@@ -66,7 +92,9 @@ class Storage(ModelStorage):
         Note
         ----
         If you have ensemble enabled in AutoML model, method will determine it automatically and split
-        ensemble model in multiple usual models.
+        ensemble model in multiple usual models. Only blending ensembles can be saved: the meta-model
+        of stacking ensembles and the member weights of greedy ensembles aren't persisted, so they
+        (and therefore their bundles and serving) are not supported and raise StorageError.
 
         Examples
         --------
@@ -76,7 +104,13 @@ class Storage(ModelStorage):
         >>> storage.save_model(automl)
         """
         if not table_exists(self.cursor, self.schema, PREPROCESSORS):
-            self.cursor.execute(self.create_prep_table)
+            self.__create_prep_table()
+        if isinstance(automl.model, Stacking) or isinstance(
+            automl.model, GreedyEnsemble
+        ):
+            raise StorageError(
+                f"Sorry, saving {automl.model.title} ensembles is not supported yet!"
+            )
         if isinstance(automl.model, BlendingCls) or isinstance(
             automl.model, BlendingReg
         ):
@@ -88,55 +122,50 @@ class Storage(ModelStorage):
                 ensemble_name = "_ensemble_cls_"
             if isinstance(automl.model, BlendingReg):
                 ensemble_name = "_ensemble_reg_"
-            model_counter = 1
-            for model in automl.model.model_list:  # type: ModelBoard
-                if automl.model.name is None or automl.model.name == "":
-                    raise StorageError("Please give your model a name.")
-                name = automl.model.name + ensemble_name + str(model_counter)
-                model.algorithm.model.name = name
-                json_settings = json.dumps(model.preprocessor.__dict__)
-                if self.model_already_exists(name, model.algorithm.model.version):
-                    self.cursor.execute(
-                        f"UPDATE {self.schema}.{PREPROCESSORS} SET "
-                        f"VERSION={model.algorithm.model.version}, "
-                        f"JSON='{str(json_settings)}' "
-                        f"TRAIN_ACC={model.train_score} "
-                        f"VALID_ACC={model.valid_score} "
-                        f"ALGORITHM='{model.algorithm.title}'"
-                        f"METRIC='{automl.leaderboard_metric}' "
-                        f"WHERE MODEL='{name}';"
-                    )
-                else:
-                    self.cursor.execute(
-                        f"INSERT INTO {self.schema}.{PREPROCESSORS} "
-                        f"(MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC) "
-                        f"VALUES "
-                        f"('{name}', {model.algorithm.model.version}, '{str(json_settings)}', {model.train_score}, {model.valid_score}, '{model.algorithm.title}', '{automl.leaderboard_metric}'); "
+            rows = []
+            with self._transaction():
+                model_counter = 1
+                for model in automl.model.model_list:  # type: ModelBoard
+                    if automl.model.name is None or automl.model.name == "":
+                        raise StorageError("Please give your model a name.")
+                    name = automl.model.name + ensemble_name + str(model_counter)
+                    model.algorithm.model.name = name
+                    super().save_model(
+                        model.algorithm.model, if_exists="replace"
+                    )  # to avoid duplicates
+                    rows.append(
+                        preprocessor_row(
+                            model.algorithm.model,
+                            model.preprocessor,
+                            model.train_score,
+                            model.valid_score,
+                            model.algorithm.title,
+                            automl.leaderboard_metric,
+                        )
                     )
-                super().save_model(
-                    model.algorithm.model, if_exists="replace"
-                )  # to avoid duplicates
-
-                model_counter += 1
+                    model_counter += 1
+                self.__write_preprocessors(rows, replace=True)
 
         else:
             if automl.model.name is None or automl.model.name == "":
                 raise StorageError("Please name your model! automl.model.name='model name'")
-            if table_exists(self.cursor, self.schema, "HANAML_MODEL_STORAGE"):
-                if len(self.__find_models(automl.model.name, ensemble_prefix)) > 0:
-                    raise StorageError(
-                        "There is an ensemble with the same name in storage. Please change the name of "
-                        "the "
-                        "model."
-                    )
-
-            super().save_model(automl.model, if_exists)
-            json_settings = json.dumps(automl.preprocessor_settings.__dict__)
-            self.cursor.execute(
-                f"INSERT INTO {PREPROCESSORS} (MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC) "
-                f"VALUES ('{automl.model.name}', {automl.model.version}, '{json_settings}', "
-                f"{automl.leaderboard[0].train_score}, {automl.leaderboard[0].valid_score}, '{automl.algorithm.title}', '{automl.leaderboard_metric}'); "
-            )
+            if len(self.__find_models(automl.model.name, ensemble_prefix)) > 0:
+                raise StorageError(
+                    "There is an ensemble with the same name in storage. Please change the name of "
+                    "the "
+                    "model."
+                )
+            with self._transaction():
+                super().save_model(automl.model, if_exists)
+                row = preprocessor_row(
+                    automl.model,
+                    automl.preprocessor_settings,
+                    automl.leaderboard[0].train_score,
+                    automl.leaderboard[0].valid_score,
+                    automl.algorithm.title,
+                    automl.leaderboard_metric,
+                )
+                self.__write_preprocessors([row], replace=if_exists == "replace")
 
     def list_preprocessors(self, name: str = None) -> pd.DataFrame:
         """
@@ -163,42 +192,21 @@ class Storage(ModelStorage):
              MODEL  VERSION	 JSON
           1.  test        1  {'tuned_num'...}
         """
-
+        query = (
+            f"SELECT {self.__preprocessor_columns()} FROM {self.schema}.{PREPROCESSORS}"
+        )
+        params = []
         if (name is not None) and name != "":
-            ensembles = self.__find_models(name, ensemble_prefix)
-            if len(ensembles) > 0:
-                result = pd.DataFrame(
-                    columns=[
-                        "MODEL",
-                        "VERSION",
-                        "JSON",
-                        "TRAIN_ACC",
-                        "VALID_ACC",
-                        "ALGORITHM",
-                        "METRIC"
-                    ]
-                )
-                for model in ensembles:
-                    self.cursor.execute(
-                        f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL='{model[0]}';"
-                    )
-                    res = self.cursor.fetchall()
-                    col_names = [i[0] for i in self.cursor.description]
-                    df = pd.DataFrame(res, columns=col_names)
-                    result = result.append(df, ignore_index=True)
-                return result
+            if len(self.__find_models(name, ensemble_prefix)) > 0:
+                # members of the ensemble, with one prefix query
+                query += " WHERE MODEL LIKE ? ESCAPE '\\'"
+                params.append(like_prefix(f"{name}_{ensemble_prefix}_"))
             else:
-                self.cursor.execute(
-                    f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL='{name}';"
-                )
-                res = self.cursor.fetchall()
-                col_names = [i[0] for i in self.cursor.description]
-                return pd.DataFrame(res, columns=col_names)
-        else:
-            self.cursor.execute(f"SELECT * FROM {self.schema}.{PREPROCESSORS};")
-            res = self.cursor.fetchall()
-            col_names = [i[0] for i in self.cursor.description]
-            return pd.DataFrame(res, columns=col_names)
+                query += " WHERE MODEL = ?"
+                params.append(name)
+        self.cursor.execute(query + " ORDER BY LENGTH(MODEL), MODEL, VERSION", params)
+        rows = [self.__preprocessor_row(row) for row in self.cursor.fetchall()]
+        return pd.DataFrame(rows, columns=PREPROCESSOR_COLUMNS.split(", "))
 
     def save_leaderboard(
         self, metric: str, leaderboard: List[ModelBoard], name: str, top: int = None
@@ -227,34 +235,26 @@ class Storage(ModelStorage):
         counter = 1
         if top is not None:
             leaderboard = leaderboard[: top + 1]
-        for model_member in leaderboard:
-            model_name = (
-                model_member.algorithm.model.name
-            ) = f"{name}_{leaderboard_prefix}_{counter}"
-            json_settings = json.dumps(model_member.preprocessor.__dict__)
-            if self.model_already_exists(
-                model_name, model_member.algorithm.model.version
-            ):
-                self.cursor.execute(
-                    f"UPDATE {self.schema}.{PREPROCESSORS} SET "
-                    f"VERSION={model_member.algorithm.model.version}, "
-                    f"JSON='{str(json_settings)}', "
-                    f"TRAIN_ACC={model_member.train_score}, "
-                    f"VALID_ACC={model_member.valid_score}, "
-                    f"ALGORITHM='{model_member.algorithm.title}', "
-                    f"METRIC='{metric}' "
-                    f"WHERE MODEL='{model_name}';"
+        rows = []
+        with self._transaction():
+            for model_member in leaderboard:
+                model_member.algorithm.model.name = (
+                    f"{name}_{leaderboard_prefix}_{counter}"
                 )
-            else:
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema}.{PREPROCESSORS} "
-                    f"(MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC) "
-                    f"VALUES ('{model_name}', {model_member.algorithm.model.version}, '{str(json_settings)}', "
-                    f"{model_member.train_score}, {model_member.valid_score}, '{model_member.algorithm.title}', '{metric}'); "
+                super().save_model(model_member.algorithm.model, if_exists="replace")
+                rows.append(
+                    preprocessor_row(
+                        model_member.algorithm.model,
+                        model_member.preprocessor,
+                        model_member.train_score,
+                        model_member.valid_score,
+                        model_member.algorithm.title,
+                        metric,
+                    )
                 )
-            super().save_model(model_member.algorithm.model, if_exists="replace")
-            model_member.algorithm.model.name = None
-            counter += 1
+                model_member.algorithm.model.name = None
+                counter += 1
+            self.__write_preprocessors(rows, replace=True)
 
     def load_leaderboard(self, name: str, show: bool = False) -> list:
         """
@@ -272,47 +272,31 @@ class Storage(ModelStorage):
         leaderboard: list
             Loaded leaderboard.
         """
-        leaderboard = []
-        members = self.__find_models(name, leaderboard_prefix)
-        if len(members) > 0:
-            for member in members:
-                self.cursor.execute(
-                    f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{member[0]}' "
-                    f"AND VERSION = {member[1]}"
-                )
-                columns = self.cursor.fetchall()[
-                    0
-                ]  # MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC
-                prep = self.__setup_preprocessor(columns[2])
-                if "Regressor" in columns[5]:
-                    algo = self.reg_dict[columns[5]]
-                if "Classifier" in columns[5]:
-                    algo = self.cls_dict[columns[5]]
-                algo.model = super().load_model(member[0], member[1])
-                algo.title = columns[5]
-                model_board_member = ModelBoard(algo, 0, prep)
-                model_board_member.valid_score = columns[4]
-                model_board_member.train_score = columns[3]
-                leaderboard.append(model_board_member)
-            if show:
-                print("\033[33m{}".format(f"Loaded leaderboard '{name}':\n"))
-                place = 1
-                for member in leaderboard:
-                    print(
-                        "\033[33m {}".format(
-                            str(place)
-                            + ".  "
-                            + str(member.algorithm.model)
-                            + f"\n Train {columns[6]} score: "
-                            + str(member.train_score)
-                            + f"\n Holdout {columns[6]} score: "
-                            + str(member.valid_score)
-                        )
-                    )
-                    print("\033[0m {}".format(""))
-                    place += 1
-        else:
+        rows = self.__load_members(name, leaderboard_prefix)
+        if len(rows) == 0:
             raise StorageError("Leaderboard not found!")
+        # fitted models are fetched only when a member is used
+        load = super().load_model
+        leaderboard = [
+            self.__model_board(row, LazyModel(load, row[0], row[1])) for row in rows
+        ]
+        if show:
+            print("\033[33m{}".format(f"Loaded leaderboard '{name}':\n"))
+            place = 1
+            for member, row in zip(leaderboard, rows):
+                print(
+                    "\033[33m {}".format(
+                        str(place)
+                        + ".  "
+                        + member.algorithm.title
+                        + f"\n Train {row[6]} score: "
+                        + str(member.train_score)
+                        + f"\n Holdout {row[6]} score: "
+                        + str(member.valid_score)
+                    )
+                )
+                print("\033[0m {}".format(""))
+                place += 1
         return leaderboard
 
     def list_leaderboards(self) -> pd.DataFrame:
@@ -340,14 +324,7 @@ class Storage(ModelStorage):
         name: str
             Leaderboard's name to remove.
         """
-        members = self.__find_models(name, leaderboard_prefix)
-        if len(members) > 0:
-            for member in members:
-                super().delete_model(member[0], member[1])
-                self.cursor.execute(
-                    f"DELETE FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{member[0]}' AND VERSION = {member[1]};"
-                )
-        else:
+        if self.delete_models(like_prefix(f"{name}_{leaderboard_prefix}_")) == 0:
             raise StorageError("Leaderboard not found!")
 
     def delete_model(self, name: str, version: int = None):
@@ -358,27 +335,93 @@ class Storage(ModelStorage):
         name: str
             Model to remove
         version: int, optional
-            Model's version.
+            Model's version. If not provided, all versions are removed.
         """
-        ensembles = self.__find_models(name, ensemble_prefix)
-        if len(ensembles) > 0:
-            for model in ensembles:  # type: tuple
-                super().delete_model(model[0], model[1])
-                self.cursor.execute(
-                    f"DELETE FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{model[0]}' AND VERSION = {model[1]}"
-                )
-        else:
+        if len(self.__find_models(name, ensemble_prefix)) > 0:
+            self.delete_models(like_prefix(f"{name}_{ensemble_prefix}_"))
+            return
+        if version is None:
+            self.delete_models(like_escape(name))
+            return
+        with self._transaction():
             super().delete_model(name, version)
             self.cursor.execute(
-                f"DELETE FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{name}' AND VERSION = {version}"
+                f"DELETE FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = ? AND VERSION = ?",
+                (name, version),
             )
 
-    def delete_models(self, name: str, start_time=None, end_time=None):
-        raise NotImplementedError(
-            "This method will be implemented soon. Sorry for trouble."
-        )
+    def delete_models(self, name: str, start_time=None, end_time=None) -> int:
+        """Deletes all models matching name pattern and saved in time range.
+
+        Models, their preprocessors and model tables are removed with a few set-based
+        statements in one transaction, whatever the number of models. Model tables that were
+        already dropped are skipped.
+
+        Parameters
+        ----------
+        name: str
+            SQL LIKE pattern of model names: % matches any characters, _ matches one character,
+            backslash escapes them.
+        start_time: str, optional
+            Delete models saved at or after this timestamp (e.g. '2021-06-01 00:00:00').
+        end_time: str, optional
+            Delete models saved at or before this timestamp.
 
-    def load_model(self, name: str, version: int = None, **kwargs) -> AutoML:
+        Returns
+        -------
+        int
+            Number of deleted models.
+
+        Examples
+        --------
+        >>> storage.delete_models('experiment%', end_time='2021-06-01 00:00:00')
+        """
+        if name is None or name == "":
+            raise StorageError("Please provide model name pattern")
+        if not self.__models_exist():
+            return 0
+        condition = "NAME LIKE ? ESCAPE '\\'"
+        params = [name]
+        if start_time is not None:
+            condition += " AND TIMESTAMP >= ?"
+            params.append(start_time)
+        if end_time is not None:
+            condition += " AND TIMESTAMP <= ?"
+            params.append(end_time)
+        metadata = f"{self.schema}.{self._METADATA_TABLE_NAME}"
+        preprocessors = f"{self.schema}.{PREPROCESSORS}"
+        self.cursor.execute(f"SELECT JSON FROM {metadata} WHERE {condition}", params)
+        tables = set()
+        count = 0
+        for (js_str,) in self.cursor.fetchall():
+            count += 1
+            artifacts = json.loads(read_lob(js_str))["artifacts"]
+            if artifacts.get("library", "PAL") != "PAL":
+                continue  # APL models share one table
+            names = artifacts["model_tables"]
+            for table in [names] if isinstance(names, str) else names:
+                tables.add((artifacts["schema"], table))
+        if count == 0:
+            return 0
+        with self._transaction():
+            self.cursor.execute(
+                f"DELETE FROM {preprocessors} WHERE EXISTS (SELECT 1 FROM {metadata} "
+                f"WHERE NAME = {preprocessors}.MODEL AND VERSION = {preprocessors}.VERSION "
+                f"AND {condition})",
+                params,
+            )
+            self.cursor.execute(f"DELETE FROM {metadata} WHERE {condition}", params)
+            tables = self.__existing_tables(tables)
+            if len(tables) > 0:
+                drops = " ".join(
+                    f'DROP TABLE "{schema}"."{table}";' for schema, table in sorted(tables)
+                )
+                self.cursor.execute(f"DO BEGIN {drops} END")
+        return count
+
+    def load_model(
+        self, name: str, version: int = None, cache: ArtifactCache = None, **kwargs
+    ) -> AutoML:
         """Loads new model.
 
         Parameters
@@ -387,98 +430,464 @@ class Storage(ModelStorage):
             Model to load
         version: int, optional
             Model's version.
+        cache: ArtifactCache, optional
+            Local copy of models. If the model is in cache, it is restored from there without
+            queries to storage tables: model tables are uploaded to temporary tables.
+            Otherwise, the model is loaded from storage and put in cache.
 
         Returns
         -------
         AutoML object
         """
-        automl = AutoML(self.connection_context)
-        ensembles = self.__find_models(name, ensemble_prefix)
-        if len(ensembles) > 0:
-            model_list = []
-            prep_list = []
-            for model_name in ensembles:  # type: tuple
-                self.cursor.execute(
-                    f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{model_name[0]}' "
-                    f"AND VERSION = {model_name[1]}"
+        if cache is not None:
+            entry = cache.get(name, version)
+            if entry is not None:
+                rows = [member["row"] for member in entry["members"]]
+                models = [self.__rehydrate(member) for member in entry["members"]]
+                return self.__automl(rows, models, entry["ensemble"])
+            automl = self.load_model(name, version, **kwargs)
+            self.snapshot(name, version, cache)
+            return automl
+        rows = self.__load_members(name, ensemble_prefix)
+        ensemble = len(rows) > 0
+        if not ensemble:
+            rows = [self.__model_row(name, version)]
+        load = super().load_model
+        models = [load(row[0], row[1], **kwargs) for row in rows]
+        return self.__automl(rows, models, ensemble)
+
+    def snapshot(self, name: str, version: int, cache: ArtifactCache) -> dict:
+        """Copies model (or ensemble) with its preprocessors to local cache.
+
+        Parameters
+        ----------
+        name: str
+            Model to copy.
+        version: int
+            Model's version.
+        cache: ArtifactCache
+            Target cache.
+
+        Returns
+        -------
+        dict
+            Manifest of cache entry.
+        """
+        rows = self.__load_members(name, ensemble_prefix)
+        ensemble = len(rows) > 0
+        if not ensemble:
+            rows = [self.__model_row(name, version)]
+        members = []
+        for row in rows:
+            model_class, js_str = self.__model_metadata(row[0], row[1])
+            artifacts = json.loads(js_str)["artifacts"]
+            table_names = artifacts["model_tables"]
+            single = isinstance(table_names, str)
+            tables = [
+                self.connection_context.table(table, schema=artifacts["schema"]).collect()
+                for table in ([table_names] if single else table_names)
+            ]
+            members.append(
+                {
+                    "row": row,
+                    "class": model_class,
+                    "json": js_str,
+                    "single": single,
+                    "tables": tables,
+                }
+            )
+        return cache.put(name, version, ensemble, members)
+
+    def export_bundle(
+        self, name: str, path: str, version: int = None, chunk_size: int = 10000
+    ) -> dict:
+        """Exports model or ensemble to one file, which can be imported in another database.
+
+        The file is an uncompressed zip archive with manifest.json (model metadata,
+        preprocessors, scores and metric) and one zstd compressed Arrow IPC file per model table.
+        Tables are streamed from database in chunks of `chunk_size` rows.
+
+        Parameters
+        ----------
+        name: str
+            Model or ensemble name.
+        path: str
+            Bundle file.
+        version: int, optional
+            Model's version. Not needed for ensembles.
+        chunk_size: int
+            Number of rows fetched at once.
+
+        Returns
+        -------
+        dict
+            Bundle manifest.
+
+        Examples
+        --------
+        >>> storage.export_bundle('model', 'model.automl', version=1)
+        >>> prod_storage.import_bundle('model.automl')
+        """
+        rows = self.__load_members(name, ensemble_prefix)
+        ensemble = len(rows) > 0
+        if not ensemble:
+            rows = [self.__model_row(name, version)]
+        manifest = {
+            "format": BUNDLE_VERSION,
+            "name": name,
+            "version": version,
+            "ensemble": ensemble,
+            "metric": rows[0][6],
+            "members": [],
+        }
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for i, row in enumerate(rows):
+                model_class, js_str = self.__model_metadata(row[0], row[1])
+                artifacts = json.loads(js_str)["artifacts"]
+                table_names = artifacts["model_tables"]
+                single = isinstance(table_names, str)
+                entries = []
+                for j, table in enumerate([table_names] if single else table_names):
+                    entry = f"tables/{i}_{j}.arrow"
+                    with archive.open(entry, "w", force_zip64=True) as file:
+                        write_table_chunks(
+                            self.cursor,
+                            f'SELECT * FROM "{artifacts["schema"]}"."{table}"',
+                            file,
+                            chunk_size,
+                        )
+                    entries.append(entry)
+                manifest["members"].append(
+                    {
+                        "row": list(row),
+                        "class": model_class,
+                        "json": js_str,
+                        "single": single,
+                        "tables": entries,
+                    }
                 )
-                columns = self.cursor.fetchall()[
-                    0
-                ]  # MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC
-                prep = self.__setup_preprocessor(columns[2])
-                if "Regressor" in columns[5]:
-                    algo = self.reg_dict[columns[5]]
-                if "Classifier" in columns[5]:
-                    algo = self.cls_dict[columns[5]]
-                algo.model = super().load_model(model_name[0], model_name[1], **kwargs)
-                algo.title = columns[5]
-                model_board_member = ModelBoard(algo, 0, prep)
-                model_board_member.valid_score = columns[4]
-                model_board_member.train_score = columns[3]
-                prep_list.append(prep)
-                model_list.append(model_board_member)
-            automl.preprocessor_settings = prep_list
-            automl.leaderboard_metric = columns[6]
-            if "cls" in ensembles[0][0]:
+            archive.writestr("manifest.json", json.dumps(manifest))
+        return manifest
+
+    def import_bundle(self, path: str) -> dict:
+        """Imports model or ensemble exported with :meth:`export_bundle`.
+
+        The archive is memory-mapped and tables are uploaded batch by batch, then everything is
+        saved in one transaction. Existing models with the same names and versions are replaced.
+
+        Parameters
+        ----------
+        path: str
+            Bundle file.
+
+        Returns
+        -------
+        dict
+            Bundle manifest.
+        """
+        with open(path, "rb") as file, zipfile.ZipFile(file) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            if manifest.get("format") != BUNDLE_VERSION:
+                raise StorageError(f"Unsupported bundle format in {path}")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with self._transaction():
+                    rows = []
+                    for member in manifest["members"]:
+                        tables = [
+                            self.__upload_entry(data, archive.getinfo(entry))
+                            for entry in member["tables"]
+                        ]
+                        model = self.__restore_model(member, tables)
+                        super().save_model(model, if_exists="replace")
+                        rows.append(tuple(member["row"]))
+                    self.__write_preprocessors(rows, replace=True)
+        return manifest
+
+    def clean_up(self):
+        """Be careful! This method deletes all models from database!"""
+        super().clean_up()
+        self.cursor.execute(f"DROP TABLE {self.schema}.{PREPROCESSORS}")
+        self.metadata_cache.clear()
+        self.metadata_exists = False
+        self.plan_column = None
+        self.prep_index = None
+
+    @contextmanager
+    def _transaction(self):
+        """Runs block in one transaction: commits at the end or rolls back on error.
+
+        HANA commits DDL on its own by default, so DDL autocommit is switched off for the block:
+        model tables created or dropped in it are rolled back with the metadata rows. Afterwards
+        it is switched back on, HANA's default, as the session setting can't be read back.
+
+        hana_ml ModelStorage commits every saved model itself, so while the block runs the
+        connection is wrapped to defer these commits to the end of the block.
+        Nested blocks join the outer transaction.
+        """
+        connection = self.connection_context.connection
+        if isinstance(connection, DeferredCommit):
+            yield
+            return
+        autocommit = connection.getautocommit()
+        connection.setautocommit(False)
+        self.connection_context.connection = DeferredCommit(connection)
+        try:
+            self.cursor.execute("SET TRANSACTION AUTOCOMMIT DDL OFF")
+            yield
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self.connection_context.connection = connection
+            try:
+                self.cursor.execute("SET TRANSACTION AUTOCOMMIT DDL ON")
+            finally:
+                connection.setautocommit(autocommit)
+                self.metadata_cache.clear()
+
+    def __write_preprocessors(self, rows: list, replace: bool):
+        """Writes preprocessor rows with two prepared statements, whatever number of rows.
+
+        If replace is True, previous rows of the same model versions are deleted first.
+        Rows without PLAN, e.g. from bundles exported before it, are saved without a plan.
+        """
+        if len(rows) == 0:
+            return
+        self.__upgrade_prep_table()
+        width = len(PREPROCESSOR_COLUMNS.split(", "))
+        rows = [tuple(row) + (None,) * (width - len(row)) for row in rows]
+        if replace:
+            self.cursor.executemany(
+                f"DELETE FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = ? AND VERSION = ?",
+                [(row[0], row[1]) for row in rows],
+            )
+        self.cursor.executemany(
+            f"INSERT INTO {self.schema}.{PREPROCESSORS} ({PREPROCESSOR_COLUMNS}) "
+            f"VALUES ({', '.join('?' * width)})",
+            rows,
+        )
+
+    def __upgrade_prep_table(self):
+        """Adds PLAN column and PREPROCESSOR_INDEX to preprocessor tables created before them.
+        Rows saved earlier keep their plan, if any, in JSON."""
+        if not self.__plan_column_exists():
+            self.cursor.execute(
+                f"ALTER TABLE {self.schema}.{PREPROCESSORS} ADD (PLAN NCLOB)"
+            )
+            self.plan_column = True
+        if not self.__prep_index_exists():
+            self.__create_prep_index()
+
+    def __prep_index_exists(self) -> bool:
+        if self.prep_index is None:
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM INDEXES WHERE SCHEMA_NAME = ? AND INDEX_NAME = ?",
+                (self.schema, PREPROCESSOR_INDEX),
+            )
+            self.prep_index = self.cursor.fetchall()[0][0] > 0
+        return self.prep_index
+
+    def __plan_column_exists(self) -> bool:
+        if self.plan_column is None:
+            self.cursor.execute(
+                f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE 1 = 0"
+            )
+            names = [column[0] for column in self.cursor.description]
+            self.plan_column = "PLAN" in names
+        return self.plan_column
+
+    def __preprocessor_columns(self, alias: str = None) -> str:
+        """PREPROCESSOR_COLUMNS to select, with NULL for PLAN if the table has no such column."""
+        columns = PREPROCESSOR_COLUMNS.split(", ")
+        if alias is not None:
+            columns = [f"{alias}.{column}" for column in columns]
+        if not self.__plan_column_exists():
+            columns[-1] = "NULL AS PLAN"
+        return ", ".join(columns)
+
+    def __preprocessor_row(self, row) -> tuple:
+        """Selected preprocessor row with PLAN read from NCLOB, so that rows can be cached and
+        exported."""
+        return tuple(row[:-1]) + (read_lob(row[-1]),)
+
+    def __existing_tables(self, tables: set) -> set:
+        """Returns (schema, table) pairs of tables that exist, with one query."""
+        if len(tables) == 0:
+            return tables
+        names = sorted({table for _, table in tables})
+        self.cursor.execute(
+            f"SELECT SCHEMA_NAME, TABLE_NAME FROM TABLES "
+            f"WHERE TABLE_NAME IN ({', '.join('?' * len(names))})",
+            names,
+        )
+        return tables & {tuple(row) for row in self.cursor.fetchall()}
+
+    def __extract_version(self, name: str):
+        self.cursor.execute(
+            f"SELECT MAX(VERSION) FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = ?",
+            (name,),
+        )
+        return self.cursor.fetchall()[0][0]
+
+    def __find_models(self, name: str, prefix: str) -> list:
+        """Finds members of ensemble or leaderboard (named 'name_prefix_N') with one indexed
+        prefix query. Results are cached until the next write."""
+        key = (name, prefix)
+        if key not in self.metadata_cache:
+            if not self.__models_exist():
+                return []
+            self.cursor.execute(
+                f"SELECT NAME, VERSION FROM {self.schema}.{self._METADATA_TABLE_NAME} "
+                f"WHERE NAME LIKE ? ESCAPE '\\' ORDER BY LENGTH(NAME), NAME, VERSION",
+                (like_prefix(f"{name}_{prefix}_"),),
+            )
+            self.metadata_cache[key] = [tuple(row) for row in self.cursor.fetchall()]
+        return self.metadata_cache[key]
+
+    def __model_row(self, name: str, version: int) -> tuple:
+        if name is None or name == "":
+            raise StorageError("Please provide correct model name")
+        if version is None:
+            raise StorageError("Please provide correct version")
+        self.cursor.execute(
+            f"SELECT {self.__preprocessor_columns()} "
+            f"FROM {self.schema}.{PREPROCESSORS} "
+            f"WHERE MODEL = ? AND VERSION = ?",
+            (name, version),
+        )
+        rows = self.cursor.fetchall()
+        if len(rows) == 0:
+            raise StorageError(f"Model {name} (version {version}) not found")
+        return self.__preprocessor_row(rows[0])
+
+    def __model_metadata(self, name: str, version: int) -> tuple:
+        """Returns class name and JSON, which hana_ml stored for the model."""
+        self.cursor.execute(
+            f"SELECT CLASS, JSON FROM {self.schema}.{self._METADATA_TABLE_NAME} "
+            f"WHERE NAME = ? AND VERSION = ?",
+            (name, version),
+        )
+        model_class, js_str = self.cursor.fetchall()[0]
+        if hasattr(js_str, "read"):  # NCLOB
+            js_str = js_str.read()
+        return model_class, js_str
+
+    def __rehydrate(self, member: dict):
+        """Restores hana_ml model from cache entry, with tables in temporary tables."""
+        tables = [
+            StagingTable(
+                self.connection_context, f"#AUTOML_CACHED_{uuid.uuid4().hex.upper()}"
+            ).load(table)
+            for table in member["tables"]
+        ]
+        return self.__restore_model(member, tables)
+
+    def __upload_entry(self, data, info):
+        """Uploads Arrow table from bundle entry to a temporary table, batch by batch."""
+        staging = StagingTable(
+            self.connection_context, f"#AUTOML_BUNDLE_{uuid.uuid4().hex.upper()}"
+        )
+        # views of the memory map must not outlive this call, the map is closed after import
+        for i, chunk in enumerate(table_chunks(entry_buffer(data, info))):
+            if i == 0:
+                table = staging.load(chunk)
+            else:
+                table = staging.append(chunk)
+        return table
+
+    def __restore_model(self, member: dict, tables: list):
+        """Creates hana_ml model from its stored metadata and uploaded model tables."""
+        model_class = self._load_class(member["class"])
+        js_dict = json.loads(member["json"])
+        try:
+            model = model_class(**js_dict["model_attributes"])
+        except Exception:
+            model = model_class()
+        model.model_ = tables[0] if member["single"] else tables
+        # the same attributes hana_ml restores, except for references to tables
+        for attribute, value in js_dict.get("pal_meta", dict()).items():
+            if attribute not in ["_fit_args", "_predict_args", "_score_args"]:
+                setattr(model, attribute, value)
+        model.name = member["row"][0]
+        model.version = member["row"][1]
+        return model
+
+    def __automl(self, rows: list, models: list, ensemble: bool) -> AutoML:
+        automl = AutoML(self.connection_context)
+        model_list = [self.__model_board(row, model) for row, model in zip(rows, models)]
+        automl.leaderboard_metric = rows[0][6]
+        if ensemble:
+            automl.preprocessor_settings = [member.preprocessor for member in model_list]
+            if "cls" in rows[0][0]:
                 automl.model = BlendingCls(
                     model_list=model_list, connection_context=self.connection_context
                 )
-            if "reg" in ensembles[0][0]:
+            if "reg" in rows[0][0]:
                 automl.model = BlendingReg(
                     model_list=model_list, connection_context=self.connection_context
                 )
             automl.ensemble = True
         else:
-            if name is None or name == "":
-                raise StorageError("Please provide correct model name")
-            if version is None:
-                raise StorageError("Please provide correct version")
-            automl.model = super().load_model(name, version, **kwargs)
+            automl.model = model_list[0].algorithm.model
+            automl.algorithm = model_list[0].algorithm
+            automl.preprocessor_settings = model_list[0].preprocessor
+        return automl
 
-            self.cursor.execute(
-                f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL = '{name}' "
-                f"AND VERSION = {version}"
-            )
-            columns = self.cursor.fetchall()[
-                0
-            ]  # MODEL, VERSION, JSON, TRAIN_ACC, VALID_ACC, ALGORITHM, METRIC
-            automl.preprocessor_settings = self.__setup_preprocessor(columns[2])
-            if "Regressor" in columns[5]:
-                algo = self.reg_dict[columns[5]]
-            if "Classifier" in columns[5]:
-                algo = self.cls_dict[columns[5]]
-            algo.title = columns[5]
-            algo.model = super().load_model(name, version, **kwargs)
-            automl.algorithm = algo
-            automl.leaderboard_metric = columns[6]
+    def __load_members(self, name: str, prefix: str) -> list:
+        """Reads preprocessor rows of all ensemble or leaderboard members with one query.
 
-        return automl
+        Rows are in member order and contain PREPROCESSOR_COLUMNS.
+        """
+        if not self.__models_exist():
+            return []
+        self.cursor.execute(
+            f"SELECT {self.__preprocessor_columns('P')} "
+            f"FROM {self.schema}.{PREPROCESSORS} AS P "
+            f"INNER JOIN {self.schema}.{self._METADATA_TABLE_NAME} AS M "
+            f"ON M.NAME = P.MODEL AND M.VERSION = P.VERSION "
+            f"WHERE M.NAME LIKE ? ESCAPE '\\' "
+            f"ORDER BY LENGTH(M.NAME), M.NAME, M.VERSION",
+            (like_prefix(f"{name}_{prefix}_"),),
+        )
+        return [self.__preprocessor_row(row) for row in self.cursor.fetchall()]
+
+    def __model_board(self, row, model) -> ModelBoard:
+        """Builds leaderboard member from preprocessor row and (possibly lazy) model."""
+        # imports PAL estimators of this algorithm only
+        algo = registry.create(row[5])
+        algo.model = model
+        # rows cached or exported before the PLAN column have 7 values
+        plan_json = row[7] if len(row) > 7 else None
+        member = ModelBoard(algo, row[3], self.__setup_preprocessor(row[2], plan_json))
+        member.valid_score = row[4]
+        return member
+
+    def __models_exist(self) -> bool:
+        """Returns False if hana_ml model storage table is not created yet (nothing is saved).
+
+        Its primary key (NAME, VERSION) serves the prefix queries of model names.
+        """
+        if not self.metadata_exists:
+            self.metadata_exists = table_exists(
+                self.cursor, self.schema, self._METADATA_TABLE_NAME
+            )
+        return self.metadata_exists
 
-    def clean_up(self):
-        """Be careful! This method deletes all models from database!"""
-        super().clean_up()
-        self.cursor.execute(f"DROP TABLE {self.schema}.{PREPROCESSORS}")
+    def __create_prep_table(self):
+        """Creates preprocessor table with an index for lookups by model and version."""
+        self.cursor.execute(self.create_prep_table)
+        self.plan_column = True
+        self.__create_prep_index()
 
-    def __extract_version(self, name: str):
+    def __create_prep_index(self):
         self.cursor.execute(
-            f"SELECT * FROM {self.schema}.{PREPROCESSORS} WHERE MODEL='{name}'"
+            f"CREATE INDEX {self.schema}.{PREPROCESSOR_INDEX} "
+            f"ON {self.schema}.{PREPROCESSORS} (MODEL, VERSION)"
         )
-        res = self.cursor.fetchall()
-        versions = []
-        for string in res:
-            versions.append(string[1])
-        return max(versions)
-
-    def __find_models(self, name: str, prefix: str):
-        models = self.list_models()["NAME"]
-        versions = self.list_models()["VERSION"]
-        return [
-            (model_name, version)
-            for model_name, version in zip(models, versions)
-            if (name in model_name) and (prefix in model_name)
-        ]
+        self.prep_index = True
 
-    def __setup_preprocessor(self, data) -> PreprocessorSettings:
+    def __setup_preprocessor(self, data, plan_json: str = None) -> PreprocessorSettings:
         settings_namespace = json.loads(
             str(data), object_hook=lambda d: SimpleNamespace(**d)
         )
@@ -495,9 +904,72 @@ class Storage(ModelStorage):
         preprocessor.normalization_exceptions = (
             settings_namespace.normalization_exceptions
         )
+        # models saved before preprocessing compilation don't have a plan, models saved before
+        # the PLAN column have it in JSON
+        if plan_json is not None:
+            plan = PreprocessingPlan.from_dict(json.loads(plan_json))
+        else:
+            plan = PreprocessingPlan.from_dict(
+                getattr(settings_namespace, "compiled_plan", None)
+            )
+        preprocessor.compiled_plan = None if plan is None else plan.to_dict()
         return preprocessor
 
 
+class DeferredCommit:
+    """Connection wrapper that ignores commits and autocommit changes of hana_ml, so that
+    its writes stay in the transaction opened by :meth:`Storage._transaction`."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def commit(self):
+        pass
+
+    def getautocommit(self):
+        return False
+
+    def setautocommit(self, value):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+def preprocessor_row(
+    model, settings, train_score, valid_score, algorithm: str, metric: str
+) -> tuple:
+    """Row of preprocessor table for saved model, in PREPROCESSOR_COLUMNS order.
+
+    The compiled plan has statistics of every column, so it goes to the PLAN column (NCLOB)
+    instead of JSON, which is limited to 5000 characters.
+    """
+    values = dict(settings.__dict__)
+    plan = values.pop("compiled_plan", None)
+    return (
+        model.name,
+        model.version,
+        json.dumps(values),
+        train_score,
+        valid_score,
+        algorithm,
+        metric,
+        None if plan is None else json.dumps(plan),
+    )
+
+
+def like_escape(text: str) -> str:
+    """LIKE pattern (backslash escapes) matching text only."""
+    for char in ["\\", "%", "_"]:
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def like_prefix(prefix: str) -> str:
+    """LIKE pattern (backslash escapes) matching strings that start with prefix."""
+    return like_escape(prefix) + "%"
+
+
 def table_exists(cursor, schema, name):
     cursor.execute(
         f"SELECT count(*) FROM TABLES WHERE SCHEMA_NAME='{schema}' AND TABLE_NAME='{name}';"
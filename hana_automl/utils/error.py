@@ -24,3 +24,15 @@ class BlendingError(Exception):
 
 class StorageError(Exception):
     pass
+
+
+class ExportError(Exception):
+    pass
+
+
+class OfflineError(Exception):
+    pass
+
+
+class ProfilingError(Exception):
+    pass
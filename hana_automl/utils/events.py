@@ -0,0 +1,335 @@
+"""Events of the fit process and subscribers that present them.
+
+The optimizers emit events instead of printing, so presentation never blocks tuning: every
+asynchronous subscriber has its own thread and queue, and emitting an event only puts it on the
+queues.
+"""
+
+import functools
+import inspect
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TRIAL_STARTED = "trial_started"
+TRIAL_FINISHED = "trial_finished"
+PHASE_CHANGED = "phase_changed"
+BEST_UPDATED = "best_updated"
+VALIDATED = "validated"
+EVENTS = [TRIAL_STARTED, TRIAL_FINISHED, PHASE_CHANGED, BEST_UPDATED, VALIDATED]
+
+logger = logging.getLogger("hana_automl")
+
+
+class Event:
+    """Something that happened during fit.
+
+    Payloads of the events are:
+
+    - trial_started: optimizer, trial, algorithm, preprocessing
+    - trial_finished: optimizer, trial, algorithm, params, preprocessing, score, seconds
+    - phase_changed: phase ('tuning', 'validation' or 'ensemble') and its details. Tuning has
+      task, tuning_metric and optimizer, validation has trials, iterations and members.
+    - best_updated: phase, score and trial and algorithm or, for ensembles, members
+    - validated: trial, algorithm, score, index and total of the validated leaderboard member
+
+    Attributes
+    ----------
+    name : str
+        One of EVENTS.
+    payload : dict
+        Details of the event. Values are plain data, not objects that keep changing.
+    time : float
+        When the event was emitted, time.time().
+    """
+
+    __slots__ = ["name", "payload", "time"]
+
+    def __init__(self, name: str, payload: dict):
+        self.name = name
+        self.payload = payload
+        self.time = time.time()
+
+    def __getitem__(self, key: str):
+        return self.payload[key]
+
+    def get(self, key: str, default=None):
+        return self.payload.get(key, default)
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self.payload!r})"
+
+
+class Subscription:
+    """Delivers events to a callback. Created by :meth:`EventBus.subscribe`.
+
+    Attributes
+    ----------
+    callback
+        Function that takes an :class:`Event`.
+    names : set
+        Names of delivered events, None delivers all.
+    thread : threading.Thread
+        Thread that calls the callback, None for synchronous subscriptions.
+    """
+
+    def __init__(self, callback, names=None, asynchronous: bool = True):
+        self.callback = callback
+        self.names = None if names is None else set(names)
+        self.queue = None
+        self.thread = None
+        if asynchronous:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(
+                target=self.work, name="hana_automl events", daemon=True
+            )
+
+    def deliver(self, event: Event):
+        if self.names is not None and event.name not in self.names:
+            return
+        if self.queue is None:
+            self.call(event)
+        else:
+            self.queue.put(event)
+
+    def call(self, event: Event):
+        try:
+            self.callback(event)
+        except Exception:
+            # a broken subscriber must not break fit
+            logger.exception(f"Event subscriber {self.callback!r} failed on {event!r}")
+
+    def work(self):
+        while True:
+            event = self.queue.get()
+            if event is not None:
+                self.call(event)
+            self.queue.task_done()
+            if event is None:
+                return
+
+    def flush(self):
+        """Waits until delivered events are handled."""
+        if self.queue is not None:
+            self.queue.join()
+
+    def close(self):
+        """Handles delivered events and stops the thread."""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if hasattr(self.callback, "close"):
+            self.callback.close()
+
+
+class EventBus:
+    """Publishes events of fit to subscribers.
+
+    Without subscribers, emitting is one check of an empty list.
+
+    Parameters
+    ----------
+    thread_hook
+        Called with the thread of every asynchronous subscription before it starts. Streamlit apps
+        pass ``add_report_ctx``, so that subscribers can write to the page.
+
+    Examples
+    --------
+    >>> from hana_automl.utils.events import TRIAL_FINISHED, LogSink
+    >>> automl.events.subscribe(lambda event: print(event['score']), events=[TRIAL_FINISHED])
+    >>> automl.events.subscribe(LogSink())
+    >>> automl.fit(df=df, target='y', steps=10, verbose=0)
+    """
+
+    def __init__(self, thread_hook=None):
+        self.thread_hook = thread_hook
+        self.subscriptions = list()
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback, events: list = None, asynchronous: bool = True):
+        """Subscribes a callback to events.
+
+        Parameters
+        ----------
+        callback
+            Function that takes an :class:`Event`. If it has a `close` method, it's called on
+            unsubscription.
+        events : list
+            Names of events to deliver, all by default.
+        asynchronous : bool
+            Call the callback from a separate thread, so that emitting doesn't wait for it.
+            Synchronous callbacks are called by the thread that emits and must be fast.
+
+        Returns
+        -------
+        Subscription
+        """
+        subscription = Subscription(callback, events, asynchronous)
+        if subscription.thread is not None:
+            if self.thread_hook is not None:
+                self.thread_hook(subscription.thread)
+            subscription.thread.start()
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stops delivering events to a subscription, after it handles delivered ones."""
+        with self.lock:
+            self.subscriptions = [
+                s for s in self.subscriptions if s is not subscription
+            ]
+        subscription.close()
+
+    @contextmanager
+    def subscribed(self, callback, events: list = None, asynchronous: bool = True):
+        """Context manager that subscribes `callback` for the duration of a block."""
+        subscription = self.subscribe(callback, events, asynchronous)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def flush(self):
+        """Waits until subscribers handle emitted events, e.g. before printing directly."""
+        for subscription in self.subscriptions:
+            subscription.flush()
+
+    def emit(self, name: str, **payload):
+        """Delivers event `name` with `payload` to subscribers."""
+        # the list is replaced, not changed, on (un)subscription, so no lock is needed
+        subscriptions = self.subscriptions
+        if len(subscriptions) == 0:
+            return
+        event = Event(name, payload)
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+class ConsoleSink:
+    """Prints progress of fit, the console output of `verbose` levels.
+
+    1 prints the task, tuning metric and phases, 2 also prints parameters of every trial and a
+    progress bar of validation.
+    """
+
+    def __init__(self, verbose: int = 2):
+        self.verbose = verbose
+        self.progress = None
+
+    def __call__(self, event: Event):
+        if self.verbose < 1:
+            return
+        handler = getattr(self, event.name, None)
+        if handler is not None:
+            handler(event)
+
+    def phase_changed(self, event: Event):
+        self.close()
+        phase = event["phase"]
+        if phase == "tuning":
+            print("Task:", event["task"])
+            print("Tuning metric:", event["tuning_metric"])
+            if event["optimizer"] == "BayesianOptimizer":
+                print(
+                    f"\033[32m[I {datetime.now()}] \033[36mA new bayesian optimization process "
+                    f"created in memory\033[0m"
+                )
+        elif phase == "validation":
+            trials, iterations = event.get("trials"), event.get("iterations")
+            if trials is not None:
+                if iterations is None:
+                    print(
+                        f"There was a stop due to a time limit! Completed {trials} iterations"
+                    )
+                elif trials >= iterations:
+                    print("All iterations completed successfully!")
+                else:
+                    print(
+                        f"There was a stop due to a time limit! Completed {trials} iterations "
+                        f"of {iterations}"
+                    )
+            metric = event["tuning_metric"]
+            print(f"Starting model {metric} score evaluation on the validation data!")
+            if self.verbose > 1:
+                from tqdm import tqdm
+
+                self.progress = tqdm(
+                    total=event["members"],
+                    desc=f"\033[33m Leaderboard {metric} score evaluation",
+                    colour="yellow",
+                    bar_format="{l_bar}{bar}\033[33m{r_bar}\033[0m",
+                )
+        elif phase == "ensemble":
+            print("Starting ensemble accuracy evaluation on the validation data!")
+
+    def trial_finished(self, event: Event):
+        if self.verbose < 2:
+            return
+        if event["optimizer"] != "OptunaSearch":
+            # Optuna logs finished trials itself
+            settings = {"algo": event["algorithm"], **event["preprocessing"]}
+            print(
+                f"\033[32m[I {datetime.fromtimestamp(event.time)}] \033[36mTrial "
+                f"{event['trial']} finished with value: {event['score']} and parametrs: "
+                f"{settings}\033[0m"
+            )
+        print(f"\033[36m {event['algorithm']} trial params :{event['params']}\033[0m")
+
+    def validated(self, event: Event):
+        if self.progress is not None:
+            self.progress.update()
+            if event["index"] + 1 == event["total"]:
+                self.close()
+
+    def best_updated(self, event: Event):
+        if event["phase"] != "ensemble":
+            return
+        print("\033[33m {}".format("\n"))
+        print(
+            "Ensemble consists of: "
+            + ", ".join(event["members"])
+            + f"\nEnsemble {event['tuning_metric']} score: "
+            + str(event["score"])
+        )
+        print("\033[0m {}".format(""))
+
+    def close(self):
+        if self.progress is not None:
+            self.progress.close()
+            self.progress = None
+
+
+class LogSink:
+    """Writes every event to a logger, 'hana_automl' by default."""
+
+    def __init__(self, log: logging.Logger = None, level: int = logging.INFO):
+        self.log = logger if log is None else log
+        self.level = level
+
+    def __call__(self, event: Event):
+        self.log.log(self.level, "%s %s", event.name, event.payload)
+
+
+def presented(method):
+    """Decorator of methods with a `verbose` argument and an `events` attribute.
+
+    For the duration of the call, a :class:`ConsoleSink` of the `verbose` level is subscribed to
+    `events`. Subscribers are closed before the method returns, so all its output is printed.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        verbose = arguments.arguments["verbose"]
+        if not verbose:
+            return method(self, *args, **kwargs)
+        with self.events.subscribed(ConsoleSink(verbose)):
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,263 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+
+from hana_automl.utils import sqlstats, tracing
+from hana_automl.utils.error import ProfilingError
+
+# client-side costs that are worth watching on small datasets, by (file, function) of pstats
+WATCHED = {
+    "copy": lambda file, name: os.path.basename(file) == "copy.py",
+    "Preprocessor": lambda file, name: file.endswith(
+        os.path.join("preprocess", "preprocessor.py")
+    )
+    and name in ["__init__", "clsdict", "regdict"],
+    "tqdm": lambda file, name: f"{os.sep}tqdm{os.sep}" in file,
+    "print": lambda file, name: name == "<built-in method builtins.print>",
+}
+
+
+class Profiler:
+    """Profiles the client side of a run with cProfile, separately for every pipeline phase.
+
+    Phases are tracing span paths, like in :attr:`StatsConnection.phases`. Time of a phase excludes
+    its nested phases, so 'automl.fit/trial' is trial bookkeeping without fitting and scoring.
+    For every phase the profiler records wall time, CPU time of this process and, given
+    `sql_stats`, SQL traffic and server time. Wall time that is neither client CPU nor server
+    processing, 'wait_seconds', is mostly network and waiting for the database.
+
+    Results are saved to `directory`: a pstats file per phase (slashes of the path replaced by
+    dashes), 'all.pstats' with all phases, 'summary.json' and a readable 'summary.txt'.
+
+    Parameters
+    ----------
+    directory : str
+        Directory for results. Created if it doesn't exist.
+    top : int
+        Number of hotspots in the summary.
+    sql_stats : StatsConnection
+        Connection wrapper that counts SQL traffic of the run.
+
+    Examples
+    --------
+    >>> from hana_automl.utils.profiling import Profiler
+    >>> with Profiler('profile', sql_stats=automl.sql_stats) as profiler:
+    ...     automl.fit(df=df, target='y', steps=10)
+    >>> print(profiler.report())
+    """
+
+    def __init__(self, directory: str, top: int = 30, sql_stats=None):
+        self.directory = directory
+        self.top = top
+        self.sql_stats = sql_stats
+        self.profiles = dict()
+        self.wall = dict()
+        self.cpu = dict()
+        self.calls = dict()
+        self.summary = None
+        # seconds of closed nested spans by id of the enclosing span
+        self.nested = dict()
+        self.tracer = None
+        self.own_tracer = False
+        self.thread = None
+        self.root = None
+        self.active = None
+        self.cpu_start = None
+        self.start = None
+        self.sql_before = dict()
+
+    def __enter__(self):
+        self.tracer = tracing.active()
+        self.own_tracer = self.tracer is None
+        if self.own_tracer:
+            self.tracer = tracing.Tracer().__enter__()
+        self.tracer.listeners.append(self)
+        self.thread = threading.get_ident()
+        self.root = self.tracer.current()
+        if self.sql_stats is not None:
+            self.sql_before = {p: s.copy() for p, s in self.sql_stats.phases.items()}
+        self.start = time.perf_counter()
+        self.switch(sqlstats.phase_path(self.root))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.switch(None)
+        self.tracer.listeners.remove(self)
+        if self.own_tracer:
+            self.tracer.__exit__(exc_type, exc_val, exc_tb)
+        path = sqlstats.phase_path(self.root)
+        nested = self.nested.pop(getattr(self.root, "id", None), 0.0)
+        self.add_wall(path, time.perf_counter() - self.start - nested)
+        self.summary = self.summarize(time.perf_counter() - self.start)
+        self.save()
+
+    def opened(self, span):
+        if span.thread == self.thread:
+            self.switch(sqlstats.phase_path(span))
+
+    def closed(self, span):
+        if span.thread != self.thread:
+            return
+        seconds = span.seconds
+        path = sqlstats.phase_path(span)
+        self.add_wall(path, seconds - self.nested.pop(span.id, 0.0))
+        self.calls[path] = self.calls.get(path, 0) + 1
+        parent = getattr(span.parent, "id", None)
+        self.nested[parent] = self.nested.get(parent, 0.0) + seconds
+        self.switch(sqlstats.phase_path(span.parent))
+
+    def switch(self, path: str):
+        """Stops profiling the current phase and starts profiling `path`, None stops all."""
+        now = time.process_time()
+        if self.active is not None:
+            active, profile = self.active
+            profile.disable()
+            self.cpu[active] = self.cpu.get(active, 0.0) + now - self.cpu_start
+            self.active = None
+        if path is None:
+            return
+        if path not in self.profiles:
+            self.profiles[path] = cProfile.Profile()
+        try:
+            self.profiles[path].enable()
+        except ValueError as error:
+            # Python 3.12+ allows one profiler at a time
+            raise ProfilingError(f"Can't profile, another profiler is active: {error}")
+        self.active = (path, self.profiles[path])
+        self.cpu_start = time.process_time()
+
+    def add_wall(self, path: str, seconds: float):
+        self.wall[path] = self.wall.get(path, 0.0) + seconds
+
+    def stats(self, path: str = None) -> pstats.Stats:
+        """Returns pstats of a phase, of all phases if path is None."""
+        profiles = self.profiles.values() if path is None else [self.profiles[path]]
+        stats = pstats.Stats()
+        for profile in profiles:
+            profile.create_stats()
+            if len(profile.stats) > 0:
+                stats.add(profile)
+        return stats
+
+    def summarize(self, seconds: float) -> dict:
+        stats = self.stats()
+        phases = dict()
+        for path in sorted(self.wall, key=self.wall.get, reverse=True):
+            wall, cpu = self.wall[path], self.cpu.get(path, 0.0)
+            phases[path] = {
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "calls": self.calls.get(path, 1),
+            }
+            if self.sql_stats is not None:
+                sql = self.sql_stats.phases.get(path, sqlstats.SQLStats())
+                sql = sql - self.sql_before.get(path, sqlstats.SQLStats())
+                phases[path]["sql"] = sql.to_dict()
+                phases[path]["wait_seconds"] = max(wall - cpu - sql.server_seconds, 0.0)
+        hotspots = sorted(
+            stats.stats.items(), key=lambda item: item[1][2], reverse=True
+        )
+        return {
+            "wall_seconds": seconds,
+            "cpu_seconds": sum(self.cpu.values()),
+            "server_seconds": sum(
+                p["sql"]["server_seconds"] for p in phases.values() if "sql" in p
+            ),
+            "phases": phases,
+            "watched": {
+                label: entry_cost(stats, predicate)
+                for label, predicate in WATCHED.items()
+            },
+            "hotspots": [
+                {
+                    "function": pstats.func_std_string(function),
+                    "calls": calls,
+                    "self_seconds": self_seconds,
+                    "cumulative_seconds": cumulative,
+                }
+                for function, (_, calls, self_seconds, cumulative, _) in hotspots[
+                    : self.top
+                ]
+            ],
+        }
+
+    def report(self) -> str:
+        """Returns summary as text tables."""
+        summary = self.summary
+        lines = [
+            f"wall {summary['wall_seconds']:.3f} s, client cpu {summary['cpu_seconds']:.3f} s, "
+            f"sql server {summary['server_seconds']:.3f} s",
+            "",
+            f"{'phase':50} {'calls':>6} {'wall':>9} {'cpu':>9} {'server':>9} {'stmts':>7}",
+        ]
+        for path, phase in summary["phases"].items():
+            sql = phase.get("sql", dict())
+            lines.append(
+                f"{path:50} {phase['calls']:6} {phase['wall_seconds']:9.3f} "
+                f"{phase['cpu_seconds']:9.3f} {sql.get('server_seconds', 0.0):9.3f} "
+                f"{sql.get('statements', 0):7}"
+            )
+        lines += ["", f"{'watched':50} {'calls':>6} {'cumulative':>10}"]
+        for label, cost in summary["watched"].items():
+            lines.append(f"{label:50} {cost['calls']:6} {cost['seconds']:10.3f}")
+        lines += ["", f"{'hotspot':80} {'calls':>8} {'self':>9} {'cumulative':>10}"]
+        for spot in summary["hotspots"]:
+            lines.append(
+                f"{spot['function'][-80:]:80} {spot['calls']:8} "
+                f"{spot['self_seconds']:9.3f} {spot['cumulative_seconds']:10.3f}"
+            )
+        return "\n".join(lines)
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for path in self.profiles:
+            stats = self.stats(path)
+            if len(stats.stats) > 0:
+                name = path.replace("/", "-") + ".pstats"
+                stats.dump_stats(os.path.join(self.directory, name))
+        self.stats().dump_stats(os.path.join(self.directory, "all.pstats"))
+        with open(os.path.join(self.directory, "summary.json"), "w") as file:
+            json.dump(self.summary, file, indent=2)
+        with open(os.path.join(self.directory, "summary.txt"), "w") as file:
+            file.write(self.report() + "\n")
+
+
+def entry_cost(stats: pstats.Stats, predicate) -> dict:
+    """Returns calls and cumulative seconds of matching functions called from other code.
+
+    Calls between matching functions, e.g. copy.copy calling copy.deepcopy, are not counted twice.
+    """
+    matched = {f for f in stats.stats if predicate(f[0], f[2])}
+    calls, seconds = 0, 0.0
+    for function in matched:
+        _, nc, _, ct, callers = stats.stats[function]
+        if len(callers) == 0:
+            # called from a frame that started before profiling
+            calls, seconds = calls + nc, seconds + ct
+        for caller, (_, caller_nc, _, caller_ct) in callers.items():
+            if caller not in matched:
+                calls, seconds = calls + caller_nc, seconds + caller_ct
+    return {"calls": calls, "seconds": seconds}
+
+
+def profiled(method):
+    """Decorator of methods with a `profile` keyword argument and a `sql_stats` attribute.
+
+    If `profile` is a directory, the call runs under a :class:`Profiler` that saves results
+    there, and the profiler is kept in the `profiler` attribute.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        directory = kwargs.get("profile")
+        if directory is None:
+            return method(self, *args, **kwargs)
+        self.profiler = Profiler(directory, sql_stats=self.sql_stats)
+        with self.profiler:
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,211 @@
+import collections
+import functools
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+TABLE_REFERENCE = re.compile(
+    r"\b(?:FROM|JOIN)\s+((?:\"(?:[^\"]|\"\")*\"|[A-Z_#][\w#$]*)"
+    r"(?:\.(?:\"(?:[^\"]|\"\")*\"|[A-Z_#][\w#$]*))?)",
+    re.IGNORECASE,
+)
+TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|[()]")
+PLAN_COLUMNS = [
+    "OPERATOR_NAME",
+    "OPERATOR_DETAILS",
+    "SCHEMA_NAME",
+    "TABLE_NAME",
+    "TABLE_SIZE",
+    "OUTPUT_SIZE",
+    "SUBTREE_COST",
+    "LEVEL",
+]
+
+
+class SQLCapture:
+    """Writes every SQL statement of :meth:`AutoML.fit` runs to files, to find bad query shapes.
+
+    While the capture is active, every fit writes its own JSON lines file to `directory`. A line
+    has the statement, its phase (tracing span path), parentheses nesting depth, length, client
+    time and number of scans of every base table. Statements that scan a table more than
+    `rescan_limit` times list these tables in 'rescanned'. The last line of a file is a summary.
+
+    Parameters
+    ----------
+    directory : str
+        Directory for capture files. Created if it doesn't exist.
+    explain_threshold : int
+        SELECT statements at least this long (in characters) get their EXPLAIN PLAN in 'plan'.
+        None turns EXPLAIN PLAN off.
+    rescan_limit : int
+        Number of scans of the same table in one statement that is still fine.
+
+    Examples
+    --------
+    >>> from hana_automl.utils.sqlcapture import SQLCapture
+    >>> with SQLCapture('sql', explain_threshold=20000) as capture:
+    ...     automl.fit(df=df, target='y', steps=10)
+    >>> capture.paths
+    ['sql/fit_20211124_101500_1a2b3c4d.jsonl']
+    """
+
+    def __init__(
+        self, directory: str, explain_threshold: int = None, rescan_limit: int = 3
+    ):
+        self.directory = directory
+        self.explain_threshold = explain_threshold
+        self.rescan_limit = rescan_limit
+        self.paths = list()
+        self.file = None
+        self.count = 0
+        self.worst = None
+        self.lock = threading.Lock()
+        self.previous = None
+
+    def __enter__(self):
+        global _capture
+        os.makedirs(self.directory, exist_ok=True)
+        self.previous = _capture
+        _capture = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _capture
+        _capture = self.previous
+        self.end()
+
+    def begin(self):
+        """Opens file of a new fit run."""
+        self.end()
+        name = f"fit_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl"
+        path = os.path.join(self.directory, name)
+        self.paths.append(path)
+        self.file = open(path, "w")
+        self.count = 0
+        self.worst = {"max_depth": 0, "max_length": 0, "rescanned": 0, "seconds": 0.0}
+
+    def end(self):
+        """Writes summary and closes file of the current fit run."""
+        if self.file is None:
+            return
+        self.__write({"summary": dict(statements=self.count, **self.worst)})
+        self.file.close()
+        self.file = None
+
+    def statement(
+        self, connection, statement: str, phase: str, seconds: float, batch: int = None
+    ):
+        """Records executed statement.
+
+        Parameters
+        ----------
+        connection
+            DB-API connection to run EXPLAIN PLAN on, not instrumented.
+        statement : str
+            Executed statement.
+        phase : str
+            Tracing span path.
+        seconds : float
+            Time of execution on the client side.
+        batch : int
+            Number of rows of executemany.
+        """
+        if self.file is None or not isinstance(statement, str):
+            return
+        scans = table_scans(statement)
+        record = {
+            "n": self.count,
+            "phase": phase,
+            "depth": nesting_depth(statement),
+            "length": len(statement),
+            "seconds": seconds,
+            "scans": scans,
+            "rescanned": {t: n for t, n in scans.items() if n > self.rescan_limit},
+        }
+        if batch is not None:
+            record["batch"] = batch
+        if (
+            self.explain_threshold is not None
+            and len(statement) >= self.explain_threshold
+            and re.match(r"\s*(SELECT|WITH)\b", statement, re.IGNORECASE)
+        ):
+            try:
+                record["plan"] = explain(connection, statement)
+            except Exception as error:
+                record["plan_error"] = f"{type(error).__name__}: {error}"
+        record["statement"] = statement
+        with self.lock:
+            self.count += 1
+            self.worst["max_depth"] = max(self.worst["max_depth"], record["depth"])
+            self.worst["max_length"] = max(self.worst["max_length"], record["length"])
+            self.worst["rescanned"] += len(record["rescanned"]) > 0
+            self.worst["seconds"] += seconds
+            self.__write(record)
+
+    def __write(self, record: dict):
+        self.file.write(json.dumps(record, default=str) + "\n")
+
+
+_capture = None
+
+
+def active() -> SQLCapture:
+    """Returns active capture or None."""
+    return _capture
+
+
+def captured(method):
+    """Decorator that gives every call of the method its own file of the active capture."""
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        capture = _capture
+        if capture is None:
+            return method(*args, **kwargs)
+        capture.begin()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            capture.end()
+
+    return wrapper
+
+
+def explain(connection, statement: str) -> list:
+    """Returns EXPLAIN PLAN of statement as list of operator dicts."""
+    name = f"HANA_AUTOML_{uuid.uuid4().hex}"
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN PLAN SET STATEMENT_NAME = '{name}' FOR {statement}")
+        cursor.execute(
+            f"SELECT {', '.join(PLAN_COLUMNS)} FROM EXPLAIN_PLAN_TABLE "
+            f"WHERE STATEMENT_NAME = '{name}' ORDER BY OPERATOR_ID"
+        )
+        plan = [dict(zip(PLAN_COLUMNS, row)) for row in cursor.fetchall()]
+        cursor.execute(
+            f"DELETE FROM EXPLAIN_PLAN_TABLE WHERE STATEMENT_NAME = '{name}'"
+        )
+        return plan
+    finally:
+        cursor.close()
+
+
+def nesting_depth(statement: str) -> int:
+    """Returns maximum depth of parentheses in statement, outside of literals."""
+    depth, deepest = 0, 0
+    for token in TOKEN.finditer(statement):
+        if token.group() == "(":
+            depth += 1
+            deepest = max(deepest, depth)
+        elif token.group() == ")":
+            depth -= 1
+    return deepest
+
+
+def table_scans(statement: str) -> dict:
+    """Returns how many times every table is referenced after FROM or JOIN."""
+    literals = re.sub(r"'(?:[^']|'')*'", "''", statement)
+    return dict(collections.Counter(TABLE_REFERENCE.findall(literals)))
@@ -0,0 +1,277 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+
+from hana_automl.utils import sqlcapture, tracing
+from hana_automl.utils.tables import TableRegistry
+
+# sizes of bigger batches are extrapolated from this many rows
+SIZE_SAMPLE_ROWS = 1000
+
+
+@dataclass
+class SQLStats:
+    """Counters of SQL traffic.
+
+    Attributes
+    ----------
+    statements : int
+        Executed statements, a batch of executemany counts as one.
+    server_seconds : float
+        Server processing time reported by the driver, 0 if the driver doesn't report it.
+    rows_fetched : int
+        Rows fetched from result sets.
+    bytes_sent : int
+        Approximate size of statements and their parameters.
+    bytes_received : int
+        Approximate size of fetched values.
+    """
+
+    statements: int = 0
+    server_seconds: float = 0.0
+    rows_fetched: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    def add(self, other: "SQLStats"):
+        for field in fields(self):
+            value = getattr(self, field.name) + getattr(other, field.name)
+            setattr(self, field.name, value)
+
+    def copy(self) -> "SQLStats":
+        return SQLStats(**vars(self))
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def __sub__(self, other: "SQLStats") -> "SQLStats":
+        return SQLStats(
+            **{
+                field.name: getattr(self, field.name) - getattr(other, field.name)
+                for field in fields(self)
+            }
+        )
+
+
+class StatsConnection:
+    """Connection wrapper that counts SQL traffic going through hana_ml.
+
+    Every statement is attributed to the innermost open tracing span (its path like
+    'automl.fit/trial/preprocess'), or to 'other' when tracing is off.
+
+    Attributes
+    ----------
+    connection
+        Wrapped DB-API connection, None until the wrapper is used.
+    total : SQLStats
+        Traffic since the connection was wrapped.
+    phases : dict
+        SQLStats by span path.
+    tables : TableRegistry
+        Tables created through the connection.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self.total = SQLStats()
+        self.phases = dict()
+        self.tables = TableRegistry()
+
+    def cursor(self):
+        return StatsCursor(self.connection.cursor(), self)
+
+    def record(self, stats: SQLStats):
+        self.total.add(stats)
+        path = phase_path(tracing.current())
+        if path not in self.phases:
+            self.phases[path] = SQLStats()
+        self.phases[path].add(stats)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class StatsCursor:
+    def __init__(self, cursor, connection: StatsConnection):
+        self.cursor = cursor
+        self.connection = connection
+
+    def execute(self, statement, parameters=None, *args, **kwargs):
+        start = time.perf_counter()
+        if parameters is None:
+            result = self.cursor.execute(statement, *args, **kwargs)
+        else:
+            result = self.cursor.execute(statement, parameters, *args, **kwargs)
+        self.__executed(statement, [parameters or ()], start)
+        return result
+
+    def executemany(self, statement, rows, *args, **kwargs):
+        rows = list(rows)
+        start = time.perf_counter()
+        result = self.cursor.executemany(statement, rows, *args, **kwargs)
+        self.__executed(statement, rows, start, batch=len(rows))
+        return result
+
+    def __executed(self, statement, rows, start: float, batch: int = None):
+        seconds = time.perf_counter() - start
+        self.connection.record(
+            SQLStats(
+                statements=1,
+                server_seconds=self.__server_seconds(),
+                bytes_sent=value_size(statement) + rows_size(rows),
+            )
+        )
+        self.connection.tables.observe(statement)
+        self.connection.tables.tick(self.connection.connection)
+        capture = sqlcapture.active()
+        if capture is not None:
+            capture.statement(
+                self.connection.connection,
+                statement,
+                phase_path(tracing.current()),
+                seconds,
+                batch,
+            )
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.__fetched([row])
+        return row
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.__fetched(rows)
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self.cursor.fetchmany(*args, **kwargs)
+        self.__fetched(rows)
+        return rows
+
+    def __fetched(self, rows):
+        self.connection.record(
+            SQLStats(rows_fetched=len(rows), bytes_received=rows_size(rows))
+        )
+
+    def __server_seconds(self) -> float:
+        # hdbcli reports processing time of the last statement in microseconds
+        server_time = getattr(self.cursor, "server_processing_time", None)
+        if server_time is None:
+            return 0.0
+        return server_time() / 1e6
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+def counted(method):
+    """Decorator of methods of objects with `connection_context` and `sql_stats` attributes.
+
+    While the method runs, connection of the connection context is routed through `sql_stats`.
+    The original connection is put back afterwards, so the connection context stays untouched.
+    Generator methods are routed only while they run to the next yield, so the connection
+    context is untouched between the items as well.
+    """
+    if inspect.isgeneratorfunction(method):
+
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            generator = method(self, *args, **kwargs)
+            try:
+                while True:
+                    with routed(self):
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                with routed(self):
+                    generator.close()
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with routed(self):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def routed(obj):
+    """Routes connection of `obj.connection_context` through `obj.sql_stats` within the block."""
+    connection_context = obj.connection_context
+    if connection_context is None or find(connection_context) is obj.sql_stats:
+        yield
+        return
+    connection = connection_context.connection
+    obj.sql_stats.connection = connection
+    connection_context.connection = obj.sql_stats
+    try:
+        yield
+    finally:
+        connection_context.connection = connection
+
+
+def find(connection_context) -> StatsConnection:
+    """Returns StatsConnection of connection context, looking through other wrappers, or None."""
+    connection = getattr(connection_context, "connection", None)
+    while connection is not None:
+        if isinstance(connection, StatsConnection):
+            return connection
+        # wrappers keep wrapped connection in 'connection', drivers don't have __dict__
+        connection = getattr(connection, "__dict__", dict()).get("connection")
+    return None
+
+
+def keep_table(connection_context, name: str):
+    """Excludes table named by user from tables dropped by AutoML.close."""
+    stats = find(connection_context)
+    if stats is not None:
+        stats.tables.forget(name)
+
+
+def snapshot(connection: StatsConnection) -> SQLStats:
+    """Returns copy of connection totals, zeros if the connection is not instrumented."""
+    if connection is None:
+        return SQLStats()
+    return connection.total.copy()
+
+
+def phase_path(span) -> str:
+    names = list()
+    while span is not None and span.name is not None:
+        names.append(span.name)
+        span = getattr(span, "parent", None)
+    if len(names) == 0:
+        return "other"
+    return "/".join(reversed(names))
+
+
+def value_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(str(value).encode())
+
+
+def rows_size(rows) -> int:
+    if len(rows) > SIZE_SAMPLE_ROWS:
+        sample = rows[:SIZE_SAMPLE_ROWS]
+        return rows_size(sample) * len(rows) // SIZE_SAMPLE_ROWS
+    return sum(value_size(value) for row in rows for value in row)
@@ -0,0 +1,156 @@
+import re
+import threading
+import time
+
+IDENTIFIER = r"(?:\"(?:[^\"]|\"\")*\"|[A-Z_#][\w#$]*)"
+CREATE_TABLE = re.compile(
+    rf"\bCREATE\s+(?:(?:LOCAL|GLOBAL)\s+TEMPORARY\s+)?(?:(?:COLUMN|ROW)\s+)?TABLE\s+"
+    rf"({IDENTIFIER}(?:\.{IDENTIFIER})?)",
+    re.IGNORECASE,
+)
+DROP_TABLE = re.compile(
+    rf"\bDROP\s+TABLE\s+({IDENTIFIER}(?:\.{IDENTIFIER})?)", re.IGNORECASE
+)
+
+
+class TableRegistry:
+    """Tables created through an instrumented connection, with their memory footprint.
+
+    Tables are registered by CREATE TABLE statements, including ones hana_ml generates for PAL
+    results, and forgotten by DROP TABLE. Memory of registered tables is sampled from M_CS_TABLES
+    at most once per `interval` seconds, on the thread that runs statements.
+
+    Attributes
+    ----------
+    tables : dict
+        Table reference as written in SQL by (schema, name) of registered tables.
+    interval : float
+        Minimum seconds between memory samples. None turns sampling off.
+    memory : int
+        Bytes of registered tables in the last sample.
+    peak_memory : int
+        Largest sample since the last :meth:`reset_peak`.
+    sampling_error : str
+        Error that turned sampling off, e.g. missing privilege on monitoring views.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.tables = dict()
+        self.interval = interval
+        self.memory = 0
+        self.peak_memory = 0
+        self.sampling_error = None
+        self.last_sample = None
+        self.lock = threading.Lock()
+
+    def observe(self, statement: str):
+        """Registers tables created and forgets tables dropped by the statement."""
+        if not isinstance(statement, str) or "TABLE" not in statement.upper():
+            return
+        with self.lock:
+            for reference in CREATE_TABLE.findall(statement):
+                self.tables[table_key(reference)] = reference
+            for reference in DROP_TABLE.findall(statement):
+                self.tables.pop(table_key(reference), None)
+
+    def forget(self, name: str, schema: str = None):
+        """Stops tracking a table, e.g. one created on user's request that must be kept.
+        Without schema, tables of this name in any schema are forgotten."""
+        with self.lock:
+            for key in list(self.tables):
+                if key[1] == name and (schema is None or key[0] == schema):
+                    del self.tables[key]
+
+    def tick(self, connection):
+        """Samples memory if `interval` seconds passed since the last sample."""
+        if self.interval is None or self.sampling_error is not None:
+            return
+        now = time.perf_counter()
+        if self.last_sample is not None and now - self.last_sample < self.interval:
+            return
+        self.sample(connection)
+
+    def sample(self, connection) -> int:
+        """Reads memory of registered column tables from M_CS_TABLES.
+
+        Parameters
+        ----------
+        connection
+            DB-API connection, not instrumented.
+
+        Returns
+        -------
+        int
+            Bytes in memory, 0 if sampling failed.
+        """
+        self.last_sample = time.perf_counter()
+        with self.lock:
+            names = sorted({name for _, name in self.tables})
+        if len(names) == 0 or self.sampling_error is not None:
+            self.memory = 0
+            return 0
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT SUM(MEMORY_SIZE_IN_TOTAL) FROM M_CS_TABLES WHERE TABLE_NAME IN "
+                f"({', '.join('?' * len(names))})",
+                names,
+            )
+            value = cursor.fetchall()[0][0]
+        except Exception as error:
+            self.sampling_error = f"{type(error).__name__}: {error}"
+            self.memory = 0
+            return 0
+        finally:
+            cursor.close()
+        self.memory = 0 if value is None else int(value)
+        self.peak_memory = max(self.peak_memory, self.memory)
+        return self.memory
+
+    def reset_peak(self):
+        self.peak_memory = self.memory
+
+    def drop(self, connection) -> list:
+        """Drops registered tables that still exist.
+
+        Parameters
+        ----------
+        connection
+            DB-API connection, not instrumented.
+
+        Returns
+        -------
+        list
+            Names of dropped tables.
+        """
+        with self.lock:
+            tables = list(self.tables.items())
+            self.tables.clear()
+        dropped = list()
+        cursor = connection.cursor()
+        try:
+            for (_, name), reference in reversed(tables):
+                try:
+                    cursor.execute(f"DROP TABLE {reference}")
+                    dropped.append(name)
+                except Exception:
+                    # dropped already, e.g. by hana_ml or with the end of the session
+                    pass
+        finally:
+            cursor.close()
+        if not connection.getautocommit():
+            connection.commit()
+        self.memory = 0
+        return dropped
+
+
+def table_key(reference: str) -> tuple:
+    """Returns (schema, name) of table reference, schema is None if it's not given."""
+    parts = re.findall(IDENTIFIER, reference, re.IGNORECASE)
+    parts = [
+        part[1:-1].replace('""', '"') if part.startswith('"') else part.upper()
+        for part in parts
+    ]
+    if len(parts) == 1:
+        return None, parts[0]
+    return parts[0], parts[1]
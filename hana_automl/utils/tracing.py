@@ -0,0 +1,283 @@
+import functools
+import json
+import os
+import threading
+import time
+
+
+class Span:
+    """Timed part of the pipeline.
+
+    Attributes
+    ----------
+    name : str
+        Phase name, e.g. 'fit' or 'trial'.
+    attributes : dict
+        Details of the phase: algorithm, preprocessing settings, row counts and so on.
+    parent : Span
+        Enclosing span, None for top-level spans.
+    start : int
+        Start time, nanoseconds (time.perf_counter_ns).
+    end : int
+        End time, nanoseconds. None while the span is open.
+    thread : int
+        Thread that ran the span.
+    """
+
+    __slots__ = ["name", "attributes", "parent", "start", "end", "thread", "id"]
+
+    def __init__(self, name: str, attributes: dict, parent, span_id: int):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.id = span_id
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        self.end = None
+
+    @property
+    def seconds(self) -> float:
+        end = time.perf_counter_ns() if self.end is None else self.end
+        return (end - self.start) / 1e9
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class NullSpan:
+    """Span returned while tracing is off. Does nothing."""
+
+    name = None
+    attributes = dict()
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Records nested spans of hana_automl phases while it is active.
+
+    Only one tracer is active at a time. While none is, traced functions are called directly and
+    :func:`span` returns a shared no-op span, so the disabled overhead is one global lookup.
+
+    Examples
+    --------
+    >>> from hana_automl.utils.tracing import Tracer
+    >>> with Tracer() as tracer:
+    ...     automl.fit(df=df, target='y', steps=10)
+    >>> tracer.save_chrome_trace('fit.json')  # open in chrome://tracing or ui.perfetto.dev
+    """
+
+    def __init__(self):
+        self.spans = list()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # perf_counter has no fixed epoch, the offset converts it to wall clock
+        self.epoch_offset = time.time_ns() - time.perf_counter_ns()
+        self.previous = None
+        # objects with opened(span) and closed(span) methods, e.g. a Profiler
+        self.listeners = list()
+
+    def __enter__(self):
+        global _tracer
+        self.previous = _tracer
+        _tracer = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _tracer
+        _tracer = self.previous
+
+    def stack(self) -> list:
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = list()
+        return stack
+
+    def current(self):
+        stack = self.stack()
+        return stack[-1] if len(stack) > 0 else NULL_SPAN
+
+    def open(self, name: str, attributes: dict) -> Span:
+        stack = self.stack()
+        with self.lock:
+            span = Span(name, attributes, stack[-1] if stack else None, len(self.spans))
+            self.spans.append(span)
+        stack.append(span)
+        for listener in self.listeners:
+            listener.opened(span)
+        return span
+
+    def close(self, span: Span, error: BaseException = None):
+        span.end = time.perf_counter_ns()
+        if error is not None:
+            span.attributes["error"] = f"{type(error).__name__}: {error}"
+        stack = self.stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        for listener in self.listeners:
+            listener.closed(span)
+
+    def summary(self) -> dict:
+        """Returns total seconds and number of calls for every span name."""
+        result = dict()
+        for span in self.spans:
+            entry = result.setdefault(span.name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += span.seconds
+            entry["calls"] += 1
+        return result
+
+    def to_chrome_trace(self) -> dict:
+        """Returns spans in Chrome trace event format, also read by Perfetto."""
+        pid = os.getpid()
+        events = list()
+        for span in self.spans:
+            end = time.perf_counter_ns() if span.end is None else span.end
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "hana_automl",
+                    "ph": "X",
+                    "ts": (span.start + self.epoch_offset) / 1000,
+                    "dur": (end - span.start) / 1000,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": span.attributes,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file, default=str)
+
+    def export(self, tracer):
+        """Replays recorded spans into an OpenTelemetry tracer, keeping nesting and times.
+
+        Parameters
+        ----------
+        tracer : opentelemetry.trace.Tracer
+            Tracer from a configured provider, e.g. ``trace.get_tracer('hana_automl')``. Spans go
+            to whatever exporters the provider has.
+        """
+        from opentelemetry import trace
+
+        exported = dict()
+        for span in self.spans:
+            context = None
+            if span.parent is not None:
+                context = trace.set_span_in_context(exported[span.parent.id])
+            otel_span = tracer.start_span(
+                span.name,
+                context=context,
+                attributes={k: otel_value(v) for k, v in span.attributes.items()},
+                start_time=span.start + self.epoch_offset,
+            )
+            exported[span.id] = otel_span
+        for span in self.spans:
+            end = time.perf_counter_ns() if span.end is None else span.end
+            exported[span.id].end(end_time=end + self.epoch_offset)
+
+
+class ActiveSpan:
+    __slots__ = ["tracer", "name", "attributes", "span"]
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self) -> Span:
+        self.span = self.tracer.open(self.name, self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer.close(self.span, exc_val)
+
+
+_tracer = None
+
+
+def active() -> Tracer:
+    """Returns active tracer or None."""
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """Context manager that records a span if tracing is on.
+
+    >>> with span('upload', rows=len(df)) as s:
+    ...     s.set_attribute('table', table_name)
+    """
+    if _tracer is None:
+        return NULL_SPAN
+    return ActiveSpan(_tracer, name, attributes)
+
+
+def current():
+    """Returns innermost open span of this thread, a no-op span if there is none."""
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.current()
+
+
+def traced(name: str, attributes=None):
+    """Decorator that records every call of the function as a span.
+
+    Parameters
+    ----------
+    name : str
+        Span name.
+    attributes : callable
+        Called with the function arguments, returns dict of span attributes.
+        It is only called while tracing is on.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+            values = dict() if attributes is None else attributes(*args, **kwargs)
+            with ActiveSpan(_tracer, name, values):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def keywords(*names: str):
+    """Returns attributes callable for :func:`traced` that takes the named keyword arguments."""
+
+    def attributes(*args, **kwargs):
+        return {name: kwargs[name] for name in names if name in kwargs}
+
+    return attributes
+
+
+def otel_value(value):
+    """Converts attribute to a type OpenTelemetry accepts."""
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)) and all(
+        isinstance(v, (bool, int, float, str)) for v in value
+    ):
+        return list(value)
+    return str(value)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from hana_ml.algorithms.pal.linear_model import LogisticRegression
+from hana_ml.algorithms.pal.regression import ExponentialRegression
+from hana_ml.algorithms.pal.trees import (
+    DecisionTreeClassifier,
+    DecisionTreeRegressor,
+    RDTClassifier,
+    RDTRegressor,
+)
+from hana_ml.dataframe import create_dataframe_from_pandas
+
+from hana_automl.algorithms.classification.decisiontreecls import DecisionTreeCls
+from hana_automl.algorithms.classification.logregressioncls import LogRegressionCls
+from hana_automl.algorithms.classification.rdtclas import RDTCls
+from hana_automl.algorithms.local.scorer import export_model
+from hana_automl.algorithms.regression.decisiontreereg import DecisionTreeReg
+from hana_automl.algorithms.regression.expreg import ExponentialReg
+from hana_automl.algorithms.regression.rdtreg import RDTReg
+from ..connection import connection_context
+
+regression = pd.read_csv("data/boston_data.csv")
+classification = pd.read_csv("data/cleaned_train.csv").fillna(0)
+
+
+def compare(algorithm, model, df, id_col, target):
+    algorithm.model = model
+    hana_df = create_dataframe_from_pandas(
+        connection_context, df, "TESTING_LOCAL", force=True, drop_exist_tab=True
+    )
+    features = [c for c in df.columns if c not in [id_col, target]]
+    model.fit(data=hana_df, key=id_col, features=features, label=target)
+    expected = model.predict(hana_df.deselect(target), id_col)
+    if type(expected) == tuple:
+        expected = expected[0]
+    expected = expected.collect().sort_values(id_col)
+    actual = export_model(algorithm).predict(df, id_col).sort_values(id_col)
+    return expected.iloc[:, 1].to_numpy(), actual.iloc[:, 1].to_numpy()
+
+
+@pytest.mark.parametrize(
+    "algorithm,model",
+    [
+        (
+            DecisionTreeReg(),
+            DecisionTreeRegressor(algorithm="cart", model_format="pmml"),
+        ),
+        (RDTReg(), RDTRegressor(n_estimators=20)),
+        (ExponentialReg(), ExponentialRegression()),
+    ],
+)
+def test_local_regression(algorithm, model):
+    expected, actual = compare(algorithm, model, regression, "ID", "medv")
+    assert np.allclose(expected.astype(float), actual, rtol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "algorithm,model",
+    [
+        (DecisionTreeCls(), DecisionTreeClassifier(model_format="pmml")),
+        (RDTCls(), RDTClassifier(n_estimators=20)),
+        (LogRegressionCls(binominal=True), LogisticRegression()),
+    ],
+)
+def test_local_classification(algorithm, model):
+    expected, actual = compare(
+        algorithm, model, classification, "PASSENGERID", "Survived"
+    )
+    assert (expected.astype(str) == actual.astype(str)).all()
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from hana_automl.artifacts import ArtifactCache
+
+pytest.importorskip("pyarrow")
+
+
+def member(table):
+    return {
+        "row": ("model", 1, "{}", 0.9, 0.8, "DecisionTreeRegressor", "r2_score"),
+        "class": "hana_ml.algorithms.pal.trees.DecisionTreeRegressor",
+        "json": '{"artifacts": {}}',
+        "single": True,
+        "tables": [table],
+    }
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    table = pd.DataFrame({"ROW_INDEX": [0, 1], "MODEL_CONTENT": ["<PMML", ">"]})
+    manifest = cache.put("my model/1", 1, False, [member(table), member(table)])
+
+    first, second = manifest["members"]
+    # equal tables are stored once
+    assert first["tables"] == second["tables"]
+    assert len(os.listdir(tmp_path / "objects")) == 1
+
+    entry = cache.get("my model/1", 1)
+    assert entry["ensemble"] is False
+    assert entry["members"][0]["row"][0] == "model"
+    pd.testing.assert_frame_equal(entry["members"][0]["tables"][0], table)
+    assert cache.get("my model/1", 2) is None
+
+
+def test_damaged_entry_is_missing(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    manifest = cache.put("model", 1, False, [member(pd.DataFrame({"A": [1]}))])
+    path = cache.object_path(manifest["members"][0]["tables"][0])
+    with open(path, "ab") as file:
+        file.write(b"garbage")
+    assert cache.get("model", 1) is None
+
+
+def test_bundle_entry_round_trip(tmp_path):
+    import mmap
+    import zipfile
+    from unittest import mock
+
+    from hana_automl.artifacts import entry_buffer, table_chunks, write_table_chunks
+
+    rows = [(i, f"part {i}") for i in range(5)]
+    cursor = mock.Mock(description=[("ROW_INDEX",), ("MODEL_CONTENT",)])
+    cursor.fetchmany.side_effect = [rows[:2], rows[2:4], rows[4:], []]
+    path = str(tmp_path / "bundle.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("manifest.json", "{}")
+        with archive.open("tables/0_0.arrow", "w", force_zip64=True) as file:
+            assert write_table_chunks(cursor, "SELECT", file, 2) == 5
+
+    with open(path, "rb") as file, zipfile.ZipFile(file) as archive:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunks = list(
+                table_chunks(entry_buffer(data, archive.getinfo("tables/0_0.arrow")))
+            )
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    result = pd.concat(chunks, ignore_index=True)
+    assert list(result.itertuples(index=False, name=None)) == rows
@@ -0,0 +1,47 @@
+from unittest import mock
+
+import pytest
+
+from hana_automl.automl import AutoML
+from hana_automl.offline.dataframe import ConnectionContext
+from hana_automl.utils.error import AutoMLError
+
+
+def test_predict_iter():
+    automl = AutoML(mock.MagicMock())
+    connection = automl.connection_context.connection
+    cursor = connection.cursor.return_value
+    cursor.fetchmany.side_effect = [[(1, "a"), (2, "b")], [(3, "a")], []]
+    result = mock.MagicMock(columns=["ID", "PREDICTION"], select_statement="SELECT 1")
+    chunks = list()
+    with mock.patch.object(AutoML, "_AutoML__predict_frame", return_value=result):
+        for chunk in automl.predict_iter(chunk_size=2, table_name="TEST"):
+            assert automl.connection_context.connection is connection
+            chunks.append(chunk)
+    assert automl.sql_stats.total.rows_fetched == 3
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[1].columns) == ["ID", "PREDICTION"]
+    cursor.fetchmany.assert_called_with(2)
+    cursor.close.assert_called_once()
+    with pytest.raises(AutoMLError):
+        next(automl.predict_iter(chunk_size=0))
+
+
+def test_predict_to_table():
+    cc = ConnectionContext()
+    cursor = cc.connection.cursor()
+    cursor.execute('CREATE TABLE "DATA" ("ID" INTEGER, "PREDICTION" DOUBLE)')
+    cursor.executemany('INSERT INTO "DATA" VALUES (?, ?)', [(1, 0.5), (2, 1.5)])
+    automl = AutoML(cc)
+    result = mock.MagicMock(
+        columns=["ID", "PREDICTION"], select_statement='SELECT * FROM "DATA"'
+    )
+    with mock.patch.object(AutoML, "_AutoML__predict_frame", return_value=result):
+        first = automl.predict_to_table("SCORED", table_name="DATA")
+        second = automl.predict_to_table("SCORED", table_name="DATA")
+    assert first["rows"] == second["rows"] == 2
+    assert first["seconds"] >= 0
+    assert len(cc.table("SCORED").collect()) == 4
+    assert automl.sql_stats.tables.tables == {}
+    assert automl.sql_stats.total.statements == 3
+    assert automl.connection_context.connection is not automl.sql_stats
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+from benchmarks.suite import compare, phases, trials
+from hana_automl.utils import tracing
+from hana_automl.utils.sqlstats import StatsConnection
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# hana_ml modules are replaced for the whole process, so the backend runs in a child process
+SCRIPT = textwrap.dedent("""
+    from benchmarks import suite
+    from hana_automl import offline
+
+    args = suite.parse_args(["--steps", "1", "--max-rows", "60"])
+    offline.install()
+    cc = offline.ConnectionContext()
+    connection = cc.connection
+    cc.close = lambda: None
+    iris = next(dataset for dataset in suite.DATASETS if dataset.name == "iris.csv")
+    result = suite.run_dataset(lambda: cc, iris, args)
+    assert cc.connection is connection
+    assert result["sql"]["statements"] > 0
+    assert result["phases"]["trial"]["calls"] == 1
+    """)
+
+
+def result(seconds, fit):
+    return {
+        "seconds": seconds,
+        "phases": {"trial": {"seconds": fit}, "trial/fit": {"seconds": fit}},
+    }
+
+
+def test_compare_marks_slowdowns():
+    baseline = {"datasets": {"a.csv": result(10.0, 5.0), "b.csv": result(1.0, 0.01)}}
+    results = {
+        "datasets": {
+            "a.csv": result(10.5, 6.0),
+            "b.csv": result(1.0, 0.05),
+            "c.csv": result(3.0, 1.0),
+        }
+    }
+    report = compare(results, baseline, threshold=10)
+    slower = {(name, phase): slow for name, phase, _, _, slow in report}
+    assert slower == {
+        ("a.csv", None): False,
+        ("a.csv", "trial"): True,
+        # too short to compare
+        ("b.csv", None): False,
+        ("b.csv", "trial"): False,
+    }
+
+
+def test_phases_are_relative_to_fit():
+    stats = StatsConnection(sqlite3.connect(":memory:"))
+    with tracing.Tracer() as tracer:
+        with tracing.span("automl.fit"):
+            stats.cursor().execute("SELECT 1")
+            with tracing.span("trial"):
+                with tracing.span("fit"):
+                    stats.cursor().execute("SELECT 2")
+    result = phases(tracer, stats)
+    assert set(result) == {"other", "trial", "trial/fit"}
+    assert result["trial/fit"]["calls"] == 1
+    assert result["trial/fit"]["statements"] == 1
+    assert "statements" not in result["trial"]
+    assert list(trials(tracer)[0]) == ["seconds", "fit"]
+
+
+def test_run_leaves_connection_untouched():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,137 @@
+import copy
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+from hana_ml.algorithms.pal.neural_network import MLPRegressor
+from hana_ml.algorithms.pal.trees import DecisionTreeRegressor
+
+from hana_automl.algorithms.ensembles.blending import (
+    prediction_column,
+    preprocessing_fingerprint,
+)
+from hana_automl.algorithms.ensembles.greedy import (
+    greedy_selection,
+    greedy_vote_selection,
+)
+from hana_automl.pipeline.modelres import LazyModel
+from hana_automl.preprocess.settings import PreprocessorSettings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# hana_ml modules are replaced for the whole process, so the backend runs in a child process
+STACKING = textwrap.dedent("""
+    import numpy as np
+    import pandas as pd
+
+    from hana_automl import offline
+
+    offline.install()
+
+    from hana_automl.algorithms.ensembles.stackcls import StackingCls
+    from hana_automl.algorithms.ensembles.stackreg import StackingReg
+    from hana_automl.automl import AutoML
+    from hana_automl.storage import Storage
+    from hana_automl.utils.error import StorageError
+
+    cc = offline.ConnectionContext()
+    random = np.random.RandomState(0)
+    df = pd.DataFrame({"ID": range(200), "A": random.rand(200), "B": random.rand(200)})
+    df["Y"] = df["A"] * 3 + df["B"]
+    df["C"] = np.where(df["Y"] > 2, "high", "low")
+    for target, other, task, ensemble_class, metric in [
+        ("Y", "C", "reg", StackingReg, "r2_score"),
+        ("C", "Y", "cls", StackingCls, "accuracy"),
+    ]:
+        automl = AutoML(cc)
+        automl.fit(
+            df=df.drop(columns=other),
+            target=target,
+            id_column="ID",
+            task=task,
+            steps=4,
+            ensemble="stacking",
+            verbose=0,
+        )
+        assert isinstance(automl.model, ensemble_class)
+        assert len(automl.model.model_list) == 3
+        assert 0.5 < automl.ensemble_score <= 1
+        features = df.drop(columns=["Y", "C"])
+        assert len(automl.predict(df=features, id_column="ID", verbose=0)) == 200
+        score = automl.score(df=df.drop(columns=other), target=target, metric=metric)
+        assert 0.5 < score <= 1
+        automl.model.name = "stacked"
+        try:
+            Storage(cc, "AUTOML_TEST").save_model(automl)
+        except StorageError:
+            pass
+        else:
+            raise AssertionError("stacking ensembles can't be saved")
+    """)
+
+
+def test_greedy_selection_regression():
+    actual = np.arange(10, dtype=float)
+    predictions = np.stack([actual + 1, actual - 1, actual + 5], axis=1)
+    weights, score = greedy_selection(predictions, actual, "mse", iterations=10)
+    assert weights[2] == 0
+    assert weights[0] == weights[1]
+    assert score == pytest.approx(0)
+
+
+def test_greedy_selection_classification():
+    actual = np.array(["a", "b", "a", "b", "a", "b"])
+    predictions = np.array(
+        [
+            ["a", "a", "b"],
+            ["b", "a", "b"],
+            ["a", "a", "b"],
+            ["a", "b", "b"],
+            ["a", "a", "b"],
+            ["b", "b", "b"],
+        ]
+    )
+    weights, score, classes = greedy_vote_selection(predictions, actual, 5)
+    assert classes == ["a", "b"]
+    assert weights[2] == 0
+    assert score > 0.8
+
+
+def test_preprocessing_fingerprint():
+    first = PreprocessorSettings(None)
+    first.tuned_num_strategy = "mean"
+    first.categorical_cols = ["B", "A"]
+    second = copy.deepcopy(first)
+    second.categorical_cols = ["A", "B", "A"]
+    assert preprocessing_fingerprint(first) == preprocessing_fingerprint(second)
+    second.tuned_num_strategy = "median"
+    assert preprocessing_fingerprint(first) != preprocessing_fingerprint(second)
+
+
+def test_prediction_column_of_lazy_models():
+    mlp = MLPRegressor(
+        activation="tanh",
+        output_activation="tanh",
+        hidden_layer_size=(10, 10),
+        training_style="batch",
+        learning_rate=0.01,
+    )
+    lazy = LazyModel(lambda name, version: mlp, "mlp", 1)
+    assert prediction_column(lazy) == 2
+    assert lazy.loaded
+    assert prediction_column(DecisionTreeRegressor()) == 1
+
+
+def test_stacking_offline():
+    result = subprocess.run(
+        [sys.executable, "-c", STACKING],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,55 @@
+import threading
+
+from hana_automl.utils import events
+from hana_automl.utils.events import EventBus
+
+
+class Fitter:
+    def __init__(self):
+        self.events = EventBus()
+
+    @events.presented
+    def fit(self, verbose=1):
+        self.events.emit(
+            events.PHASE_CHANGED,
+            phase="tuning",
+            task="cls",
+            tuning_metric="accuracy",
+            optimizer="OptunaSearch",
+        )
+
+
+def test_subscribers():
+    bus = EventBus()
+    bus.emit(events.TRIAL_STARTED, trial=0)
+    received, threads = list(), set()
+
+    def subscriber(event):
+        received.append((event.name, event["trial"]))
+        threads.add(threading.get_ident())
+
+    def broken(event):
+        raise ValueError("broken")
+
+    bus.subscribe(broken)
+    synchronous = bus.subscribe(
+        lambda event: received.append("sync"), asynchronous=False
+    )
+    with bus.subscribed(subscriber, events=[events.TRIAL_FINISHED]) as subscription:
+        bus.emit(events.TRIAL_STARTED, trial=1)
+        bus.emit(events.TRIAL_FINISHED, trial=1)
+    assert received == ["sync", "sync", (events.TRIAL_FINISHED, 1)]
+    assert threads == {subscription.thread.ident}
+    assert subscription not in bus.subscriptions
+    bus.unsubscribe(synchronous)
+    bus.emit(events.TRIAL_FINISHED, trial=2)
+    assert len(received) == 3
+
+
+def test_console_output_by_verbose(capsys):
+    fitter = Fitter()
+    fitter.fit(verbose=0)
+    assert capsys.readouterr().out == ""
+    fitter.fit()
+    assert capsys.readouterr().out == "Task: cls\nTuning metric: accuracy\n"
+    assert fitter.events.subscriptions == []
@@ -0,0 +1,45 @@
+import numpy as np
+
+from hana_automl.pipeline.history import TrialHistory
+
+
+def record_run(history, trials):
+    run = history.begin_run(optimizer="OptunaSearch", train_rows=100)
+    for trial, (algorithm, score) in enumerate(trials):
+        history.record(
+            run,
+            trial,
+            params={"max_depth": trial + 2, "layers": [10, 10]},
+            algorithm=algorithm,
+            train_score=np.float64(score),
+            valid_score=None,
+        )
+    return run
+
+
+def test_history_is_persisted_append_only(tmp_path):
+    path = str(tmp_path / "trials.jsonl")
+    history = TrialHistory(path)
+    run = record_run(history, [("A", 0.5), ("B", 0.7), ("A", 0.9)])
+    history.update(run, 1, valid_score=0.8)
+    record_run(history, [("C", 0.6)])
+    frame = history.frame()
+    assert list(frame["param_max_depth"]) == [2, 3, 4, 2]
+    assert frame["train_rows"].tolist() == [100] * 4
+    assert frame["param_layers"][0] == "[10, 10]"
+
+    loaded = TrialHistory.load(path)
+    assert len(loaded) == 4
+    assert loaded.frame()["valid_score"].isna().tolist() == [True, False, True, True]
+    assert loaded.frame()["valid_score"][1] == 0.8
+    assert loaded.best(2, by="train_score")["algorithm"].tolist() == ["A", "B"]
+    assert len(loaded.query("algorithm == 'A' and train_score > 0.6")) == 1
+
+
+def test_parquet_export(tmp_path):
+    history = TrialHistory()
+    record_run(history, [("A", 0.5), ("B", 0.7)])
+    history.to_parquet(str(tmp_path / "trials.parquet"))
+    loaded = TrialHistory.load(str(tmp_path / "trials.parquet"))
+    assert loaded.frame()["algorithm"].tolist() == ["A", "B"]
+    assert loaded.frame()["trial"].tolist() == [0, 1]
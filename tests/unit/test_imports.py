@@ -0,0 +1,27 @@
+from benchmarks.imports import compare, forbidden, measure, parse_importtime
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   optuna.version
+import time:       200 |        300 | optuna
+import time:        50 |         50 | hana_automl.utils
+"""
+
+
+def test_parse_importtime_counts_top_level_imports():
+    modules = parse_importtime(OUTPUT)
+    assert modules == {"optuna.version": 0, "optuna": 300, "hana_automl.utils": 50}
+    assert forbidden(modules) == ["optuna"]
+
+
+def test_compare_marks_slowdowns():
+    baseline = {"modules": {"a": {"seconds": 0.5}, "b": {"seconds": 0.01}}}
+    results = {
+        "modules": {"a": {"seconds": 0.8}, "b": {"seconds": 0.03}, "c": {"seconds": 1}}
+    }
+    report = compare(results, baseline, threshold=20)
+    # b is too fast to compare, c is not in baseline
+    assert [(m, slower) for m, _, _, slower in report] == [("a", True), ("b", False)]
+
+
+def test_loading_models_does_not_import_tuning():
+    assert measure("hana_automl.storage", repeat=1)["forbidden"] == []
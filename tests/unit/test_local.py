@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from hana_automl.algorithms.local.linear import ExponentialModel, LogisticModel
+from hana_automl.algorithms.local.trees import Forest
+
+TREE = """<PMML xmlns="http://www.dmg.org/PMML-4_0" version="4.0">
+<DataDictionary numberOfFields="3">
+  <DataField name="AGE" optype="continuous" dataType="double"/>
+  <DataField name="CITY" optype="categorical" dataType="string"/>
+  <DataField name="Y" optype="categorical" dataType="string"/>
+</DataDictionary>
+<TreeModel functionName="classification">
+  <Node score="no"><True/>
+    <Node score="yes">
+      <SimplePredicate field="AGE" operator="lessOrEqual" value="30"/>
+      <Node score="yes">
+        <SimpleSetPredicate field="CITY" booleanOperator="isIn">
+          <Array n="2" type="string">"New York" Berlin</Array>
+        </SimpleSetPredicate>
+        <ScoreDistribution value="yes" recordCount="3"/>
+        <ScoreDistribution value="no" recordCount="1"/>
+      </Node>
+      <Node score="no"><True/></Node>
+    </Node>
+    <Node score="no">
+      <SimplePredicate field="AGE" operator="greaterThan" value="30"/>
+    </Node>
+  </Node>
+</TreeModel>
+</PMML>"""
+
+
+def test_forest():
+    forest = Forest([TREE, TREE])
+    df = pd.DataFrame(
+        {"AGE": [20, 20, 40, 30], "CITY": ["New York", "Paris", "Berlin", "Berlin"]}
+    )
+    labels, confidence = forest.predict(df)
+    assert list(labels) == ["yes", "no", "no", "yes"]
+    assert list(confidence) == [1, 1, 1, 1]
+    labels, confidence = Forest([TREE]).predict(df.iloc[:1])
+    assert confidence[0] == 0.75
+
+
+def test_linear_models():
+    df = pd.DataFrame({"X": [0.0, 1.0], "C": ["a", "b"]})
+    coefficients = pd.DataFrame(
+        {
+            "VARIABLE_NAME": ["__PAL_INTERCEPT__", "X", "C__PAL_DELIMIT__b"],
+            "COEFFICIENT": [-1.0, 2.0, 1.0],
+        }
+    )
+    labels, probability = LogisticModel(coefficients, "N", "Y").predict(df)
+    assert list(labels) == ["N", "Y"]
+    assert np.allclose(probability, 1 / (1 + np.exp([1.0, -2.0])))
+    coefficients = coefficients.rename(columns={"COEFFICIENT": "COEFFICIENT_VALUE"})
+    coefficients["COEFFICIENT_VALUE"] = [3.0, 0.5, 0.0]
+    values, _ = ExponentialModel(coefficients).predict(df)
+    assert np.allclose(values, [3.0, 3.0 * np.exp(0.5)])
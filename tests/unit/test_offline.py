@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# hana_ml modules are replaced for the whole process, so the backend runs in a child process
+SCRIPT = textwrap.dedent("""
+    import numpy as np
+    import pandas as pd
+
+    from hana_automl import offline
+
+    offline.install()
+
+    from hana_automl.automl import AutoML
+    from hana_automl.storage import Storage
+
+    cc = offline.ConnectionContext()
+    random = np.random.RandomState(0)
+    df = pd.DataFrame(
+        {"ID": range(120), "A": random.rand(120), "B": random.choice(["x", "y"], 120)}
+    )
+    df["Y"] = df["A"] * 3 + (df["B"] == "x")
+    automl = AutoML(cc)
+    automl.fit(df=df, target="Y", id_column="ID", task="reg", steps=2, verbose=0)
+    predicted = automl.predict(df=df.drop(columns="Y"), id_column="ID", verbose=0)
+    assert len(predicted) == 120
+
+    storage = Storage(cc, "AUTOML_TEST")
+    automl.model.name = "offline"
+    storage.save_model(automl)
+    loaded = storage.load_model("offline", 1)
+    reloaded = loaded.predict(df=df.drop(columns="Y"), id_column="ID", verbose=0)
+    assert predicted.equals(reloaded)
+
+    # replacing one version keeps preprocessors of the others
+    storage.save_model(automl)
+    assert automl.model.version == 2
+    storage.save_model(automl, if_exists="replace")
+    storage.load_model("offline", 1)
+    assert list(storage.list_preprocessors("offline")["VERSION"]) == [1, 2]
+
+    # without version, every version is removed with its preprocessor
+    storage.delete_model("offline")
+    assert len(storage.list_preprocessors("offline")) == 0
+    assert len(storage.list_models("offline")) == 0
+    """)
+
+WIDE = textwrap.dedent("""
+    import json
+    import numpy as np
+    import optuna
+    import pandas as pd
+
+    from hana_automl import offline
+
+    offline.install()
+
+    from hana_automl.automl import AutoML
+    from hana_automl.storage import PREPROCESSOR_INDEX, PREPROCESSORS, Storage
+
+    cc = offline.ConnectionContext()
+    cc.add_schema("AUTOML_TEST")
+    cursor = cc.connection.cursor()
+    # preprocessor table of a storage created before the PLAN column and the index
+    cursor.execute(
+        f"CREATE TABLE AUTOML_TEST.{PREPROCESSORS} (MODEL NVARCHAR(256), VERSION INT, "
+        f"JSON NVARCHAR(5000), TRAIN_ACC DOUBLE, VALID_ACC DOUBLE, ALGORITHM NVARCHAR(256), "
+        f"METRIC NVARCHAR(256))"
+    )
+    random = np.random.RandomState(0)
+    df = pd.DataFrame(random.rand(80, 130), columns=[f"COLUMN_{i}" for i in range(130)])
+    df.insert(0, "ID", range(80))
+    df["Y"] = df["COLUMN_0"] * 3 + df["COLUMN_1"]
+    create_study = optuna.create_study
+    # a seeded trial picks preprocessing that compiles into a plan
+    optuna.create_study = lambda *args, **kwargs: create_study(
+        *args, **dict(kwargs, sampler=optuna.samplers.TPESampler(seed=0))
+    )
+    automl = AutoML(cc)
+    automl.fit(df=df, target="Y", id_column="ID", task="reg", steps=1, verbose=0)
+    # statistics of every column don't fit in JSON NVARCHAR(5000)
+    assert len(json.dumps(automl.preprocessor_settings.compiled_plan)) > 5000
+    storage = Storage(cc, "AUTOML_TEST")
+    automl.model.name = "wide"
+    storage.save_model(automl)
+    cursor.execute(
+        "SELECT COUNT(*) FROM INDEXES WHERE SCHEMA_NAME = ? AND INDEX_NAME = ?",
+        ("AUTOML_TEST", PREPROCESSOR_INDEX),
+    )
+    assert cursor.fetchall()[0][0] == 1
+    loaded = storage.load_model("wide", 1)
+    plan = automl.preprocessor_settings.compiled_plan
+    assert loaded.preprocessor_settings.compiled_plan == plan
+    features = df.drop(columns="Y")
+    assert automl.predict(df=features, id_column="ID", verbose=0).equals(
+        loaded.predict(df=features, id_column="ID", verbose=0)
+    )
+    """)
+
+
+def test_fit_save_load_offline():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_wide_model_in_old_storage():
+    result = subprocess.run(
+        [sys.executable, "-c", WIDE],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
@@ -1,10 +1,14 @@
 from unittest import mock
 
+import numpy as np
+import pandas as pd
 import pytest
 
+from hana_automl.offline.dataframe import ConnectionContext
 from hana_automl.pipeline.data import Data
 from hana_automl.pipeline.input import Input
 from hana_automl.pipeline.pipeline import Pipeline
+from hana_automl.pipeline.staging import StagingTable
 from hana_automl.utils.error import InputError, PipelineError
 
 
@@ -23,3 +27,40 @@ def test_pipe(data):
     with pytest.raises(PipelineError, match="Optimizer not found!"):
         pipe = Pipeline(data, 0, "reg")
         pipe.train()
+
+
+def test_staging_table():
+    connection_context = mock.MagicMock()
+    connection_context.connection.getautocommit.return_value = True
+    cursor = connection_context.connection.cursor.return_value
+    staging = StagingTable(connection_context, name="STAGE")
+    df = pd.DataFrame({"A": [1, 2], "B": [0.5, np.nan], "C": ["x", "y"]})
+    staging.load(df)
+    cursor.execute.assert_called_with(
+        'CREATE COLUMN TABLE "STAGE" ("A" BIGINT, "B" DOUBLE, "C" NVARCHAR(5000))'
+    )
+    cursor.executemany.assert_called_with(
+        'INSERT INTO "STAGE" VALUES (?, ?, ?)', [(1, 0.5, "x"), (2, None, "y")]
+    )
+    staging.load(df)
+    cursor.execute.assert_called_with('TRUNCATE TABLE "STAGE"')
+    staging.load(df[["A"]])
+    assert cursor.execute.call_args_list[-2] == mock.call('DROP TABLE "STAGE"')
+    staging.drop()
+    cursor.execute.assert_called_with('DROP TABLE "STAGE"')
+    cursor.close.assert_called_once()
+    assert connection_context.connection.cursor.call_count == 1
+
+
+def test_staging_results_are_detached():
+    first, second = ConnectionContext(), ConnectionContext()
+    staging = StagingTable(first)
+    hana_df = staging.load(pd.DataFrame({"A": [1, 2]}))
+    kept = staging.detach(hana_df.filter('"A" > 1'))
+    staging.load(pd.DataFrame({"A": [5, 6, 7]}))
+    assert kept.collect()["A"].tolist() == [2]
+    assert staging.detach(kept) is kept
+    staging.connection_context = second
+    assert staging.cursor is None and staging.columns is None
+    assert len(staging.load(pd.DataFrame({"A": [3]})).collect()) == 1
+    assert not first.has_table(staging.name)
@@ -0,0 +1,59 @@
+from unittest import mock
+
+import pandas as pd
+
+from hana_automl.preprocess.plan import PreprocessingPlan
+from hana_automl.preprocess.settings import PreprocessorSettings
+
+
+def test_compile_plan():
+    df = mock.MagicMock()
+    df.columns = ["ID", "AGE", "INCOME", "CITY", "TARGET"]
+    df.dtypes.return_value = [
+        ("ID", "INT", 10),
+        ("AGE", "INT", 10),
+        ("INCOME", "DOUBLE", 15),
+        ("CITY", "NVARCHAR", 20),
+        ("TARGET", "INT", 10),
+    ]
+    df.select_statement = 'SELECT * FROM "DATA"'
+    df.connection_context.sql.return_value.collect.side_effect = [
+        pd.DataFrame([[30.4, 1000.0]]),  # fill values
+        pd.DataFrame([[0, "Berlin", 5]]),  # most frequent values
+        pd.DataFrame([[10.0, 60.0, 0.0, 3000.0]]),  # min and max
+    ]
+    settings = PreprocessorSettings(None)
+    settings.tuned_num_strategy = "mean"
+    settings.tuned_normalizer_strategy = "min-max"
+    settings.tuned_normalize_int = True
+    plan = PreprocessingPlan.compile(df, "ID", "TARGET", settings)
+    assert plan.columns == [
+        ["CITY", "Berlin", False, False, 0.0, 1.0],
+        ["AGE", 30, True, True, 10.0, 50.0],
+        ["INCOME", 1000.0, False, True, 0.0, 3000.0],
+    ]
+    plan = PreprocessingPlan.from_dict(plan.to_dict())
+    statement = plan.select_statement(df)
+    assert statement.startswith('SELECT "ID", COALESCE("CITY", \'Berlin\') AS "CITY", ')
+    assert '((CAST(COALESCE("AGE", 30) AS DOUBLE) - 10.0) / 50.0) AS "AGE"' in statement
+    assert statement.endswith('FROM (SELECT * FROM "DATA") AS PLAN_SOURCE')
+
+    settings.tuned_num_strategy = "als"
+    assert PreprocessingPlan.compile(df, "ID", "TARGET", settings) is None
+
+
+def test_mean_mean_scaling_query():
+    from hana_automl.offline.dataframe import ConnectionContext
+    from hana_automl.preprocess.plan import collect_scaling
+
+    cc = ConnectionContext()
+    cc.connection.sqlite.execute('CREATE TABLE "DATA" ("ID" INT, "A" DOUBLE, "B" INT)')
+    cc.connection.sqlite.executemany(
+        'INSERT INTO "DATA" VALUES (?, ?, ?)',
+        [(1, 1.0, 10), (2, 3.0, 20), (3, 5.0, 30)],
+    )
+    df = cc.table("DATA")
+    scaling = collect_scaling(
+        df, PreprocessingPlan(), ["A", "B"], "z-score", "mean-mean"
+    )
+    assert scaling == {"A": (3.0, 4 / 3), "B": (20.0, 20 / 3)}
@@ -0,0 +1,49 @@
+import copy
+import os
+
+from hana_automl.utils import tracing
+from hana_automl.utils.profiling import Profiler, profiled
+from hana_automl.utils.sqlstats import StatsConnection
+
+
+def busy(n):
+    return sum(len(copy.deepcopy(list(range(100)))) for _ in range(n))
+
+
+class Fitter:
+    def __init__(self):
+        self.sql_stats = StatsConnection()
+        self.profiler = None
+
+    @profiled
+    def fit(self, profile=None):
+        with tracing.span("trial"):
+            with tracing.span("fit"):
+                busy(50)
+            busy(10)
+
+
+def test_profile_is_split_by_phase(tmp_path):
+    fitter = Fitter()
+    fitter.fit(profile=str(tmp_path))
+    summary = fitter.profiler.summary
+    assert set(summary["phases"]) == {"other", "trial", "trial/fit"}
+    assert summary["phases"]["trial/fit"]["sql"]["statements"] == 0
+    assert summary["phases"]["trial/fit"]["cpu_seconds"] > 0
+    # deepcopy calls itself for list items, only the 60 calls from busy are entries
+    assert summary["watched"]["copy"]["calls"] == 60
+    assert {"all.pstats", "trial-fit.pstats", "summary.json", "summary.txt"} <= set(
+        os.listdir(tmp_path)
+    )
+    assert tracing.active() is None
+
+
+def test_profiler_joins_active_tracer(tmp_path):
+    with tracing.Tracer() as tracer:
+        with tracing.span("outer"):
+            with Profiler(str(tmp_path)) as profiler:
+                with tracing.span("inner"):
+                    busy(1)
+    assert set(profiler.summary["phases"]) == {"outer", "outer/inner"}
+    assert [s.name for s in tracer.spans] == ["outer", "inner"]
+    assert tracer.listeners == []
@@ -11,3 +11,193 @@ def test_saving_predicted(conn, hana_df):
 
     automl.save_results_as_csv("path")
     hana_df.collect().to_csv.assert_called_with("path")
+
+
+@mock.patch("hana_automl.storage.table_exists", return_value=True)
+@mock.patch("hana_automl.storage.ModelStorage.save_model")
+@mock.patch("hana_automl.storage.ModelStorage.__init__", autospec=True)
+def test_leaderboard_saved_in_one_transaction(init, save_model, exists):
+    from hana_automl.storage import PREPROCESSORS, DeferredCommit, Storage
+
+    def setup(self, connection_context, schema):
+        self.connection_context = connection_context
+        self.schema = schema
+
+    init.side_effect = setup
+    conn = mock.MagicMock()
+    connection = conn.connection
+    connection.getautocommit.return_value = True
+    storage = Storage(conn, "SCHEMA")
+    storage.plan_column = True
+    storage.prep_index = True
+
+    def save(model, if_exists):
+        # hana_ml commits every model itself, the commit has to be deferred
+        assert isinstance(conn.connection, DeferredCommit)
+        conn.connection.commit()
+
+    save_model.side_effect = save
+    leaderboard = []
+    for i in range(3):
+        member = mock.Mock(train_score=0.9, valid_score=0.8)
+        member.algorithm.title = "RDTRegressor"
+        member.algorithm.model.version = 1
+        member.preprocessor.__dict__ = {"tuned_num_strategy": "mean"}
+        leaderboard.append(member)
+
+    storage.save_leaderboard("r2_score", leaderboard, "board")
+
+    assert save_model.call_count == 3
+    statements = [c[0][0] for c in storage.cursor.execute.call_args_list]
+    assert statements == [
+        "SET TRANSACTION AUTOCOMMIT DDL OFF",
+        "SET TRANSACTION AUTOCOMMIT DDL ON",
+    ]
+    connection.commit.assert_called_once()
+    connection.rollback.assert_not_called()
+    assert conn.connection is connection
+    connection.setautocommit.assert_called_with(True)
+    delete, insert = storage.cursor.executemany.call_args_list
+    assert delete[0][0] == (
+        f"DELETE FROM SCHEMA.{PREPROCESSORS} WHERE MODEL = ? AND VERSION = ?"
+    )
+    assert delete[0][1][0] == ("board_leaderboard_1", 1)
+    assert "VALUES (?, ?, ?, ?, ?, ?, ?, ?)" in insert[0][0]
+    assert insert[0][1][0][7] is None
+    assert [row[0] for row in insert[0][1]] == [
+        "board_leaderboard_1",
+        "board_leaderboard_2",
+        "board_leaderboard_3",
+    ]
+
+
+@mock.patch("hana_automl.storage.table_exists", return_value=True)
+@mock.patch("hana_automl.storage.ModelStorage.__init__", autospec=True)
+def test_models_found_with_cached_prefix_query(init, exists):
+    from hana_automl.storage import Storage, like_prefix, leaderboard_prefix
+
+    def setup(self, connection_context, schema):
+        self.connection_context = connection_context
+        self.schema = schema
+
+    init.side_effect = setup
+    storage = Storage(mock.MagicMock(), "SCHEMA")
+    storage.metadata_exists = True
+    cursor = storage.cursor
+    cursor.fetchall.return_value = [("b_leaderboard_1", 1), ("b_leaderboard_2", 1)]
+
+    members = storage._Storage__find_models("b", leaderboard_prefix)
+    assert members == [("b_leaderboard_1", 1), ("b_leaderboard_2", 1)]
+    storage._Storage__find_models("b", leaderboard_prefix)
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args[0][1] == ("b\\_leaderboard\\_%",)
+    assert like_prefix("100%_") == "100\\%\\_%"
+
+    with storage._transaction():
+        pass
+    storage._Storage__find_models("b", leaderboard_prefix)
+    statements = [c[0][0] for c in cursor.execute.call_args_list]
+    assert [s for s in statements if s.startswith("SELECT")] == [statements[0]] * 2
+
+
+@mock.patch("hana_automl.storage.ModelStorage.load_model")
+@mock.patch("hana_automl.storage.table_exists", return_value=True)
+@mock.patch("hana_automl.storage.ModelStorage.__init__", autospec=True)
+def test_leaderboard_loaded_lazily(init, exists, load_model):
+    from hana_automl.storage import Storage
+
+    def setup(self, connection_context, schema):
+        self.connection_context = connection_context
+        self.schema = schema
+
+    init.side_effect = setup
+    storage = Storage(mock.MagicMock(), "SCHEMA")
+    storage.metadata_exists = True
+    storage.plan_column = True
+    settings = (
+        '{"tuned_num_strategy": "mean", "tuned_normalizer_strategy": "min-max", '
+        '"tuned_z_score_method": "", "tuned_normalize_int": false, '
+        '"strategy_by_col": null, "categorical_cols": [], "task": "reg", '
+        '"normalization_exceptions": []}'
+    )
+    storage.cursor.fetchall.return_value = [
+        (
+            "b_leaderboard_1",
+            1,
+            settings,
+            0.9,
+            0.8,
+            "DecisionTreeRegressor",
+            "r2_score",
+            None,
+        ),
+        (
+            "b_leaderboard_2",
+            1,
+            settings,
+            0.7,
+            0.6,
+            "DecisionTreeRegressor",
+            "r2_score",
+            None,
+        ),
+    ]
+
+    leaderboard = storage.load_leaderboard("b")
+
+    storage.cursor.execute.assert_called_once()
+    load_model.assert_not_called()
+    assert [m.valid_score for m in leaderboard] == [0.8, 0.6]
+    first, second = [m.algorithm for m in leaderboard]
+    assert first is not second
+    assert first.model.name == "b_leaderboard_1"
+    assert not first.model.loaded
+
+    first.model.predict("data")
+    load_model.assert_called_once_with("b_leaderboard_1", 1)
+    load_model.return_value.predict.assert_called_once_with("data")
+    assert not second.model.loaded
+
+
+@mock.patch("hana_automl.storage.table_exists", return_value=True)
+@mock.patch("hana_automl.storage.ModelStorage.__init__", autospec=True)
+def test_delete_models_is_set_based(init, exists):
+    import json
+
+    from hana_automl.storage import Storage
+
+    def setup(self, connection_context, schema):
+        self.connection_context = connection_context
+        self.schema = schema
+        self._METADATA_TABLE_NAME = "HANAML_MODEL_STORAGE"
+
+    init.side_effect = setup
+    storage = Storage(mock.MagicMock(), "S")
+    storage.metadata_exists = True
+    artifacts = [
+        {"schema": "S", "model_tables": "HANAML_A_1_MODELS", "library": "PAL"},
+        {"schema": "S", "model_tables": ["HANAML_B_1_MODELS_0", "HANAML_B_1_MODELS_1"]},
+        {"schema": "S", "model_tables": "HANAML_APL_MODELS_DEFAULT", "library": "APL"},
+    ]
+    cursor = storage.cursor
+    cursor.fetchall.side_effect = [
+        [(json.dumps({"artifacts": a}),) for a in artifacts],
+        # HANAML_B_1_MODELS_0 was dropped by hand
+        [("S", "HANAML_A_1_MODELS"), ("S", "HANAML_B_1_MODELS_1")],
+    ]
+
+    assert storage.delete_models("exp%", end_time="2021-06-01 00:00:00") == 3
+
+    statements = [c[0][0] for c in cursor.execute.call_args_list]
+    assert len(statements) == 7
+    assert statements[0].endswith("WHERE NAME LIKE ? ESCAPE '\\' AND TIMESTAMP <= ?")
+    assert statements[1] == "SET TRANSACTION AUTOCOMMIT DDL OFF"
+    assert statements[2].startswith("DELETE FROM S.AUTOML_PREPROCESSOR_STORAGE WHERE")
+    assert statements[3].startswith("DELETE FROM S.HANAML_MODEL_STORAGE WHERE")
+    assert statements[4].endswith("WHERE TABLE_NAME IN (?, ?, ?)")
+    assert statements[5] == (
+        'DO BEGIN DROP TABLE "S"."HANAML_A_1_MODELS"; '
+        'DROP TABLE "S"."HANAML_B_1_MODELS_1"; END'
+    )
+    assert statements[6] == "SET TRANSACTION AUTOCOMMIT DDL ON"
+    storage.connection_context.connection.commit.assert_called_once()
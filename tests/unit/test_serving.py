@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from hana_automl.serving import PredictionService
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = list()
+        self.closed = False
+
+    def predict(self, df, id_column, verbose):
+        self.batches.append(len(df))
+        return pd.DataFrame({id_column: df[id_column], "SCORE": df["X"] * 2})
+
+    def close(self):
+        self.closed = True
+
+
+def make_service(**kwargs):
+    models = dict()
+    connections = list()
+
+    def loader(connection, name, version):
+        models[(name, version)] = FakeModel()
+        return models[(name, version)]
+
+    def factory():
+        connections.append(object())
+        return connections[-1]
+
+    service = PredictionService(factory, loader=loader, **kwargs)
+    return service, models, connections
+
+
+def test_requests_are_batched():
+    service, models, connections = make_service(window_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            *[service.predict("M", 1, {"X": i}) for i in range(10)]
+        )
+        await service.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [r["SCORE"] for r in results] == [i * 2 for i in range(10)]
+    assert models[("M", 1)].batches == [10]
+    assert len(connections) == 1
+
+
+def test_cache_eviction_and_metrics():
+    service, models, connections = make_service(cache_size=1, window_ms=1)
+
+    async def run():
+        await service.predict("A", 1, {"X": 1})
+        await service.predict("B", 1, {"X": 1})
+        metrics = service.metrics()
+        await service.close()
+        return metrics
+
+    metrics = asyncio.run(run())
+    assert models[("A", 1)].closed
+    assert len(connections) == 1
+    assert list(metrics["models"]) == ["B:1"]
+    assert metrics["cache"]["evictions"] == 1
+    assert metrics["models"]["B:1"]["latency_ms"]["count"] == 1
+
+
+def test_concurrent_cold_requests():
+    service, models, connections = make_service(cache_size=1, window_ms=1)
+    keys = ["A", "A", "B", "C"]
+
+    async def run():
+        # loads in flight count against the cache, so they don't wait for each other
+        results = await asyncio.wait_for(
+            asyncio.gather(*[service.predict(k, 1, {"X": 1}) for k in keys]), 10
+        )
+        metrics = service.metrics()
+        await service.close()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+    assert [r["SCORE"] for r in results] == [2] * 4
+    # A is loaded once for both of its requests
+    assert models[("A", 1)].batches == [2]
+    assert metrics["cache"]["evictions"] == 2
+    assert len(connections) == 1
+
+
+def test_http():
+    service, models, connections = make_service(window_ms=1)
+
+    async def run():
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"rows": [{"X": 1}, {"X": 2}]}).encode()
+        writer.write(
+            b"POST /predict/M/1 HTTP/1.1\r\nContent-Length: "
+            + str(len(body)).encode()
+            + b"\r\n\r\n"
+            + body
+        )
+        response = await reader.read()
+        server.close()
+        await service.close()
+        return response
+
+    response = asyncio.run(run())
+    assert response.startswith(b"HTTP/1.1 200")
+    payload = json.loads(response.split(b"\r\n\r\n", 1)[1])
+    assert [p["SCORE"] for p in payload["predictions"]] == [2, 4]
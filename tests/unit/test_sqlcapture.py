@@ -0,0 +1,38 @@
+import json
+import sqlite3
+
+from hana_automl.utils.sqlcapture import SQLCapture, nesting_depth, table_scans
+from hana_automl.utils.sqlstats import StatsConnection
+
+
+def test_statement_shape():
+    statement = (
+        'SELECT * FROM (SELECT * FROM "S"."T" WHERE X = \'FROM "T"\') '
+        'JOIN "S"."T" ON 1 = 1 UNION ALL SELECT * FROM "#TMP"'
+    )
+    assert nesting_depth(statement) == 1
+    assert nesting_depth('SELECT "(" FROM T') == 0
+    assert table_scans(statement) == {'"S"."T"': 2, '"#TMP"': 1}
+
+
+def test_capture_writes_file_per_run(tmp_path):
+    connection = StatsConnection(sqlite3.connect(":memory:"))
+    with SQLCapture(str(tmp_path), explain_threshold=10, rescan_limit=1) as capture:
+        for _ in range(2):
+            capture.begin()
+            cursor = connection.cursor()
+            cursor.execute("CREATE TABLE IF NOT EXISTS T (A INTEGER)")
+            cursor.execute("SELECT * FROM T UNION ALL SELECT * FROM (SELECT * FROM T)")
+            capture.end()
+    assert len(capture.paths) == 2
+    with open(capture.paths[0]) as file:
+        create, select, summary = [json.loads(line) for line in file]
+    assert "plan" not in create and "plan_error" not in create
+    assert (select["depth"], select["scans"], select["rescanned"]) == (
+        1,
+        {"T": 2},
+        {"T": 2},
+    )
+    # sqlite has no EXPLAIN PLAN, the error is recorded instead
+    assert "plan_error" in select
+    assert summary["summary"]["statements"] == 2
@@ -0,0 +1,49 @@
+import sqlite3
+from types import SimpleNamespace
+
+from hana_automl.utils import sqlstats, tracing
+from hana_automl.utils.sqlstats import SQLStats, StatsConnection
+
+
+class Fitter:
+    def __init__(self, connection_context):
+        self.connection_context = connection_context
+        self.sql_stats = StatsConnection()
+        self.trial = None
+
+    @sqlstats.counted
+    def fit(self):
+        stats = sqlstats.find(self.connection_context)
+        cursor = self.connection_context.connection.cursor()
+        cursor.execute("CREATE TABLE T (A INTEGER, B TEXT)")
+        with tracing.span("trial"):
+            start = sqlstats.snapshot(stats)
+            cursor.executemany("INSERT INTO T VALUES (?, ?)", [(1, "ab"), (2, "cd")])
+            with tracing.span("score"):
+                cursor.execute("SELECT * FROM T WHERE A > ?", (0,))
+                cursor.fetchall()
+            self.trial = sqlstats.snapshot(stats) - start
+
+
+def test_statements_are_counted_by_phase():
+    connection = sqlite3.connect(":memory:")
+    fitter = Fitter(SimpleNamespace(connection=connection))
+    with tracing.Tracer():
+        fitter.fit()
+    assert fitter.connection_context.connection is connection
+    assert (fitter.trial.statements, fitter.trial.rows_fetched) == (2, 2)
+    assert fitter.trial.bytes_received == 6
+    stats = fitter.sql_stats
+    assert stats.total.statements == 3
+    assert set(stats.phases) == {"other", "trial", "trial/score"}
+    assert stats.phases["trial/score"].rows_fetched == 2
+
+
+def test_find_looks_through_wrappers():
+    connection = StatsConnection(sqlite3.connect(":memory:"))
+    wrapper = SimpleNamespace(connection=connection)
+    assert sqlstats.find(SimpleNamespace(connection=wrapper)) is connection
+    assert (
+        sqlstats.find(SimpleNamespace(connection=sqlite3.connect(":memory:"))) is None
+    )
+    assert sqlstats.snapshot(None) == SQLStats()
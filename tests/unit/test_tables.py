@@ -0,0 +1,51 @@
+import sqlite3
+
+from hana_automl.utils.tables import TableRegistry, table_key
+
+
+class Connection:
+    def __init__(self):
+        self.sqlite = sqlite3.connect(":memory:")
+
+    def cursor(self):
+        return self.sqlite.cursor()
+
+    def getautocommit(self):
+        return True
+
+
+def test_registry_follows_create_and_drop():
+    registry = TableRegistry()
+    registry.observe(
+        "DO BEGIN CALL _SYS_AFL.PAL_X(:in, out_0);\n"
+        'CREATE LOCAL TEMPORARY COLUMN TABLE "#PAL_RESULT" AS (SELECT * FROM :out_0);\nEND'
+    )
+    registry.observe('CREATE COLUMN TABLE "S"."AUTOML1" ("A" INT)')
+    registry.observe("CREATE TABLE kept (A INT)")
+    registry.observe('SELECT * FROM "#PAL_RESULT"')
+    assert set(registry.tables) == {
+        (None, "#PAL_RESULT"),
+        ("S", "AUTOML1"),
+        (None, "KEPT"),
+    }
+    registry.observe('DROP TABLE "S"."AUTOML1"')
+    registry.forget("KEPT")
+    assert list(registry.tables) == [(None, "#PAL_RESULT")]
+    assert table_key('"S"."A""B"') == ("S", 'A"B')
+
+
+def test_drop_and_sampling_errors():
+    connection = Connection()
+    connection.sqlite.execute('CREATE TABLE "T1" (A INT)')
+    registry = TableRegistry()
+    registry.observe('CREATE TABLE "T1" (A INT)')
+    registry.observe('CREATE TABLE "T2" (A INT)')
+    # sqlite has no monitoring views, sampling turns itself off
+    assert registry.sample(connection) == 0
+    assert registry.sampling_error is not None
+    # T2 was never created, it is skipped
+    assert registry.drop(connection) == ["T1"]
+    assert registry.tables == dict()
+    assert connection.sqlite.execute(
+        "SELECT COUNT(*) FROM sqlite_master"
+    ).fetchall() == [(0,)]
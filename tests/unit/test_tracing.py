@@ -0,0 +1,52 @@
+import pytest
+
+from hana_automl.utils import tracing
+from hana_automl.utils.tracing import NULL_SPAN, Tracer, keywords, traced
+
+
+@traced("outer", attributes=keywords("rows"))
+def outer(rows=0):
+    tracing.current().set_attribute("algorithm", "x")
+    inner()
+
+
+@traced("inner")
+def inner():
+    pass
+
+
+def test_disabled_tracing_records_nothing():
+    assert tracing.span("phase") is NULL_SPAN
+    assert tracing.current() is NULL_SPAN
+    outer(rows=1)
+    assert tracing.active() is None
+
+
+def test_spans_are_nested():
+    with Tracer() as tracer:
+        outer(rows=10)
+        with pytest.raises(ValueError):
+            with tracing.span("failed"):
+                raise ValueError("bad")
+    assert tracing.active() is None
+    first, second, failed = tracer.spans
+    assert (first.name, first.parent) == ("outer", None)
+    assert first.attributes == {"rows": 10, "algorithm": "x"}
+    assert second.parent is first
+    assert failed.parent is None
+    assert failed.attributes["error"] == "ValueError: bad"
+    assert tracer.summary()["inner"]["calls"] == 1
+
+
+def test_chrome_trace_format():
+    with Tracer() as tracer:
+        outer(rows=10)
+    events = tracer.to_chrome_trace()["traceEvents"]
+    assert [event["name"] for event in events] == ["outer", "inner"]
+    assert all(event["ph"] == "X" for event in events)
+    outer_event, inner_event = events
+    assert outer_event["ts"] <= inner_event["ts"]
+    assert (
+        inner_event["ts"] + inner_event["dur"] <= outer_event["ts"] + outer_event["dur"]
+    )
+    assert outer_event["args"]["rows"] == 10
@@ -3,6 +3,7 @@ import optuna.visualization as optuna_vs
 import pandas as pd
 import streamlit as st
 from hana_ml.dataframe import ConnectionContext
+from streamlit.report_thread import add_report_ctx
 
 from hana_automl.automl import AutoML
 from hana_automl.storage import Storage
@@ -183,6 +184,8 @@ if start_training:
         with st.beta_expander("Show output"):
             with st_stdout("text"):
                 session_state.automl = AutoML(session_state.cc)
+                # progress is printed by subscriber threads, they need the page to write to it
+                session_state.automl.events.thread_hook = add_report_ctx
                 if existing_table is not None and uploaded_file is None:
                     df_to_fit = existing_table
                 else: